@@ -20,6 +20,11 @@ Example usage:
     schedule = CronSchedule().monthly().on_day(1).at(5, 0)
 """
 
+from typing import TYPE_CHECKING
+import importlib
+
+from .compiled import CompiledSchedule
+from .interning import InternStats, SchedulePool, dedupe
 from .schedule import CronSchedule
 from .shortcuts import (
     CommonSchedules,
@@ -35,18 +40,76 @@ from .types import (
     HourInterval,
     Minute,
     MinuteInterval,
+    Month,
+    SecondInterval,
     Weekday,
     WeekdayInt,
     WeekdayStr,
 )
 
+if TYPE_CHECKING:
+    from .algebra import CompositeSchedule
+    from .horizon import CalendarCache
+    from .index import ScheduleIndex
+    from .planner import JitterPlanner
+    from .stream import iter_fires
+    from .tz import ZonedSchedule
+
+# Heavier subsystems are only imported when first accessed, to keep
+# ``import fluentcron`` cheap for short-lived processes.
+_LAZY_ATTRIBUTES = {
+    "CalendarCache": ".horizon",
+    "CompositeSchedule": ".algebra",
+    "ScheduleIndex": ".index",
+    "JitterPlanner": ".planner",
+    "ZonedSchedule": ".tz",
+    "iter_fires": ".stream",
+}
+_LAZY_SUBMODULES = (
+    "analysis",
+    "batch",
+    "bench",
+    "binary",
+    "bulk",
+    "instrument",
+    "runtime",
+    "sharding",
+)
+
+
+def __getattr__(name: str) -> object:
+    if name in _LAZY_ATTRIBUTES:
+        module = importlib.import_module(_LAZY_ATTRIBUTES[name], __name__)
+        value: object = getattr(module, name)
+    elif name in _LAZY_SUBMODULES:
+        value = importlib.import_module(f".{name}", __name__)
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted({*globals(), *_LAZY_ATTRIBUTES, *_LAZY_SUBMODULES})
+
+
 __all__ = [
     "CronSchedule",
+    "CompiledSchedule",
+    "CompositeSchedule",
+    "CalendarCache",
+    "ScheduleIndex",
+    "SchedulePool",
+    "InternStats",
+    "JitterPlanner",
+    "ZonedSchedule",
     "HourInterval",
     "MinuteInterval",
+    "SecondInterval",
     "Hour",
     "Minute",
     "DayOfMonth",
+    "Month",
     "WeekdayInt",
     "WeekdayStr",
     "Weekday",
@@ -56,4 +119,6 @@ __all__ = [
     "every_n_minutes",
     "every_n_hours",
     "CommonSchedules",
+    "iter_fires",
+    "dedupe",
 ]
@@ -0,0 +1,428 @@
+"""
+Union, intersection and difference of schedules
+"""
+
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from collections.abc import Iterator
+from datetime import datetime, timedelta
+import heapq
+
+from .compiled import CompiledSchedule
+from .schedule import CronSchedule
+
+_ONE_MINUTE = timedelta(minutes=1)
+_EPSILON = timedelta(microseconds=1)
+
+# Every bit set, per field
+_MINUTES = (1 << 60) - 1
+_HOURS = (1 << 24) - 1
+_DAYS = (1 << 31) - 1
+_MONTHS = (1 << 12) - 1
+_WEEKDAYS = 0x7F
+
+type Operand = CronSchedule | CompiledSchedule | CompositeSchedule
+
+
+class CompositeSchedule(ABC):
+    """
+    A set of fire times built from schedules with ``|`` (union), ``&``
+    (intersection) and ``-`` (difference)::
+
+        (CronSchedule().every_n_minutes(5) - CronSchedule.parse("* 2-3 * * 0"))
+
+    Expressions are normalized when they are built: intersections are
+    computed field by field on the operands' bitmasks, and unions and
+    differences are folded into a single compiled schedule wherever the
+    operands differ in only one field. What remains is evaluated lazily:
+    a union takes the earliest next fire of its operands (``iter_fires()``
+    merges them with a heap), and a difference jumps over a whole excluded
+    period at once instead of generating and discarding each fire in it.
+    Like :meth:`CompiledSchedule.next_after`, datetimes are read as
+    wall-clock times and ``tzinfo`` is carried over.
+    """
+
+    __slots__ = ()
+
+    @abstractmethod
+    def matches(self, dt: datetime) -> bool:
+        """Whether the schedule fires at the minute containing ``dt``."""
+
+    @abstractmethod
+    def next_after(self, dt: datetime) -> datetime | None:
+        """Return the first fire time strictly after ``dt``."""
+
+    @abstractmethod
+    def _next_miss(self, dt: datetime) -> datetime | None:
+        """Return the first minute strictly after ``dt`` that is not a fire."""
+
+    def iter_fires(
+        self, start: datetime, end: datetime | None = None
+    ) -> Iterator[datetime]:
+        """Yield the fire times in ``[start, end)`` in order."""
+        fire = self.next_after(start - _EPSILON)
+        while fire is not None and (end is None or fire < end):
+            yield fire
+            fire = self.next_after(fire)
+
+    def __or__(self, other: Operand) -> CompositeSchedule:
+        return union(self, other)
+
+    def __ror__(self, other: Operand) -> CompositeSchedule:
+        return union(other, self)
+
+    def __and__(self, other: Operand) -> CompositeSchedule:
+        return intersection(self, other)
+
+    def __rand__(self, other: Operand) -> CompositeSchedule:
+        return intersection(other, self)
+
+    def __sub__(self, other: Operand) -> CompositeSchedule:
+        return difference(self, other)
+
+    def __rsub__(self, other: Operand) -> CompositeSchedule:
+        return difference(other, self)
+
+
+def _earliest(*fires: datetime | None) -> datetime | None:
+    return min((fire for fire in fires if fire is not None), default=None)
+
+
+class LeafSchedule(CompositeSchedule):
+    """A single compiled schedule used as an operand."""
+
+    __slots__ = ("_complement", "compiled")
+
+    def __init__(self, compiled: CompiledSchedule) -> None:
+        self.compiled = compiled
+        self._complement: list[CompiledSchedule] | None = None
+
+    def __repr__(self) -> str:
+        return f"LeafSchedule({self.compiled!r})"
+
+    def matches(self, dt: datetime) -> bool:
+        return self.compiled.satisfiable and self.compiled.matches(dt)
+
+    def next_after(self, dt: datetime) -> datetime | None:
+        return self.compiled.next_after(dt)
+
+    def _next_miss(self, dt: datetime) -> datetime | None:
+        if not self.compiled.satisfiable:
+            return dt.replace(second=0, microsecond=0) + _ONE_MINUTE
+        # A minute is a miss if any one field fails to match, so the misses
+        # are the union of (at most four) schedules with one field inverted.
+        if self._complement is None:
+            self._complement = _complement(self.compiled)
+        return _earliest(*(piece.next_after(dt) for piece in self._complement))
+
+
+def _complement(c: CompiledSchedule) -> list[CompiledSchedule]:
+    pieces = [
+        CompiledSchedule.from_masks(*masks, False)
+        for masks in (
+            (_MINUTES & ~c.minute, _HOURS, _DAYS, _MONTHS, _WEEKDAYS),
+            (_MINUTES, _HOURS & ~c.hour, _DAYS, _MONTHS, _WEEKDAYS),
+            (_MINUTES, _HOURS, _DAYS, _MONTHS & ~c.month, _WEEKDAYS),
+        )
+    ]
+    # Day-of-month and weekday matches are combined with AND or OR; the
+    # days on which the schedule does not fire use the other one.
+    pieces.append(
+        CompiledSchedule.from_masks(
+            _MINUTES,
+            _HOURS,
+            _DAYS & ~c.day,
+            _MONTHS,
+            _WEEKDAYS & ~c.weekday,
+            not c.day_or_weekday,
+        )
+    )
+    return [piece for piece in pieces if piece.satisfiable]
+
+
+class UnionSchedule(CompositeSchedule):
+    """Fires whenever any operand fires."""
+
+    __slots__ = ("operands",)
+
+    def __init__(self, operands: list[CompositeSchedule]) -> None:
+        self.operands = operands
+
+    def __repr__(self) -> str:
+        return f"UnionSchedule({self.operands!r})"
+
+    def matches(self, dt: datetime) -> bool:
+        return any(operand.matches(dt) for operand in self.operands)
+
+    def next_after(self, dt: datetime) -> datetime | None:
+        return _earliest(*(operand.next_after(dt) for operand in self.operands))
+
+    def _next_miss(self, dt: datetime) -> datetime | None:
+        # Every operand fires up to its own first miss, so the first common
+        # miss is at or after the latest of those
+        candidate = dt
+        for operand in self.operands:
+            miss = operand._next_miss(dt)
+            if miss is None:
+                return None
+            candidate = max(candidate, miss)
+        moved = True
+        while moved:
+            moved = False
+            for operand in self.operands:
+                if operand.matches(candidate):
+                    miss = operand._next_miss(candidate)
+                    if miss is None:
+                        return None
+                    candidate, moved = miss, True
+        return candidate
+
+    def iter_fires(
+        self, start: datetime, end: datetime | None = None
+    ) -> Iterator[datetime]:
+        # One pending fire per operand in a heap; only the operand that
+        # produced the last fire is advanced.
+        seed = start - _EPSILON
+        heap: list[tuple[datetime, int]] = []
+        for i, operand in enumerate(self.operands):
+            fire = operand.next_after(seed)
+            if fire is not None:
+                heap.append((fire, i))
+        heapq.heapify(heap)
+        last: datetime | None = None
+        while heap:
+            fire, i = heap[0]
+            if end is not None and fire >= end:
+                return
+            if fire != last:
+                yield fire
+                last = fire
+            following = self.operands[i].next_after(fire)
+            if following is None:
+                heapq.heappop(heap)
+            else:
+                heapq.heapreplace(heap, (following, i))
+
+
+class DifferenceSchedule(CompositeSchedule):
+    """Fires when the first operand fires and the second does not."""
+
+    __slots__ = ("left", "right")
+
+    def __init__(self, left: CompositeSchedule, right: CompositeSchedule) -> None:
+        self.left = left
+        self.right = right
+
+    def __repr__(self) -> str:
+        return f"DifferenceSchedule({self.left!r}, {self.right!r})"
+
+    def matches(self, dt: datetime) -> bool:
+        return self.left.matches(dt) and not self.right.matches(dt)
+
+    def next_after(self, dt: datetime) -> datetime | None:
+        candidate = self.left.next_after(dt)
+        while candidate is not None:
+            if not self.right.matches(candidate):
+                return candidate
+            # Skip the whole excluded period in one jump
+            gap = self.right._next_miss(candidate)
+            if gap is None or self.left.matches(gap):
+                return gap
+            candidate = self.left.next_after(gap)
+        return None
+
+    def _next_miss(self, dt: datetime) -> datetime | None:
+        return _earliest(self.left._next_miss(dt), self.right.next_after(dt))
+
+
+def _operand(schedule: Operand) -> CompositeSchedule:
+    if isinstance(schedule, CompositeSchedule):
+        return schedule
+    if isinstance(schedule, CronSchedule):
+        schedule = schedule.compile()
+    if isinstance(schedule, CompiledSchedule):
+        if schedule.sub_minute:
+            raise ValueError("Sub-minute schedules cannot be combined")
+        return LeafSchedule(schedule)
+    raise TypeError(f"Cannot combine a schedule with {type(schedule).__name__}")
+
+
+def _fields(c: CompiledSchedule) -> tuple[int, int, int, int, int]:
+    return (c.minute, c.hour, c.day, c.month, c.weekday)
+
+
+def _from_fields(masks: list[int], day_or_weekday: bool = False) -> CompiledSchedule:
+    minute, hour, day, month, weekday = masks
+    return CompiledSchedule.from_masks(
+        minute, hour, day, month, weekday, day_or_weekday
+    )
+
+
+_EMPTY = CompiledSchedule.from_masks(0, 0, 0, 0, 0, False)
+
+
+def _split(c: CompiledSchedule) -> list[CompiledSchedule]:
+    """
+    ``c`` as a union of schedules whose fields all match independently:
+    a day-of-month OR weekday schedule becomes one schedule per field.
+    """
+    if not c.day_or_weekday:
+        return [c]
+    return [
+        CompiledSchedule.from_masks(c.minute, c.hour, c.day, c.month, _WEEKDAYS, False),
+        CompiledSchedule.from_masks(c.minute, c.hour, _DAYS, c.month, c.weekday, False),
+    ]
+
+
+def _intersect(a: CompiledSchedule, b: CompiledSchedule) -> list[CompiledSchedule]:
+    """``a & b`` as a union of compiled schedules, intersected field by field."""
+    result: list[CompiledSchedule] = []
+    for x in _split(a):
+        for y in _split(b):
+            both = _from_fields([p & q for p, q in zip(_fields(x), _fields(y))])
+            if both.satisfiable:
+                result.append(both)
+    return result
+
+
+def _merge(a: CompiledSchedule, b: CompiledSchedule) -> CompiledSchedule | None:
+    """``a | b`` as one compiled schedule, if they differ in at most one field."""
+    if a.day_or_weekday != b.day_or_weekday:
+        return None
+    fields_a, fields_b = _fields(a), _fields(b)
+    differing = [i for i in range(5) if fields_a[i] != fields_b[i]]
+    if len(differing) > 1:
+        return None
+    merged = list(fields_a)
+    for i in differing:
+        merged[i] |= fields_b[i]
+    return _from_fields(merged, a.day_or_weekday)
+
+
+def _subtract(a: CompiledSchedule, b: CompiledSchedule) -> CompiledSchedule | None:
+    """
+    ``a - b`` as one compiled schedule, for ``b`` within ``a`` field by field
+    (neither OR-ing day-of-month and weekday), if they differ in at most one
+    field.
+    """
+    fields_a, fields_b = _fields(a), _fields(b)
+    differing = [i for i in range(5) if fields_a[i] & ~fields_b[i]]
+    if not differing:
+        return _EMPTY
+    if len(differing) > 1:
+        return None
+    masks = list(fields_a)
+    masks[differing[0]] &= ~fields_b[differing[0]]
+    return _from_fields(masks)
+
+
+def union(*schedules: Operand) -> CompositeSchedule:
+    """Fire whenever any of ``schedules`` fires."""
+    operands: list[CompositeSchedule] = []
+    for schedule in map(_operand, schedules):
+        if isinstance(schedule, UnionSchedule):
+            operands.extend(schedule.operands)
+        elif not (
+            isinstance(schedule, LeafSchedule) and not schedule.compiled.satisfiable
+        ):
+            operands.append(schedule)
+    merged: list[CompositeSchedule] = []
+    for operand in operands:
+        if isinstance(operand, LeafSchedule):
+            for i, other in enumerate(merged):
+                if isinstance(other, LeafSchedule):
+                    combined = _merge(other.compiled, operand.compiled)
+                    if combined is not None:
+                        merged[i] = LeafSchedule(combined)
+                        break
+            else:
+                merged.append(operand)
+        else:
+            merged.append(operand)
+    if not merged:
+        return LeafSchedule(_EMPTY)
+    if len(merged) == 1:
+        return merged[0]
+    return UnionSchedule(merged)
+
+
+def intersection(left: Operand, right: Operand) -> CompositeSchedule:
+    """Fire when both ``left`` and ``right`` fire."""
+    # Intersections are pushed down to pairs of compiled schedules, which
+    # combine field by field, so they never need evaluating as such.
+    a, b = _operand(left), _operand(right)
+    if isinstance(a, UnionSchedule):
+        return union(*(intersection(x, b) for x in a.operands))
+    if isinstance(b, UnionSchedule):
+        return union(*(intersection(a, y) for y in b.operands))
+    if isinstance(a, DifferenceSchedule):
+        return difference(intersection(a.left, b), a.right)
+    if isinstance(b, DifferenceSchedule):
+        return difference(intersection(a, b.left), b.right)
+    assert isinstance(a, LeafSchedule) and isinstance(b, LeafSchedule)
+    return union(*_intersect(a.compiled, b.compiled))
+
+
+def difference(left: Operand, right: Operand) -> CompositeSchedule:
+    """Fire when ``left`` fires and ``right`` does not."""
+    a, b = _operand(left), _operand(right)
+    if isinstance(b, DifferenceSchedule):
+        # a - (x - y) == (a - x) | (a & x & y)
+        return union(
+            difference(a, b.left), intersection(intersection(a, b.left), b.right)
+        )
+    excluded = b.operands if isinstance(b, UnionSchedule) else [b]
+    leaves = [x.compiled for x in excluded if isinstance(x, LeafSchedule)]
+    if len(leaves) < len(excluded):
+        # a - (x | y) == (a - x) - y
+        for x in excluded:
+            a = difference(a, x)
+        return a
+    # From here on the right side only consists of compiled schedules
+    if isinstance(a, UnionSchedule):
+        return union(*(difference(x, b) for x in a.operands))
+    if isinstance(a, DifferenceSchedule):
+        return difference(a.left, union(a.right, b))
+    assert isinstance(a, LeafSchedule)
+    if a.compiled.day_or_weekday:
+        return union(*(difference(x, b) for x in _split(a.compiled)))
+    # Only the part of the right side that overlaps the left side matters.
+    # Fold what can be folded into the left side's fields, and re-clip the
+    # rest whenever the left side shrinks.
+    result = a.compiled
+    rest = [y for x in leaves for y in _intersect(result, x)]
+    changed = True
+    while changed and rest:
+        changed = False
+        for i, part in enumerate(rest):
+            folded = _subtract(result, part)
+            if folded is not None:
+                result = folded
+                others = rest[:i] + rest[i + 1 :]
+                rest = [z for y in others for z in _intersect(result, y)]
+                changed = True
+                break
+    if not rest or not result.satisfiable:
+        return LeafSchedule(result)
+    return DifferenceSchedule(
+        LeafSchedule(result), union(*(_widen(x, result) for x in rest))
+    )
+
+
+def _widen(x: CompiledSchedule, within: CompiledSchedule) -> CompiledSchedule:
+    """
+    Open up the fields in which ``x`` equals ``within``. For fire times of
+    ``within`` this does not change whether ``x`` matches, but it leaves only
+    the fields that actually exclude something to jump over.
+    """
+    masks = [
+        full if field == bound else field
+        for field, bound, full in zip(
+            _fields(x),
+            _fields(within),
+            (_MINUTES, _HOURS, _DAYS, _MONTHS, _WEEKDAYS),
+            strict=True,
+        )
+    ]
+    return _from_fields(masks)
@@ -0,0 +1,279 @@
+"""
+Collision analysis: which schedules fire at the same minutes
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Mapping
+from datetime import date, datetime, timedelta
+from typing import NamedTuple
+import heapq
+
+from .compiled import CompiledSchedule
+from .index import _set_bits
+from .schedule import CronSchedule
+
+MINUTES_PER_DAY = 1440
+
+# Field name -> (number of bits, mask with every bit set)
+_FIELDS = {
+    "second": (60, (1 << 60) - 1),
+    "minute": (60, (1 << 60) - 1),
+    "hour": (24, (1 << 24) - 1),
+    "day": (31, (1 << 31) - 1),
+    "month": (12, (1 << 12) - 1),
+    "weekday": (7, 0x7F),
+}
+
+# The fields that decide whether a schedule fires on a given date
+type _DateSignature = tuple[int, int, int, bool]
+
+
+class Collision[K](NamedTuple):
+    """A minute at which several schedules fire, and the schedules' keys."""
+
+    time: datetime
+    load: int
+    keys: list[K]
+
+
+class CollisionReport[K](NamedTuple):
+    """
+    Result of :func:`collisions`.
+
+    ``groups`` lists the keys of schedules with identical fire times, largest
+    group first. ``subsumed`` holds ``(i, j)`` pairs of indexes into
+    ``groups`` where every fire of group ``i`` is also a fire of group ``j``.
+    ``hottest`` holds the busiest minutes in the window, busiest first.
+    """
+
+    groups: list[list[K]]
+    subsumed: list[tuple[int, int]]
+    hottest: list[Collision[K]]
+
+
+def _bitmap(indexes: list[int]) -> int:
+    """An int with the given bit positions set."""
+    if not indexes:
+        return 0
+    data = bytearray(max(indexes) // 8 + 1)
+    for i in indexes:
+        data[i >> 3] |= 1 << (i & 7)
+    return int.from_bytes(data, "little")
+
+
+def _matches_date(signature: _DateSignature, day: date) -> bool:
+    days, months, weekdays, day_or_weekday = signature
+    if not months >> (day.month - 1) & 1:
+        return False
+    dom = days >> (day.day - 1) & 1
+    dow = weekdays >> (day.isoweekday() % 7) & 1
+    return bool(dom | dow) if day_or_weekday else bool(dom & dow)
+
+
+def _minute_counts(
+    compiled: list[CompiledSchedule], sizes: list[int], members: list[int]
+) -> list[int]:
+    """Schedules firing at each minute of a day on which ``members`` all match."""
+    # Groups sharing a minute mask only differ in their hours, so add their
+    # sizes up per hour first and expand each minute mask once.
+    by_minute: dict[int, list[int]] = {}
+    for g in members:
+        hours = by_minute.setdefault(compiled[g].minute, [0] * 24)
+        for h in _set_bits(compiled[g].hour):
+            hours[h] += sizes[g]
+    counts = [0] * MINUTES_PER_DAY
+    for minute_mask, hours in by_minute.items():
+        minutes = list(_set_bits(minute_mask))
+        for h, weight in enumerate(hours):
+            if weight:
+                base = h * 60
+                for m in minutes:
+                    counts[base + m] += weight
+    return counts
+
+
+def _top(counts: list[int], lo: int, hi: int, top: int) -> list[tuple[int, int]]:
+    """The ``top`` busiest ``(count, -minute)`` pairs in ``[lo, hi)``, if 2+."""
+    return heapq.nlargest(
+        top, ((counts[m], -m) for m in range(lo, hi) if counts[m] >= 2)
+    )
+
+
+def _hottest[K](
+    compiled: list[CompiledSchedule],
+    groups: list[list[K]],
+    start: datetime,
+    end: datetime,
+    top: int,
+) -> list[Collision[K]]:
+    sizes = [len(keys) for keys in groups]
+    signatures: dict[_DateSignature, list[int]] = {}
+    for g, c in enumerate(compiled):
+        if c.satisfiable:
+            signature = (c.day, c.month, c.weekday, c.day_or_weekday)
+            signatures.setdefault(signature, []).append(g)
+    by_signature = list(signatures.items())
+    sig_counts = [
+        _minute_counts(compiled, sizes, members) for _, members in by_signature
+    ]
+
+    # Days matching the same signatures share their minute counts
+    patterns: dict[tuple[int, ...], tuple[list[int], list[tuple[int, int]]]] = {}
+    first = start.replace(second=0, microsecond=0)
+    if first < start:
+        first += timedelta(minutes=1)
+    last = end - timedelta(microseconds=1)
+    candidates: list[tuple[int, int, int, tuple[int, ...]]] = []
+    day = first.date()
+    while first < end and day <= last.date():
+        pattern = tuple(
+            i for i, (sig, _) in enumerate(by_signature) if _matches_date(sig, day)
+        )
+        if pattern not in patterns:
+            if len(pattern) == 1:
+                counts = sig_counts[pattern[0]]
+            elif pattern:
+                arrays = [sig_counts[i] for i in pattern]
+                counts = [sum(column) for column in zip(*arrays, strict=True)]
+            else:
+                counts = [0] * MINUTES_PER_DAY
+            patterns[pattern] = (counts, _top(counts, 0, MINUTES_PER_DAY, top))
+        counts, best = patterns[pattern]
+        lo = first.hour * 60 + first.minute if day == first.date() else 0
+        hi = MINUTES_PER_DAY
+        if day == last.date():
+            hi = last.hour * 60 + last.minute + 1
+        if lo or hi != MINUTES_PER_DAY:
+            best = _top(counts, lo, hi, top)
+        ordinal = day.toordinal()
+        candidates.extend((count, -ordinal, m, pattern) for count, m in best)
+        day += timedelta(days=1)
+
+    result: list[Collision[K]] = []
+    for count, neg_ordinal, neg_minute, pattern in heapq.nlargest(top, candidates):
+        hour, minute = divmod(-neg_minute, 60)
+        keys: list[K] = []
+        for i in pattern:
+            for g in by_signature[i][1]:
+                c = compiled[g]
+                if c.hour >> hour & 1 and c.minute >> minute & 1:
+                    keys.extend(groups[g])
+        day = date.fromordinal(-neg_ordinal)
+        time = datetime(day.year, day.month, day.day, hour, minute, tzinfo=start.tzinfo)
+        result.append(Collision(time, count, keys))
+    return result
+
+
+def _subsumed(compiled: list[CompiledSchedule]) -> list[tuple[int, int]]:
+    """
+    ``(i, j)`` pairs where every fire of ``compiled[i]`` is provably a fire
+    of ``compiled[j]``, judged field by field from bitset containment (a
+    sufficient condition, so a few contained pairs can go unreported).
+
+    Each group's candidates are found by intersecting bitmaps over all groups,
+    one per value of each field, so no pair is compared in Python. Each of
+    those bitmaps is ``n`` bits wide for ``n`` groups, so the total work is
+    still quadratic: O(n * v * n / w) for ``v`` set field values per group
+    and ``w``-bit machine words, plus the size of the output.
+    """
+    values: dict[str, list[list[int]]] = {
+        name: [[] for _ in range(width)] for name, (width, _) in _FIELDS.items()
+    }
+    full: dict[str, list[int]] = {name: [] for name in _FIELDS}
+    live: list[int] = []
+    # Groups matching a day if its day-of-month *or* its weekday matches
+    either: list[int] = []
+    # Groups restricted on both day-of-month and weekday
+    both: list[int] = []
+    for g, c in enumerate(compiled):
+        if not c.satisfiable:
+            continue
+        live.append(g)
+        for name, (_, all_bits) in _FIELDS.items():
+            mask = getattr(c, name)
+            if mask == all_bits:
+                full[name].append(g)
+            else:
+                for v in _set_bits(mask):
+                    values[name][v].append(g)
+        if c.day_or_weekday:
+            either.append(g)
+        elif c.day != _FIELDS["day"][1] or c.weekday != _FIELDS["weekday"][1]:
+            both.append(g)
+
+    full_bits = {name: _bitmap(full[name]) for name in _FIELDS}
+    containing = {
+        name: [_bitmap(groups) | full_bits[name] for groups in values[name]]
+        for name in _FIELDS
+    }
+    live_bits = _bitmap(live)
+    either_bits = _bitmap(either)
+    both_bits = _bitmap(both)
+
+    def supersets(c: CompiledSchedule, name: str) -> int:
+        """Groups whose ``name`` field contains that of ``c``."""
+        mask = getattr(c, name)
+        if mask == _FIELDS[name][1]:
+            return full_bits[name]
+        result = live_bits
+        for v in _set_bits(mask):
+            result &= containing[name][v]
+        return result
+
+    pairs: list[tuple[int, int]] = []
+    for g in live:
+        c = compiled[g]
+        candidates = live_bits & ~(1 << g)
+        for name in ("second", "minute", "hour", "month"):
+            candidates &= supersets(c, name)
+            if not candidates:
+                break
+        else:
+            day, weekday = supersets(c, "day"), supersets(c, "weekday")
+            if c.day_or_weekday:
+                # Both halves of the union have to be covered, and a group
+                # requiring day *and* weekday only covers it if unrestricted.
+                candidates &= day & weekday & ~both_bits
+            else:
+                # A day-or-weekday group covers the intersection as soon as
+                # either half is covered.
+                candidates &= (day & weekday) | ((day | weekday) & either_bits)
+        pairs.extend((g, j) for j in _set_bits(candidates))
+    return pairs
+
+
+def collisions[K](
+    schedules: Mapping[K, CronSchedule | CompiledSchedule]
+    | Iterable[tuple[K, CronSchedule | CompiledSchedule]],
+    window: tuple[datetime, datetime],
+    *,
+    top: int = 10,
+) -> CollisionReport[K]:
+    """
+    Find the minutes in ``window`` (``[start, end)``) at which the most
+    schedules fire together, and the schedules behind them.
+
+    Schedules are first grouped by their compiled bitmasks, so identical
+    schedules are handled once. Per-minute load is then computed from the
+    hour and minute bitsets of each group of schedules that share the same
+    day, month and weekday fields, and reused for every calendar day on
+    which the same groups match. No pair of schedules is ever compared
+    directly. Only minutes with at least two fires are reported.
+    """
+    start, end = window
+    items = schedules.items() if isinstance(schedules, Mapping) else schedules
+    by_compiled: dict[CompiledSchedule, list[K]] = {}
+    for key, schedule in items:
+        compiled = (
+            schedule.compile() if isinstance(schedule, CronSchedule) else schedule
+        )
+        by_compiled.setdefault(compiled, []).append(key)
+    ordered = sorted(by_compiled.items(), key=lambda item: -len(item[1]))
+    compiled_groups = [compiled for compiled, _ in ordered]
+    groups = [keys for _, keys in ordered]
+    return CollisionReport(
+        groups=groups,
+        subsumed=_subsumed(compiled_groups),
+        hottest=_hottest(compiled_groups, groups, start, end, top),
+    )
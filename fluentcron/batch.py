@@ -0,0 +1,137 @@
+"""
+Batch evaluation of a schedule against many timestamps at once
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Sequence
+from datetime import date, timedelta
+from itertools import repeat
+from operator import floordiv, mod, sub
+from typing import TYPE_CHECKING, Any, Protocol, cast, overload
+import calendar
+
+from .compiled import CompiledSchedule
+from .schedule import CronSchedule
+
+if TYPE_CHECKING:
+    from numpy.typing import NDArray
+    import numpy as np
+
+MINUTES_PER_DAY = 1440
+
+_EPOCH = date(1970, 1, 1)
+
+
+def _time_table(compiled: CompiledSchedule) -> bytes:
+    """One byte per minute of the day: 1 if the hour and minute both match."""
+    minutes = bytes((compiled.minute >> m) & 1 for m in range(60))
+    return b"".join(
+        minutes if (compiled.hour >> h) & 1 else bytes(60) for h in range(24)
+    )
+
+
+def _day_table(compiled: CompiledSchedule, first_day: int, last_day: int) -> bytes:
+    """
+    One byte per day in ``[first_day, last_day]`` (days since the epoch): 1 if
+    the day matches the day-of-month, month and weekday fields.
+    """
+    table = bytearray()
+    day = first_day
+    while day <= last_day:
+        current = _EPOCH + timedelta(days=day)
+        ndays = calendar.monthrange(current.year, current.month)[1]
+        stop = min(ndays, current.day + last_day - day)
+        if (compiled.month >> (current.month - 1)) & 1:
+            mask = compiled.day_mask(current.year, current.month)
+            table += bytes((mask >> d) & 1 for d in range(current.day - 1, stop))
+        else:
+            table += bytes(stop - current.day + 1)
+        day += stop - current.day + 1
+    return bytes(table)
+
+
+class _IntArray(Protocol):
+    """
+    Structural stand-in for an integer NumPy array, so that overloads stay
+    distinct whether or not NumPy's type information is available.
+    """
+
+    @property
+    def dtype(self) -> Any: ...
+
+    @property
+    def shape(self) -> tuple[int, ...]: ...
+
+
+def _is_ndarray(obj: object) -> bool:
+    return type(obj).__module__ == "numpy" and type(obj).__name__ == "ndarray"
+
+
+@overload
+def matches(
+    schedule: CronSchedule | CompiledSchedule, timestamps: _IntArray
+) -> NDArray[np.bool_]: ...
+
+
+@overload
+def matches(
+    schedule: CronSchedule | CompiledSchedule, timestamps: Iterable[int]
+) -> bytearray: ...
+
+
+def matches(
+    schedule: CronSchedule | CompiledSchedule,
+    timestamps: _IntArray | Iterable[int],
+) -> NDArray[np.bool_] | bytearray:
+    """
+    Evaluate ``schedule`` against every timestamp in ``timestamps``.
+
+    ``timestamps`` are UTC epoch minutes (``int(unix_seconds // 60)``), given
+    as an ``array('q')``, any other buffer/iterable of ints, or a NumPy integer
+    array. Returns a ``bytearray`` holding 1 for every matching timestamp and
+    0 otherwise, or a NumPy bool array when given a NumPy array.
+
+    Each timestamp is decomposed into a minute of the day and a day number;
+    both are checked through lookup tables built once per call, so there is no
+    per-timestamp Python code.
+    """
+    compiled = schedule.compile() if isinstance(schedule, CronSchedule) else schedule
+    if _is_ndarray(timestamps):
+        return _matches_numpy(compiled, cast("NDArray[np.integer[Any]]", timestamps))
+    iterable = cast("Iterable[int]", timestamps)
+    values = iterable if isinstance(iterable, Sequence) else list(iterable)
+    if not values:
+        return bytearray()
+    days = list(map(floordiv, values, repeat(MINUTES_PER_DAY)))
+    first_day = min(days)
+    time_table = _time_table(compiled)
+    day_table = _day_table(compiled, first_day, max(days))
+    time_ok = bytes(
+        map(time_table.__getitem__, map(mod, values, repeat(MINUTES_PER_DAY)))
+    )
+    day_ok = bytes(map(day_table.__getitem__, map(sub, days, repeat(first_day))))
+    # Every byte is 0 or 1, so a bitwise AND of the two buffers (as big ints)
+    # is an element-wise logical AND.
+    combined = int.from_bytes(time_ok) & int.from_bytes(day_ok)
+    return bytearray(combined.to_bytes(len(values)))
+
+
+def _matches_numpy(
+    compiled: CompiledSchedule, timestamps: NDArray[np.integer[Any]]
+) -> NDArray[np.bool_]:
+    import numpy as np
+
+    values = np.asarray(timestamps, dtype=np.int64)
+    if values.size == 0:
+        return np.zeros(values.shape, dtype=np.bool_)
+    days = values // MINUTES_PER_DAY
+    first_day = int(days.min())
+    time_table = np.frombuffer(_time_table(compiled), dtype=np.uint8).astype(np.bool_)
+    day_table = np.frombuffer(
+        _day_table(compiled, first_day, int(days.max())), dtype=np.uint8
+    ).astype(np.bool_)
+    result: NDArray[np.bool_] = (
+        time_table[values % MINUTES_PER_DAY] & day_table[days - first_day]
+    )
+    return result
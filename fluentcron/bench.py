@@ -0,0 +1,312 @@
+"""
+Benchmarks for the builder, rendering, parsing and evaluation hot paths.
+
+Run with::
+
+    python -m fluentcron.bench --sizes 1000 100000 --output bench.json
+
+Results are written as JSON so they can be compared between releases.
+"""
+
+from __future__ import annotations
+
+from array import array
+from collections.abc import Callable, Sequence
+from datetime import UTC, datetime, timedelta
+from importlib import metadata
+from typing import cast
+import argparse
+import hashlib
+import json
+import platform
+import sys
+import time
+
+from . import batch, bulk, shortcuts
+from .compiled import CompiledSchedule
+from .index import ScheduleIndex
+from .jitter import _hash_key
+from .parser import parse_expression
+from .runtime import _JobHeap
+from .schedule import CronSchedule, _jitter_offset
+from .stream import iter_fires
+from .types import (
+    DayOfMonth,
+    Hour,
+    HourInterval,
+    MinuteInterval,
+    WeekdayInt,
+)
+
+type Benchmark = Callable[[int], Callable[[], object]]
+
+_REFERENCE_TIME = datetime(2026, 3, 1, 12, 0)
+
+
+# The builder's parameters are Literal-typed; these map arbitrary ints onto them.
+def _hour(i: int) -> Hour:
+    return cast(Hour, i % 24)
+
+
+def _weekday(i: int) -> WeekdayInt:
+    return cast(WeekdayInt, i % 7)
+
+
+def _day(i: int) -> DayOfMonth:
+    return cast(DayOfMonth, i % 28 + 1)
+
+
+def _minute_interval(i: int) -> MinuteInterval:
+    return cast(MinuteInterval, 5 + i % 55)
+
+
+def _hour_interval(i: int) -> HourInterval:
+    return cast(HourInterval, 1 + i % 23)
+
+
+def _keys(size: int) -> list[str]:
+    return [f"tenant-{i % 997}/job-{i}" for i in range(size)]
+
+
+def _schedules(size: int) -> list[CronSchedule]:
+    """A realistic mix of builder-produced schedules."""
+    result: list[CronSchedule] = []
+    for i, key in enumerate(_keys(size)):
+        kind = i % 5
+        if kind == 0:
+            result.append(CronSchedule().daily().at(_hour(i), jitter=key))
+        elif kind == 1:
+            result.append(CronSchedule().weekly().on_weekday(_weekday(i)).at(_hour(i)))
+        elif kind == 2:
+            result.append(CronSchedule().monthly().on_day(_day(i)).at(_hour(i)))
+        elif kind == 3:
+            result.append(
+                CronSchedule().every_n_minutes(_minute_interval(i), jitter=key)
+            )
+        else:
+            result.append(CronSchedule().every_n_hours(_hour_interval(i), jitter=key))
+    return result
+
+
+def _bench_build(size: int) -> Callable[[], object]:
+    hours = [_hour(i) for i in range(size)]
+
+    def run() -> object:
+        return [CronSchedule().weekly().on_monday().at(hour, 30) for hour in hours]
+
+    return run
+
+
+def _bench_render(size: int) -> Callable[[], object]:
+    schedules = _schedules(size)
+    return lambda: [schedule.to_str() for schedule in schedules]
+
+
+def _bench_jitter(size: int) -> Callable[[], object]:
+    keys = _keys(size)
+
+    def run() -> object:
+        _hash_key.cache_clear()
+        return [_jitter_offset(key, 60) for key in keys]
+
+    return run
+
+
+def _bench_jitter_memoized(size: int) -> Callable[[], object]:
+    keys = _keys(size)
+    for key in keys:
+        _jitter_offset(key, 60)
+    return lambda: [_jitter_offset(key, 60) for key in keys]
+
+
+def _bench_shortcuts(size: int) -> Callable[[], object]:
+    keys = _keys(size)
+
+    def run() -> object:
+        return [
+            shortcuts.daily_at(_hour(i), jitter=key)
+            if i % 2
+            else shortcuts.weekly_on(_weekday(i), _hour(i), jitter=key)
+            for i, key in enumerate(keys)
+        ]
+
+    return run
+
+
+def _bench_compile_many(size: int) -> Callable[[], object]:
+    specs = [
+        ("daily_at", _hour(i), None, key)
+        if i % 2
+        else ("weekly_on", _weekday(i), _hour(i), None, key)
+        for i, key in enumerate(_keys(size))
+    ]
+    return lambda: list(bulk.compile_many(specs))
+
+
+def _bench_parse(size: int) -> Callable[[], object]:
+    texts = [str(schedule) for schedule in _schedules(size)]
+    parse = parse_expression.__wrapped__
+    return lambda: [parse(text) for text in texts]
+
+
+def _bench_parse_cached(size: int) -> Callable[[], object]:
+    texts = [str(schedule) for schedule in _schedules(size)]
+    return lambda: [CronSchedule.parse(text) for text in texts]
+
+
+def _bench_compile(size: int) -> Callable[[], object]:
+    schedules = _schedules(size)
+    return lambda: [CompiledSchedule(schedule) for schedule in schedules]
+
+
+def _bench_next_after(size: int) -> Callable[[], object]:
+    compiled = [schedule.compile() for schedule in _schedules(size)]
+    return lambda: [c.next_after(_REFERENCE_TIME) for c in compiled]
+
+
+def _bench_batch(size: int) -> Callable[[], object]:
+    start = int(_REFERENCE_TIME.replace(tzinfo=UTC).timestamp()) // 60
+    timestamps = array("q", range(start, start + size))
+    schedule = CronSchedule(minute="0,30", hour="9-17", weekday="1-5")
+    return lambda: batch.matches(schedule, timestamps)
+
+
+def _bench_index(size: int) -> Callable[[], object]:
+    index = ScheduleIndex(enumerate(_schedules(size)))
+    minutes = [_REFERENCE_TIME + timedelta(minutes=i) for i in range(60)]
+    return lambda: [index.due_at(minute) for minute in minutes]
+
+
+def _bench_iter_fires(size: int) -> Callable[[], object]:
+    schedules = list(enumerate(_schedules(size)))
+
+    def run() -> object:
+        fires = iter_fires(schedules, _REFERENCE_TIME)
+        return [next(fires) for _ in range(size)]
+
+    return run
+
+
+def _bench_dispatch(size: int) -> Callable[[], object]:
+    now = _REFERENCE_TIME
+    jobs: _JobHeap[None] = _JobHeap(lambda: now)
+    for _ in range(size):
+        jobs.add(CronSchedule(), None, None, size, None, False)
+    minutes = iter(range(1, 1 << 30))
+
+    def run() -> object:
+        # Every job is due each minute; pop one minute's worth of fires
+        return jobs.pop_due(now + timedelta(minutes=next(minutes)))
+
+    return run
+
+
+BENCHMARKS: dict[str, Benchmark] = {
+    "build": _bench_build,
+    "render": _bench_render,
+    "jitter_offset": _bench_jitter,
+    "jitter_offset_memoized": _bench_jitter_memoized,
+    "shortcuts": _bench_shortcuts,
+    "compile_many": _bench_compile_many,
+    "parse": _bench_parse,
+    "parse_cached": _bench_parse_cached,
+    "compile": _bench_compile,
+    "next_after": _bench_next_after,
+    "batch_matches": _bench_batch,
+    "index_due_at": _bench_index,
+    "iter_fires": _bench_iter_fires,
+    "runtime_dispatch": _bench_dispatch,
+}
+
+
+# Minutes of an hour, hours of a day, days of a week and minutes of a day
+_STABILITY_MODULI = (60, 24, 7, 1440)
+
+
+def check_jitter_stability(size: int) -> bool:
+    """
+    Check that jitter offsets, through the memoized ``_jitter_offset`` path
+    and the active strategy, still reproduce the original
+    ``int(sha256(key).hexdigest(), 16) % modulus`` for ``size`` keys.
+    """
+    for key in _keys(size):
+        expected = int(hashlib.sha256(key.encode("utf-8")).hexdigest(), 16)
+        for modulus in _STABILITY_MODULI:
+            if _jitter_offset(key, modulus) != expected % modulus:
+                return False
+    return True
+
+
+def run(
+    sizes: Sequence[int], repeat: int = 5, names: Sequence[str] | None = None
+) -> dict[str, object]:
+    """Run the selected benchmarks for every corpus size and return the report."""
+    results: list[dict[str, object]] = []
+    for name in names or list(BENCHMARKS):
+        for size in sizes:
+            func = BENCHMARKS[name](size)
+            timings: list[float] = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                func()
+                timings.append(time.perf_counter() - started)
+            best = min(timings)
+            results.append(
+                {
+                    "name": name,
+                    "size": size,
+                    "repeat": repeat,
+                    "best_s": best,
+                    "mean_s": sum(timings) / len(timings),
+                    "per_item_ns": best / size * 1e9,
+                }
+            )
+    try:
+        version = metadata.version("fluentcron")
+    except metadata.PackageNotFoundError:
+        version = "unknown"
+    return {
+        "fluentcron": version,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "jitter_stable": check_jitter_stability(max(sizes)),
+        "results": results,
+    }
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m fluentcron.bench",
+        description="Benchmark fluentcron's hot paths and report JSON timings.",
+    )
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=[1_000, 10_000, 100_000],
+        help="corpus sizes to run every benchmark with",
+    )
+    parser.add_argument("--repeat", type=int, default=5, help="runs per benchmark")
+    parser.add_argument(
+        "--only",
+        nargs="+",
+        choices=sorted(BENCHMARKS),
+        help="run only these benchmarks",
+    )
+    parser.add_argument(
+        "--output", "-o", help="write the JSON report here instead of stdout"
+    )
+    args = parser.parse_args(argv)
+    report = run(args.sizes, args.repeat, args.only)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        sys.stdout.write(text + "\n")
+    return 0 if report["jitter_stable"] else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,274 @@
+"""
+Compact binary format for keyed schedule sets, readable through mmap
+"""
+
+from __future__ import annotations
+
+from bisect import bisect_left
+from collections.abc import Iterable, Iterator, Mapping
+from datetime import datetime
+from typing import BinaryIO, Self
+import mmap
+import os
+import struct
+
+from .compiled import CompiledSchedule
+from .index import _set_bits
+from .schedule import CronSchedule
+
+# File layout (all integers little-endian):
+#
+#   header     magic, version, record count, string table size
+#   records    one fixed-width record per key, sorted by encoded key: the five
+#              field bitmasks, a flags byte and the key's (offset, length) in
+#              the string table
+#   bitmaps    for every field value, a bitmap over records of the records
+#              matching it (as in ScheduleIndex), plus one bitmap of the
+#              records whose day-of-month and weekday are OR-ed
+#   strings    the UTF-8 encoded keys, back to back
+MAGIC = b"FCRN"
+VERSION = 1
+
+_HEADER = struct.Struct("<4sHxxIQ")
+_RECORD = struct.Struct("<QIIHBBII")
+_FLAG_DAY_OR_WEEKDAY = 1
+
+_KEY_REF = struct.Struct("<II")
+_KEY_REF_OFFSET = _RECORD.size - _KEY_REF.size
+
+# Index of the first per-value bitmap of each field, in file order
+_MINUTE_BASE = 0
+_HOUR_BASE = 60
+_DAY_BASE = 84
+_MONTH_BASE = 115
+_WEEKDAY_BASE = 127
+_DAY_OR_WEEKDAY = 134
+_BITMAPS = 135
+
+
+def _stride(count: int) -> int:
+    """Bytes per bitmap, rounded up to a whole number of 8-byte words."""
+    return (count + 63) // 64 * 8
+
+
+def dumps(
+    schedules: Mapping[str, CronSchedule | CompiledSchedule]
+    | Iterable[tuple[str, CronSchedule | CompiledSchedule]],
+) -> bytes:
+    """
+    Serialize keyed schedules. Keys must be unique strings; records are
+    stored sorted by key so that readers can look keys up by bisection.
+    The format has minute resolution, so sub-minute schedules are rejected.
+    """
+    items = schedules.items() if isinstance(schedules, Mapping) else schedules
+    entries: dict[bytes, CompiledSchedule] = {}
+    for key, schedule in items:
+        encoded = key.encode("utf-8")
+        if encoded in entries:
+            raise ValueError(f"Duplicate schedule key: {key!r}")
+        compiled = (
+            schedule.compile() if isinstance(schedule, CronSchedule) else schedule
+        )
+        if compiled.sub_minute:
+            raise ValueError(f"Sub-minute schedules cannot be stored: {key!r}")
+        entries[encoded] = compiled
+    keys = sorted(entries)
+    count = len(keys)
+    stride = _stride(count)
+    records = bytearray(count * _RECORD.size)
+    bitmaps = bytearray(_BITMAPS * stride)
+    # Many keys share a schedule; decompose each distinct one into bitmap rows once
+    rows_by_compiled: dict[CompiledSchedule, list[int]] = {}
+    offset = 0
+    for i, key in enumerate(keys):
+        compiled = entries[key]
+        flags = _FLAG_DAY_OR_WEEKDAY if compiled.day_or_weekday else 0
+        _RECORD.pack_into(
+            records,
+            i * _RECORD.size,
+            compiled.minute,
+            compiled.hour,
+            compiled.day,
+            compiled.month,
+            compiled.weekday,
+            flags,
+            offset,
+            len(key),
+        )
+        offset += len(key)
+        rows = rows_by_compiled.get(compiled)
+        if rows is None:
+            rows = rows_by_compiled[compiled] = _rows(compiled)
+        byte, bit = divmod(i, 8)
+        for row in rows:
+            bitmaps[row * stride + byte] |= 1 << bit
+    header = _HEADER.pack(MAGIC, VERSION, count, offset)
+    return b"".join((header, records, bitmaps, *keys))
+
+
+def _rows(compiled: CompiledSchedule) -> list[int]:
+    """Indexes of the per-value bitmaps a compiled schedule belongs to."""
+    rows: list[int] = []
+    for base, mask in (
+        (_MINUTE_BASE, compiled.minute),
+        (_HOUR_BASE, compiled.hour),
+        (_DAY_BASE, compiled.day),
+        (_MONTH_BASE, compiled.month),
+        (_WEEKDAY_BASE, compiled.weekday),
+    ):
+        rows.extend(base + i for i in _set_bits(mask))
+    if compiled.day_or_weekday:
+        rows.append(_DAY_OR_WEEKDAY)
+    return rows
+
+
+def dump(
+    schedules: Mapping[str, CronSchedule | CompiledSchedule]
+    | Iterable[tuple[str, CronSchedule | CompiledSchedule]],
+    fp: BinaryIO,
+) -> None:
+    """Serialize keyed schedules to a binary file object. See :func:`dumps`."""
+    fp.write(dumps(schedules))
+
+
+def loads(data: bytes) -> ScheduleFile:
+    """Open serialized schedules held in memory."""
+    return ScheduleFile(data)
+
+
+def load(fp: BinaryIO) -> ScheduleFile:
+    """Read serialized schedules from a binary file object."""
+    return ScheduleFile(fp.read())
+
+
+class ScheduleFile(Mapping[str, CompiledSchedule]):
+    """
+    A read-only mapping from keys to compiled schedules, backed by the binary
+    format written by :func:`dump`.
+
+    Nothing is decoded up front: a key lookup bisects the sorted records,
+    a value is unpacked from its fixed-width record when accessed, and
+    ``due_at()`` intersects the stored per-value bitmaps like
+    :meth:`ScheduleIndex.due_at <fluentcron.ScheduleIndex.due_at>`. Opened
+    with :meth:`open`, the file is memory-mapped, so only the pages actually
+    touched are read in and they are shared between processes.
+    """
+
+    def __init__(self, data: bytes | mmap.mmap) -> None:
+        self._data = data
+        self._view = memoryview(data)
+        try:
+            self._count = self._check_header()
+        except ValueError:
+            self._view.release()
+            raise
+        self._stride = _stride(self._count)
+        self._bitmaps = _HEADER.size + self._count * _RECORD.size
+        self._strings = self._bitmaps + _BITMAPS * self._stride
+
+    def _check_header(self) -> int:
+        """Validate the header and overall size, and return the record count."""
+        if len(self._view) < _HEADER.size:
+            raise ValueError("Not a fluentcron schedule file")
+        magic, version, count, strings_size = _HEADER.unpack_from(self._view)
+        if magic != MAGIC:
+            raise ValueError("Not a fluentcron schedule file")
+        if version != VERSION:
+            raise ValueError(f"Unsupported schedule file version: {version}")
+        size = _HEADER.size + count * _RECORD.size + _BITMAPS * _stride(count)
+        if len(self._view) != size + strings_size:
+            raise ValueError("Truncated or corrupt schedule file")
+        return int(count)
+
+    @classmethod
+    def open(cls, path: str | os.PathLike[str]) -> Self:
+        """Memory-map the schedule file at ``path``."""
+        with open(path, "rb") as fp:
+            if os.fstat(fp.fileno()).st_size == 0:
+                raise ValueError("Not a fluentcron schedule file")
+            data = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            return cls(data)
+        except ValueError:
+            data.close()
+            raise
+
+    def close(self) -> None:
+        """Release the underlying buffer (unmapping the file, if mapped)."""
+        self._view.release()
+        if isinstance(self._data, mmap.mmap):
+            self._data.close()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __iter__(self) -> Iterator[str]:
+        for i in range(self._count):
+            yield self.key_at(i)
+
+    def __contains__(self, key: object) -> bool:
+        return isinstance(key, str) and self._find(key) >= 0
+
+    def __getitem__(self, key: str) -> CompiledSchedule:
+        i = self._find(key)
+        if i < 0:
+            raise KeyError(key)
+        return self.compiled_at(i)
+
+    def key_at(self, i: int) -> str:
+        """The key of the ``i``-th record (records are sorted by key)."""
+        return self._key_bytes(i).decode("utf-8")
+
+    def compiled_at(self, i: int) -> CompiledSchedule:
+        """The compiled schedule of the ``i``-th record."""
+        if not (0 <= i < self._count):
+            raise IndexError("record index out of range")
+        minute, hour, day, month, weekday, flags, _, _ = _RECORD.unpack_from(
+            self._view, _HEADER.size + i * _RECORD.size
+        )
+        return CompiledSchedule.from_masks(
+            minute, hour, day, month, weekday, bool(flags & _FLAG_DAY_OR_WEEKDAY)
+        )
+
+    def due_at(self, dt: datetime) -> list[str]:
+        """Return the keys of all schedules firing at the minute containing ``dt``."""
+        if not self._count:
+            return []
+        due = (
+            self._bitmap(_MINUTE_BASE + dt.minute)
+            & self._bitmap(_HOUR_BASE + dt.hour)
+            & self._bitmap(_MONTH_BASE + dt.month - 1)
+        )
+        if not due:
+            return []
+        dom = self._bitmap(_DAY_BASE + dt.day - 1)
+        dow = self._bitmap(_WEEKDAY_BASE + dt.isoweekday() % 7)
+        either = self._bitmap(_DAY_OR_WEEKDAY)
+        due &= (dom & dow) | ((dom | dow) & either)
+        return [self.key_at(i) for i in _set_bits(due)]
+
+    def _bitmap(self, row: int) -> int:
+        start = self._bitmaps + row * self._stride
+        return int.from_bytes(self._view[start : start + self._stride], "little")
+
+    def _key_bytes(self, i: int) -> bytes:
+        if not (0 <= i < self._count):
+            raise IndexError("record index out of range")
+        offset, length = _KEY_REF.unpack_from(
+            self._view, _HEADER.size + i * _RECORD.size + _KEY_REF_OFFSET
+        )
+        start = self._strings + offset
+        return bytes(self._view[start : start + length])
+
+    def _find(self, key: str) -> int:
+        encoded = key.encode("utf-8")
+        i = bisect_left(range(self._count), encoded, key=self._key_bytes)
+        if i < self._count and self._key_bytes(i) == encoded:
+            return i
+        return -1
@@ -0,0 +1,173 @@
+"""
+Bulk schedule compilation across a process pool
+"""
+
+from __future__ import annotations
+
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import Future, ProcessPoolExecutor
+from itertools import batched, chain, islice
+from typing import Any, Literal, overload
+import os
+import pickle
+
+from .compiled import CompiledSchedule
+from .jitter import JitterHash, get_jitter_hash, set_jitter_hash
+from .schedule import CronSchedule
+
+type Spec = tuple[Any, ...]
+type Output = Literal["str", "compiled"]
+
+
+def _daily_at(hour: Any, minute: Any = None, jitter: str | None = None) -> CronSchedule:
+    return CronSchedule().daily().at(hour, minute, jitter=jitter)
+
+
+def _weekly_on(
+    weekday: Any, hour: Any, minute: Any = None, jitter: str | None = None
+) -> CronSchedule:
+    return CronSchedule().weekly().on_weekday(weekday).at(hour, minute, jitter=jitter)
+
+
+def _monthly_on_day(
+    day: Any, hour: Any, minute: Any = None, jitter: str | None = None
+) -> CronSchedule:
+    return CronSchedule().monthly().on_day(day).at(hour, minute, jitter=jitter)
+
+
+def _every_n_minutes(n: Any, jitter: str | None = None) -> CronSchedule:
+    return CronSchedule().every_n_minutes(n, jitter=jitter)
+
+
+def _every_n_hours(n: Any, jitter: str | None = None) -> CronSchedule:
+    return CronSchedule().every_n_hours(n, jitter=jitter)
+
+
+# Spec tuples are ``(name, *args)``; the arguments mirror the shortcut of the
+# same name, with the keyword-only ``jitter`` as the optional last element.
+BUILDERS: dict[str, Callable[..., CronSchedule]] = {
+    "daily_at": _daily_at,
+    "weekly_on": _weekly_on,
+    "monthly_on_day": _monthly_on_day,
+    "every_n_minutes": _every_n_minutes,
+    "every_n_hours": _every_n_hours,
+}
+
+# Inputs shorter than this are compiled in-process; starting workers and
+# pickling chunks costs more than it saves.
+SERIAL_THRESHOLD = 20_000
+DEFAULT_CHUNKSIZE = 5_000
+
+
+def build(spec: Spec) -> CronSchedule:
+    """Build the schedule described by a spec tuple, e.g. ``("daily_at", 5)``."""
+    name, *args = spec
+    try:
+        builder = BUILDERS[name]
+    except KeyError:
+        raise ValueError(f"Unknown schedule spec: {name!r}") from None
+    return builder(*args)
+
+
+def _compile_chunk(
+    specs: tuple[Spec, ...], output: Output
+) -> list[str] | list[CompiledSchedule]:
+    if output == "compiled":
+        return [build(spec).compile() for spec in specs]
+    return [str(build(spec)) for spec in specs]
+
+
+@overload
+def compile_many(
+    specs: Iterable[Spec],
+    workers: int | None = ...,
+    *,
+    output: Literal["str"] = ...,
+    chunksize: int = ...,
+    serial_threshold: int = ...,
+) -> Iterator[str]: ...
+
+
+@overload
+def compile_many(
+    specs: Iterable[Spec],
+    workers: int | None = ...,
+    *,
+    output: Literal["compiled"],
+    chunksize: int = ...,
+    serial_threshold: int = ...,
+) -> Iterator[CompiledSchedule]: ...
+
+
+def compile_many(
+    specs: Iterable[Spec],
+    workers: int | None = None,
+    *,
+    output: Output = "str",
+    chunksize: int = DEFAULT_CHUNKSIZE,
+    serial_threshold: int = SERIAL_THRESHOLD,
+) -> Iterator[str] | Iterator[CompiledSchedule]:
+    """
+    Build, validate and render (``output="str"``) or compile
+    (``output="compiled"``) many spec tuples, yielding results in input order.
+
+    Specs are chunked across a :class:`~concurrent.futures.ProcessPoolExecutor`
+    with ``workers`` processes (default: CPU count). At most two chunks per
+    worker are in flight, so ``specs`` may be a lazy iterable of any length.
+    Inputs shorter than ``serial_threshold``, or ``workers=1``, are compiled
+    in-process, ``chunksize`` specs at a time. Workers use the caller's
+    jitter hash strategy; a custom strategy that cannot be pickled (e.g. a
+    lambda) cannot be sent to them, so specs are then compiled in-process as
+    well. Results and errors are identical to the serial path: the first
+    invalid spec raises its ``ValueError`` when its result is reached.
+    """
+    if output not in ("str", "compiled"):
+        raise ValueError(f"Invalid output: {output!r}")
+    if chunksize < 1:
+        raise ValueError("chunksize must be at least 1")
+    workers = workers or os.cpu_count() or 1
+    iterator = iter(specs)
+    head = tuple(islice(iterator, serial_threshold))
+    strategy = get_jitter_hash()
+    if workers == 1 or len(head) < serial_threshold or not _picklable(strategy):
+        return _serial(chain(head, iterator), output, chunksize)
+    return _parallel(chain(head, iterator), output, workers, chunksize, strategy)
+
+
+def _picklable(strategy: JitterHash) -> bool:
+    try:
+        pickle.dumps(strategy)
+    except (pickle.PicklingError, AttributeError, TypeError):
+        return False
+    return True
+
+
+def _serial(specs: Iterator[Spec], output: Output, chunksize: int) -> Iterator[Any]:
+    for chunk in batched(specs, chunksize):
+        yield from _compile_chunk(chunk, output)
+
+
+def _parallel(
+    specs: Iterator[Spec],
+    output: Output,
+    workers: int,
+    chunksize: int,
+    strategy: JitterHash,
+) -> Iterator[Any]:
+    # Spawned and forkserver workers start with the default strategy
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=set_jitter_hash, initargs=(strategy,)
+    ) as executor:
+        pending: deque[Future[list[str] | list[CompiledSchedule]]] = deque()
+        chunks = batched(specs, chunksize)
+        try:
+            for chunk in chunks:
+                pending.append(executor.submit(_compile_chunk, chunk, output))
+                if len(pending) >= 2 * workers:
+                    yield from pending.popleft().result()
+            while pending:
+                yield from pending.popleft().result()
+        finally:
+            for future in pending:
+                future.cancel()
@@ -0,0 +1,516 @@
+"""
+Compiled (bitmask) form of a cron schedule, used for fire-time evaluation
+"""
+
+from __future__ import annotations
+
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from itertools import pairwise
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .schedule import CronSchedule
+
+# (low, high) bounds of each cron field, in field order.
+SECOND_RANGE = (0, 59)
+MINUTE_RANGE = (0, 59)
+HOUR_RANGE = (0, 23)
+DAY_RANGE = (1, 31)
+MONTH_RANGE = (1, 12)
+WEEKDAY_RANGE = (0, 7)  # 7 is an alias for Sunday
+
+_ONE_MINUTE = timedelta(minutes=1)
+
+# Days per month in a common year. Kept here rather than using the calendar
+# module, which is comparatively slow to import.
+_MONTH_DAYS = (31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+
+
+@lru_cache(maxsize=16384)
+def _shared_mask(mask: int) -> int:
+    """
+    Return the first-seen int equal to ``mask``, so that a large population of
+    compiled schedules only pays for the (few) distinct mask values once.
+    Bounded like the parser cache; an evicted mask just stops being shared.
+    """
+    return mask
+
+
+def _field_mask(spec: str, low: int, high: int) -> int:
+    """
+    Convert one numeric cron field (``*``, ``5``, ``1-5``, ``*/15``, ``3/15``,
+    ``1,15``) into a bitmask where bit ``n - low`` is set for every value ``n``.
+    """
+    mask = 0
+    for part in spec.split(","):
+        rng, _, step_str = part.partition("/")
+        step = int(step_str) if step_str else 1
+        if step < 1:
+            raise ValueError(f"Invalid step in cron field: {spec!r}")
+        if rng == "*":
+            start, stop = low, high
+        else:
+            start_str, dash, stop_str = rng.partition("-")
+            start = int(start_str)
+            if dash:
+                stop = int(stop_str)
+            elif step_str:
+                # "3/15" means "starting at 3, every 15"
+                stop = high
+            else:
+                stop = start
+        if not (low <= start <= stop <= high):
+            raise ValueError(f"Value out of range in cron field: {spec!r}")
+        for value in range(start, stop + 1, step):
+            mask |= 1 << (value - low)
+    return _shared_mask(mask)
+
+
+def _fold_sunday(mask: int) -> int:
+    """Fold weekday bit 7 (Sunday) onto bit 0."""
+    return (mask | (mask >> 7)) & 0x7F
+
+
+def _render_mask(mask: int, low: int, high: int, *, weekday: bool = False) -> str:
+    """
+    Render a field bitmask (bit ``n - low`` for value ``n``) as the shortest
+    equivalent field: ``*``, ``*/n`` / ``a/n``, or a list of values and
+    ``a-b`` ranges. With ``weekday``, the mask is a folded weekday mask.
+    """
+    width = 7 if weekday else high - low + 1
+    if mask == (1 << width) - 1:
+        return "*"
+    values = [low + i for i in range(width) if mask >> i & 1]
+    candidates: list[str] = []
+    if len(values) >= 2:
+        step = values[1] - values[0]
+        if all(b - a == step for a, b in pairwise(values)):
+            if values[0] == low:
+                candidates.append(f"*/{step}")
+            else:
+                candidates.append(f"{values[0]}/{step}")
+    parts: list[str] = []
+    i = 0
+    while i < len(values):
+        j = i
+        while j + 1 < len(values) and values[j + 1] == values[j] + 1:
+            j += 1
+        if j - i >= 2:
+            parts.append(f"{values[i]}-{values[j]}")
+        else:
+            parts.extend(str(v) for v in values[i : j + 1])
+        i = j + 1
+    candidates.append(",".join(parts))
+    # Steps run to the end of the field's range; keep only exact renderings
+    result = ""
+    for candidate in candidates:
+        parsed = _field_mask(candidate, low, high)
+        if weekday:
+            parsed = _fold_sunday(parsed)
+        if parsed == mask and (not result or len(candidate) < len(result)):
+            result = candidate
+    return result
+
+
+def _next_bit(mask: int, i: int) -> int:
+    """Index of the lowest set bit at position >= i, or -1."""
+    rest = mask >> i
+    if not rest:
+        return -1
+    return i + (rest & -rest).bit_length() - 1
+
+
+def _prev_bit(mask: int, i: int) -> int:
+    """Index of the highest set bit at position <= i, or -1."""
+    if i < 0:
+        return -1
+    return (mask & ((2 << i) - 1)).bit_length() - 1
+
+
+class CompiledSchedule:
+    """
+    Per-field bitmasks for a :class:`CronSchedule`, plus the search routines
+    that find fire times by jumping field by field.
+
+    Bit layout: second bit ``s`` (0-59), minute bit ``m`` (0-59), hour bit
+    ``h`` (0-23), day bit ``d - 1`` (1-31), month bit ``m - 1`` (1-12),
+    weekday bit ``w`` (0-6, Sunday=0). Instances are immutable by convention
+    and use ``__slots__``; identical masks are shared between instances.
+
+    A second mask of ``1`` (second 0 only) is a classic minute-resolution
+    schedule, and is evaluated exactly as before seconds were supported:
+    ``matches()`` accepts any second of a matching minute. Any other second
+    mask makes the schedule sub-minute, and seconds are matched too.
+    """
+
+    __slots__ = (
+        "day",
+        "day_or_weekday",
+        "hour",
+        "minute",
+        "month",
+        "satisfiable",
+        "second",
+        "weekday",
+    )
+
+    second: int
+    minute: int
+    hour: int
+    day: int
+    month: int
+    weekday: int
+    day_or_weekday: bool
+    satisfiable: bool
+
+    def __init__(self, schedule: CronSchedule) -> None:
+        self.second = _field_mask(schedule.second, *SECOND_RANGE)
+        self.minute = _field_mask(schedule.minute, *MINUTE_RANGE)
+        self.hour = _field_mask(schedule.hour, *HOUR_RANGE)
+        self.day = _field_mask(schedule.day, *DAY_RANGE)
+        self.month = _field_mask(schedule.month, *MONTH_RANGE)
+        weekday = _field_mask(schedule.weekday, *WEEKDAY_RANGE)
+        # Fold 7 (Sunday) onto 0
+        weekday = _fold_sunday(weekday)
+        self.weekday = _shared_mask(weekday)
+        # Classic cron semantics: when both day-of-month and day-of-week are
+        # restricted, a day matches if *either* matches.
+        self.day_or_weekday = not (
+            schedule.day.startswith("*") or schedule.weekday.startswith("*")
+        )
+        self.satisfiable = self._is_satisfiable()
+
+    @classmethod
+    def from_masks(
+        cls,
+        minute: int,
+        hour: int,
+        day: int,
+        month: int,
+        weekday: int,
+        day_or_weekday: bool,
+        second: int = 1,
+    ) -> CompiledSchedule:
+        """
+        Build a compiled schedule directly from field bitmasks (laid out as
+        described above, with a 7-bit weekday mask), without parsing.
+        """
+        self = cls.__new__(cls)
+        self.second = _shared_mask(second)
+        self.minute = _shared_mask(minute)
+        self.hour = _shared_mask(hour)
+        self.day = _shared_mask(day)
+        self.month = _shared_mask(month)
+        self.weekday = _shared_mask(weekday)
+        self.day_or_weekday = day_or_weekday
+        self.satisfiable = self._is_satisfiable()
+        return self
+
+    def _is_satisfiable(self) -> bool:
+        # Masks built with from_masks() may be empty
+        if not (self.second and self.minute and self.hour and self.month):
+            return False
+        if self.day_or_weekday and self.weekday:
+            return True
+        if not (self.day_or_weekday or self.weekday):
+            return False
+        return any(
+            self.day & ((1 << _max_days(month)) - 1)
+            for month in range(1, 13)
+            if self.month >> (month - 1) & 1
+        )
+
+    def __repr__(self) -> str:
+        return (
+            f"CompiledSchedule(minute={self.minute:#x}, hour={self.hour:#x}, "
+            f"day={self.day:#x}, month={self.month:#x}, "
+            f"weekday={self.weekday:#x}, day_or_weekday={self.day_or_weekday}, "
+            f"second={self.second:#x})"
+        )
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, CompiledSchedule):
+            return NotImplemented
+        return self._key() == other._key()
+
+    def __hash__(self) -> int:
+        return hash(self._key())
+
+    def _key(self) -> tuple[int, int, int, int, int, int, bool]:
+        return (
+            self.second,
+            self.minute,
+            self.hour,
+            self.day,
+            self.month,
+            self.weekday,
+            self.day_or_weekday,
+        )
+
+    @property
+    def sub_minute(self) -> bool:
+        """Whether the schedule fires at seconds other than 0."""
+        return self.second != 1
+
+    def matches(self, dt: datetime) -> bool:
+        """
+        Whether the schedule fires at the minute containing ``dt`` (for
+        sub-minute schedules, at the second containing ``dt``).
+        """
+        if self.second != 1 and not self.second >> dt.second & 1:
+            return False
+        return self._matches_minute(dt)
+
+    def _matches_minute(self, dt: datetime) -> bool:
+        if not (
+            self.minute >> dt.minute & 1
+            and self.hour >> dt.hour & 1
+            and self.month >> (dt.month - 1) & 1
+        ):
+            return False
+        dom = self.day >> (dt.day - 1) & 1
+        dow = self.weekday >> (dt.isoweekday() % 7) & 1
+        if self.day_or_weekday:
+            return bool(dom | dow)
+        return bool(dom & dow)
+
+    def day_mask(self, year: int, month: int) -> int:
+        """Bitmask of the matching days (bit ``d - 1``) in the given month."""
+        ndays = _month_days(year, month)
+        # date.weekday() uses Monday=0; cron uses Sunday=0
+        shift = (date(year, month, 1).weekday() + 1) % 7
+        # Rotate the weekday mask so that bit k is the weekday of day k + 1,
+        # then tile it across the month.
+        rotated = ((self.weekday >> shift) | (self.weekday << (7 - shift))) & 0x7F
+        by_weekday = rotated | rotated << 7 | rotated << 14 | rotated << 21
+        by_weekday |= rotated << 28
+        if self.day_or_weekday:
+            days = self.day | by_weekday
+        else:
+            days = self.day & by_weekday
+        return days & ((1 << ndays) - 1)
+
+    def next_after(self, dt: datetime) -> datetime | None:
+        """Return the first fire time strictly after ``dt``."""
+        if not self.satisfiable:
+            return None
+        if self.second != 1 and self._matches_minute(dt):
+            s = _next_bit(self.second, dt.second + 1)
+            if s >= 0:
+                return dt.replace(second=s, microsecond=0)
+        start = dt.replace(second=0, microsecond=0)
+        try:
+            start += _ONE_MINUTE
+        except OverflowError:
+            return None
+        year, month, day = start.year, start.month, start.day
+        hour, minute = start.hour, start.minute
+        while year <= 9999:
+            m = _next_bit(self.month, month - 1)
+            if m < 0:
+                year, month, day, hour, minute = year + 1, 1, 1, 0, 0
+                continue
+            if m + 1 != month:
+                month, day, hour, minute = m + 1, 1, 0, 0
+            d = _next_bit(self.day_mask(year, month), day - 1)
+            if d < 0:
+                day, hour, minute = 1, 0, 0
+                month += 1
+                if month > 12:
+                    year, month = year + 1, 1
+                continue
+            if d + 1 != day:
+                day, hour, minute = d + 1, 0, 0
+            h = _next_bit(self.hour, hour)
+            if h < 0:
+                day, hour, minute = day + 1, 0, 0
+                continue
+            if h != hour:
+                hour, minute = h, 0
+            mi = _next_bit(self.minute, minute)
+            if mi < 0:
+                hour, minute = hour + 1, 0
+                continue
+            second = _next_bit(self.second, 0)
+            return datetime(year, month, day, hour, mi, second, tzinfo=dt.tzinfo)
+        return None
+
+    def prev_before(self, dt: datetime) -> datetime | None:
+        """Return the last fire time strictly before ``dt``."""
+        if not self.satisfiable:
+            return None
+        start = dt.replace(second=0, microsecond=0)
+        if self.second != 1:
+            if self._matches_minute(dt):
+                s = _prev_bit(self.second, dt.second - (dt.microsecond == 0))
+                if s >= 0:
+                    return dt.replace(second=s, microsecond=0)
+            # Fires in the minute containing ``dt`` are all ruled out
+            dt = start
+        if start == dt:
+            try:
+                start -= _ONE_MINUTE
+            except OverflowError:
+                return None
+        year, month, day = start.year, start.month, start.day
+        hour, minute = start.hour, start.minute
+        while year >= 1:
+            m = _prev_bit(self.month, month - 1)
+            if m < 0:
+                year, month, day, hour, minute = year - 1, 12, 31, 23, 59
+                continue
+            if m + 1 != month:
+                month, day, hour, minute = m + 1, 31, 23, 59
+            d = _prev_bit(self.day_mask(year, month), day - 1)
+            if d < 0:
+                day, hour, minute = 31, 23, 59
+                month -= 1
+                if month < 1:
+                    year, month = year - 1, 12
+                continue
+            if d + 1 != day:
+                day, hour, minute = d + 1, 23, 59
+            h = _prev_bit(self.hour, hour)
+            if h < 0:
+                day, hour, minute = day - 1, 23, 59
+                continue
+            if h != hour:
+                hour, minute = h, 59
+            mi = _prev_bit(self.minute, minute)
+            if mi < 0:
+                hour, minute = hour - 1, 59
+                continue
+            second = self.second.bit_length() - 1
+            return datetime(year, month, day, hour, mi, second, tzinfo=dt.tzinfo)
+        return None
+
+    def fires_per_day(self) -> int:
+        """Number of fires on each matching day."""
+        return self.hour.bit_count() * self.minute.bit_count() * self.second.bit_count()
+
+    def _fires_before(self, second_of_day: int) -> int:
+        """Fires on a matching day strictly before the given second (0-86400)."""
+        hour, rest = divmod(second_of_day, 3600)
+        minute, second = divmod(rest, 60)
+        per_minute = self.second.bit_count()
+        per_hour = self.minute.bit_count() * per_minute
+        count = (self.hour & ((1 << hour) - 1)).bit_count() * per_hour
+        if self.hour >> hour & 1:
+            count += (self.minute & ((1 << minute) - 1)).bit_count() * per_minute
+            if self.minute >> minute & 1:
+                count += (self.second & ((1 << second) - 1)).bit_count()
+        return count
+
+    def _days_before(self, day: date) -> int:
+        """Matching days from January 1st of ``day.year`` up to ``day``."""
+        count = 0
+        for month in range(1, day.month):
+            if self.month >> (month - 1) & 1:
+                count += self.day_mask(day.year, month).bit_count()
+        if self.month >> (day.month - 1) & 1:
+            mask = self.day_mask(day.year, day.month)
+            count += (mask & ((1 << (day.day - 1)) - 1)).bit_count()
+        return count
+
+    def _days_in_years(self, first: int, last: int) -> int:
+        """Matching days in the years ``first`` up to (not including) ``last``."""
+        # A year's count only depends on whether it is a leap year and on the
+        # weekday it starts on, and the Gregorian calendar repeats every 400
+        # years, so long spans cost at most 400 lookups.
+        by_kind: dict[tuple[bool, int], int] = {}
+
+        def year_days(year: int) -> int:
+            kind = (_isleap(year), date(year, 1, 1).weekday())
+            if kind not in by_kind:
+                by_kind[kind] = sum(
+                    self.day_mask(year, month).bit_count()
+                    for month in range(1, 13)
+                    if self.month >> (month - 1) & 1
+                )
+            return by_kind[kind]
+
+        cycles, rest = divmod(last - first, 400)
+        count = 0
+        if cycles:
+            count = cycles * sum(year_days(first + i) for i in range(400))
+        # Years 400 apart share a kind, so the remainder can be counted at the
+        # start of the span (which also stays inside datetime's year range).
+        return count + sum(year_days(first + i) for i in range(rest))
+
+    def count_between(self, start: datetime, end: datetime) -> int:
+        """
+        Number of fire times in ``[start, end)``, counted from the field
+        bitmasks without enumerating them. Like :meth:`next_after`, the
+        datetimes are read as wall-clock times.
+        """
+        if end <= start:
+            return 0
+        start_second = start.hour * 3600 + start.minute * 60 + start.second
+        start_second += bool(start.microsecond)
+        end_second = end.hour * 3600 + end.minute * 60 + end.second
+        end_second += bool(end.microsecond)
+        first, last = start.date(), end.date()
+        days = (
+            self._days_in_years(first.year, last.year)
+            + self._days_before(last)
+            - self._days_before(first)
+        )
+        count = days * self.fires_per_day()
+        if self._matches_day(first):
+            count -= self._fires_before(start_second)
+        if self._matches_day(last):
+            count += self._fires_before(end_second)
+        return count
+
+    def _matches_day(self, day: date) -> bool:
+        if not self.month >> (day.month - 1) & 1:
+            return False
+        return bool(self.day_mask(day.year, day.month) >> (day.day - 1) & 1)
+
+    def fires_per_day_histogram(self, start: date, end: date) -> list[int]:
+        """
+        Number of fires on each calendar day in ``[start, end)``, one entry
+        per day, computed a month at a time from the day masks.
+        """
+        result: list[int] = []
+        per_day = self.fires_per_day()
+        day = start
+        while day < end:
+            ndays = _month_days(day.year, day.month)
+            take = min(ndays - day.day + 1, (end - day).days)
+            if self.month >> (day.month - 1) & 1:
+                mask = self.day_mask(day.year, day.month) >> (day.day - 1)
+                result.extend(per_day * (mask >> i & 1) for i in range(take))
+            else:
+                result.extend([0] * take)
+            if take < ndays - day.day + 1:
+                break
+            day = (
+                date(day.year + 1, 1, 1)
+                if day.month == 12
+                else date(day.year, day.month + 1, 1)
+            )
+        return result
+
+
+def _max_days(month: int) -> int:
+    """Longest possible length of the given month (Feb counts as 29)."""
+    return _month_days(2000, month)
+
+
+def _isleap(year: int) -> bool:
+    return year % 4 == 0 and (year % 100 != 0 or year % 400 == 0)
+
+
+def _month_days(year: int, month: int) -> int:
+    """Number of days in the given month."""
+    if month == 2 and _isleap(year):
+        return 29
+    return _MONTH_DAYS[month - 1]
+
+
+@lru_cache(maxsize=4096)
+def compile_schedule(schedule: CronSchedule) -> CompiledSchedule:
+    """Compile a schedule into its bitmask form (cached per schedule)."""
+    return CompiledSchedule(schedule)
@@ -0,0 +1,273 @@
+"""
+Precomputed fire-time tables over a sliding horizon
+"""
+
+from __future__ import annotations
+
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from collections.abc import Iterator
+from datetime import date, datetime, timedelta
+from typing import NamedTuple
+import threading
+
+from .compiled import CompiledSchedule
+from .index import _set_bits
+from .schedule import CronSchedule
+
+MINUTES_PER_DAY = 1440
+
+_EPOCH = datetime(1970, 1, 1)
+_EPOCH_ORDINAL = _EPOCH.toordinal()
+_ONE_MINUTE = timedelta(minutes=1)
+_EPSILON = timedelta(microseconds=1)
+# array("I") holds unsigned 32-bit epoch minutes, enough for every datetime
+# from 1970 on
+_MAX_MINUTE = (datetime.max - _EPOCH) // _ONE_MINUTE
+# Sentinel for schedules that have no entry yet
+_MISSING = array("I")
+
+
+class CalendarStats(NamedTuple):
+    """Counters describing a :class:`CalendarCache`."""
+
+    hits: int
+    misses: int
+    fallbacks: int
+    evictions: int
+    tables: int
+    bytes: int
+
+
+def _epoch_minute(dt: datetime) -> int:
+    """Wall-clock minutes since 1970-01-01 00:00, ignoring seconds and tzinfo."""
+    days = dt.toordinal() - _EPOCH_ORDINAL
+    return days * MINUTES_PER_DAY + dt.hour * 60 + dt.minute
+
+
+def _from_epoch_minute(minute: int, like: datetime) -> datetime:
+    result = _EPOCH + _ONE_MINUTE * minute
+    if like.tzinfo is not None:
+        result = result.replace(tzinfo=like.tzinfo)
+    return result
+
+
+def _fire_minutes(compiled: CompiledSchedule, first: int, last: int) -> array[int]:
+    """The epoch minutes in ``[first, last)`` at which ``compiled`` fires."""
+    times = [
+        hour * 60 + minute
+        for hour in _set_bits(compiled.hour)
+        for minute in _set_bits(compiled.minute)
+    ]
+    table = array("I")
+    day = first // MINUTES_PER_DAY
+    while day * MINUTES_PER_DAY < last:
+        current = date.fromordinal(_EPOCH_ORDINAL + day)
+        if compiled._matches_day(current):
+            base = day * MINUTES_PER_DAY
+            if first <= base and base + MINUTES_PER_DAY <= last:
+                table.extend([base + t for t in times])
+            else:
+                table.extend([base + t for t in times if first <= base + t < last])
+        day += 1
+    return table
+
+
+class CalendarCache:
+    """
+    Next-fire lookups answered from precomputed tables.
+
+    For each distinct schedule looked up, the fire times within the current
+    horizon ``[start, start + horizon)`` are materialized once into a sorted
+    ``array("I")`` of epoch minutes, so ``next_after()`` is a bisect.
+    :meth:`advance` slides the horizon forward, trimming expired fires from
+    each table and appending only the newly covered span.
+
+    Tables are kept in least-recently-used order and evicted once they take
+    more than ``max_bytes``. Sub-minute schedules and schedules firing fewer
+    than ``min_fires`` times in the horizon are not tabulated; they, and
+    lookups outside the horizon, fall back to
+    :meth:`CompiledSchedule.next_after`. Like ``next_after``, datetimes are
+    read as wall-clock times and ``tzinfo`` is carried over.
+    """
+
+    def __init__(
+        self,
+        start: datetime,
+        horizon: timedelta = timedelta(days=7),
+        *,
+        max_bytes: int = 64 * 1024 * 1024,
+        min_fires: int = 2,
+    ) -> None:
+        if horizon < _ONE_MINUTE:
+            raise ValueError("horizon must be at least one minute")
+        if max_bytes < 0:
+            raise ValueError("max_bytes must not be negative")
+        self._span = horizon // _ONE_MINUTE
+        self.max_bytes = max_bytes
+        self.min_fires = min_fires
+        # None marks a schedule too sparse to be worth a table
+        self._tables: OrderedDict[CompiledSchedule, array[int] | None] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._fallbacks = 0
+        self._evictions = 0
+        self._first = self._last = 0
+        self._set_window(_epoch_minute(start))
+
+    @property
+    def start(self) -> datetime:
+        """Start of the horizon (inclusive)."""
+        return _EPOCH + _ONE_MINUTE * self._first
+
+    @property
+    def end(self) -> datetime:
+        """End of the horizon (exclusive)."""
+        return _EPOCH + _ONE_MINUTE * self._last
+
+    def _set_window(self, first: int) -> None:
+        if first < 0:
+            raise ValueError("CalendarCache cannot start before 1970")
+        self._first = first
+        self._last = min(first + self._span, _MAX_MINUTE)
+
+    def advance(self, start: datetime) -> None:
+        """
+        Move the horizon to begin at ``start``. Moving forward trims and
+        extends the existing tables; moving backward discards them.
+        """
+        first = _epoch_minute(start)
+        with self._lock:
+            if first < self._first:
+                self._set_window(first)
+                self._tables.clear()
+                self._bytes = 0
+                return
+            old_last = self._last
+            self._set_window(first)
+            self._bytes = 0
+            for compiled, table in list(self._tables.items()):
+                if table is None:
+                    # Re-evaluated for the new horizon on next use
+                    del self._tables[compiled]
+                    continue
+                del table[: bisect_left(table, first)]
+                table.extend(_fire_minutes(compiled, max(old_last, first), self._last))
+                self._bytes += _size(table)
+            self._evict()
+
+    def table(self, schedule: CronSchedule | CompiledSchedule) -> array[int] | None:
+        """
+        The fire times of ``schedule`` within the horizon as epoch minutes,
+        or ``None`` if the schedule is too sparse (or too large) to tabulate.
+        """
+        compiled = (
+            schedule.compile() if isinstance(schedule, CronSchedule) else schedule
+        )
+        with self._lock:
+            return self._table(compiled)
+
+    def _table(self, compiled: CompiledSchedule) -> array[int] | None:
+        table = self._tables.get(compiled, _MISSING)
+        if table is not _MISSING:
+            self._tables.move_to_end(compiled)
+            return table
+        self._misses += 1
+        table = None
+        # Tables hold whole minutes, so sub-minute schedules always fall back
+        if (
+            not compiled.sub_minute
+            and compiled.count_between(self.start, self.end) >= self.min_fires
+        ):
+            table = _fire_minutes(compiled, self._first, self._last)
+            if _size(table) > self.max_bytes:
+                table = None
+        self._tables[compiled] = table
+        if table is not None:
+            self._bytes += _size(table)
+            self._evict()
+        return table
+
+    def _evict(self) -> None:
+        while self._bytes > self.max_bytes:
+            _, table = self._tables.popitem(last=False)
+            if table is not None:
+                self._bytes -= _size(table)
+                self._evictions += 1
+
+    def next_after(
+        self, schedule: CronSchedule | CompiledSchedule, dt: datetime
+    ) -> datetime | None:
+        """Return the first fire time strictly after ``dt``."""
+        compiled = (
+            schedule.compile() if isinstance(schedule, CronSchedule) else schedule
+        )
+        minute = _epoch_minute(dt)
+        with self._lock:
+            if self._first - 1 <= minute < self._last:
+                table = self._table(compiled)
+                if table is not None:
+                    i = bisect_right(table, minute)
+                    if i < len(table):
+                        self._hits += 1
+                        return _from_epoch_minute(table[i], dt)
+                    # Nothing left in the horizon: continue from its end
+                    dt = _from_epoch_minute(self._last - 1, dt)
+            self._fallbacks += 1
+        return compiled.next_after(dt)
+
+    def iter_fires(
+        self, schedule: CronSchedule | CompiledSchedule, start: datetime
+    ) -> Iterator[datetime]:
+        """
+        Yield the fire times of ``schedule`` at or after ``start``, walking the
+        table while inside the horizon and computing fires beyond it.
+        """
+        compiled = (
+            schedule.compile() if isinstance(schedule, CronSchedule) else schedule
+        )
+        minute = _epoch_minute(start) + bool(start.second or start.microsecond)
+        with self._lock:
+            inside = self._first <= minute < self._last
+            table = self._table(compiled) if inside else None
+            # Snapshot along with the horizon end, so that advance() can
+            # update the table while the fires are being consumed
+            if table is not None:
+                table = table[bisect_left(table, minute) :]
+            last = self._last
+        if table is not None:
+            for fire in table:
+                yield _from_epoch_minute(fire, start)
+            fire_time = compiled.next_after(
+                _from_epoch_minute(max(minute, last) - 1, start)
+            )
+        else:
+            fire_time = compiled.next_after(start - _EPSILON)
+        while fire_time is not None:
+            yield fire_time
+            fire_time = compiled.next_after(fire_time)
+
+    def stats(self) -> CalendarStats:
+        """Return hit/miss/fallback/eviction counters and the memory in use."""
+        return CalendarStats(
+            hits=self._hits,
+            misses=self._misses,
+            fallbacks=self._fallbacks,
+            evictions=self._evictions,
+            tables=sum(table is not None for table in self._tables.values()),
+            bytes=self._bytes,
+        )
+
+    def clear(self) -> None:
+        """Drop every table and reset the counters."""
+        with self._lock:
+            self._tables.clear()
+            self._bytes = 0
+            self._hits = self._misses = self._fallbacks = self._evictions = 0
+
+
+def _size(table: array[int]) -> int:
+    return len(table) * table.itemsize
@@ -0,0 +1,167 @@
+"""
+Index answering "which schedules fire at minute T" over large schedule sets
+"""
+
+from __future__ import annotations
+
+from collections.abc import Hashable, Iterable, Iterator, Mapping
+from datetime import datetime
+
+from .compiled import CompiledSchedule
+from .schedule import CronSchedule
+
+
+def _set_bits(mask: int) -> Iterator[int]:
+    """Yield the positions of the set bits in ``mask``, lowest first."""
+    # bin() and str.find() both run in C, so this costs O(bits) for the
+    # conversion plus O(1) per match, instead of O(bits) per match.
+    digits = bin(mask)[:1:-1]
+    i = digits.find("1")
+    while i >= 0:
+        yield i
+        i = digits.find("1", i + 1)
+
+
+class ScheduleIndex[K: Hashable]:
+    """
+    A mutable collection of keyed schedules that can quickly report which of
+    them are due at a given minute.
+
+    Schedules are bucketed by their compiled bitmasks: every distinct
+    :class:`CompiledSchedule` gets a slot, and for every value of every field
+    the index keeps a bitmap of the slots matching that value. ``due_at()``
+    intersects five of those bitmaps and only touches the slots that match,
+    so it scales with the number of distinct schedules (divided by the word
+    size) plus the number of matches, rather than with the number of keys.
+    """
+
+    def __init__(
+        self,
+        schedules: Mapping[K, CronSchedule | CompiledSchedule]
+        | Iterable[tuple[K, CronSchedule | CompiledSchedule]] = (),
+    ) -> None:
+        self._capacity = 0  # in bytes per bitmap
+        self._minute = [bytearray() for _ in range(60)]
+        self._hour = [bytearray() for _ in range(24)]
+        self._day = [bytearray() for _ in range(31)]
+        self._month = [bytearray() for _ in range(12)]
+        self._weekday = [bytearray() for _ in range(7)]
+        self._day_or_weekday = bytearray()
+        self._bitmaps = [
+            *self._minute,
+            *self._hour,
+            *self._day,
+            *self._month,
+            *self._weekday,
+            self._day_or_weekday,
+        ]
+        self._slots: dict[CompiledSchedule, int] = {}
+        self._buckets: list[dict[K, None]] = []
+        self._free: list[int] = []
+        self._keys: dict[K, CompiledSchedule] = {}
+        items = schedules.items() if isinstance(schedules, Mapping) else schedules
+        for key, schedule in items:
+            self.add(key, schedule)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._keys
+
+    def __iter__(self) -> Iterator[K]:
+        return iter(self._keys)
+
+    def add(self, key: K, schedule: CronSchedule | CompiledSchedule) -> None:
+        """Add ``key`` with the given schedule, replacing any existing entry."""
+        compiled = (
+            schedule.compile() if isinstance(schedule, CronSchedule) else schedule
+        )
+        if key in self._keys:
+            if self._keys[key] == compiled:
+                return
+            self.remove(key)
+        slot = self._slots.get(compiled)
+        if slot is None:
+            slot = self._allocate(compiled)
+        self._buckets[slot][key] = None
+        self._keys[key] = compiled
+
+    def remove(self, key: K) -> None:
+        """Remove ``key``. Raises ``KeyError`` if it is not in the index."""
+        compiled = self._keys.pop(key)
+        slot = self._slots[compiled]
+        bucket = self._buckets[slot]
+        del bucket[key]
+        if not bucket:
+            self._release(slot, compiled)
+
+    def discard(self, key: K) -> None:
+        """Remove ``key`` if it is present."""
+        if key in self._keys:
+            self.remove(key)
+
+    def get(self, key: K) -> CompiledSchedule | None:
+        """Return the compiled schedule stored for ``key``, if any."""
+        return self._keys.get(key)
+
+    def due_at(self, dt: datetime) -> list[K]:
+        """Return the keys of all schedules firing at the minute containing ``dt``."""
+        if not self._keys:
+            return []
+        due = (
+            int.from_bytes(self._minute[dt.minute], "little")
+            & int.from_bytes(self._hour[dt.hour], "little")
+            & int.from_bytes(self._month[dt.month - 1], "little")
+        )
+        if not due:
+            return []
+        dom = int.from_bytes(self._day[dt.day - 1], "little")
+        dow = int.from_bytes(self._weekday[dt.isoweekday() % 7], "little")
+        either = int.from_bytes(self._day_or_weekday, "little")
+        due &= (dom & dow) | ((dom | dow) & either)
+        result: list[K] = []
+        for slot in _set_bits(due):
+            result.extend(self._buckets[slot])
+        return result
+
+    def _allocate(self, compiled: CompiledSchedule) -> int:
+        if self._free:
+            slot = self._free.pop()
+            self._buckets[slot] = {}
+        else:
+            slot = len(self._buckets)
+            self._buckets.append({})
+            if slot >= self._capacity * 8:
+                grow = max(self._capacity, 8)
+                for bitmap in self._bitmaps:
+                    bitmap.extend(bytes(grow))
+                self._capacity += grow
+        self._slots[compiled] = slot
+        self._write(slot, compiled, True)
+        return slot
+
+    def _release(self, slot: int, compiled: CompiledSchedule) -> None:
+        self._write(slot, compiled, False)
+        del self._slots[compiled]
+        self._free.append(slot)
+
+    def _write(self, slot: int, compiled: CompiledSchedule, value: bool) -> None:
+        byte, bit = divmod(slot, 8)
+        for bitmaps, mask in (
+            (self._minute, compiled.minute),
+            (self._hour, compiled.hour),
+            (self._day, compiled.day),
+            (self._month, compiled.month),
+            (self._weekday, compiled.weekday),
+        ):
+            for i in _set_bits(mask):
+                if value:
+                    bitmaps[i][byte] |= 1 << bit
+                else:
+                    bitmaps[i][byte] &= ~(1 << bit) & 0xFF
+        if compiled.day_or_weekday:
+            if value:
+                self._day_or_weekday[byte] |= 1 << bit
+            else:
+                self._day_or_weekday[byte] &= ~(1 << bit) & 0xFF
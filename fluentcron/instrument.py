@@ -0,0 +1,232 @@
+"""
+Opt-in timing and cache statistics for the schedule hot paths.
+
+Usage::
+
+    from fluentcron import instrument
+
+    instrument.enable()
+    ...
+    metrics_agent.send(instrument.snapshot())
+
+Nothing is instrumented until :func:`enable` is called: it swaps timing
+wrappers in for the instrumented functions, and :func:`disable` puts the
+originals back, so a disabled registry costs nothing on those paths.
+Callers that took a reference to an instrumented function (or a bound
+``next_after`` method) before ``enable()`` keep calling the original.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from functools import wraps
+from time import perf_counter
+import threading
+
+from . import jitter, parser
+from .compiled import CompiledSchedule, compile_schedule
+from .interning import default_pool
+from .schedule import CronSchedule, _canonical, _render_values
+
+type Callback = Callable[[str, float], None]
+type _Cached = Callable[..., object]
+
+_BUILDERS = (
+    "at",
+    "at_hours",
+    "between_hours",
+    "every_n_seconds",
+    "every_n_minutes",
+    "every_n_hours",
+    "every_n_hours_within",
+    "daily",
+    "weekly",
+    "monthly",
+    "on_day",
+    "on_days",
+    "in_months",
+    "on_monday",
+    "on_tuesday",
+    "on_wednesday",
+    "on_thursday",
+    "on_friday",
+    "on_saturday",
+    "on_sunday",
+    "on_weekday",
+    "on_weekdays",
+)
+
+# (owner, attribute, metric) of every instrumented function
+_TARGETS: tuple[tuple[object, str, str], ...] = (
+    *((CronSchedule, name, "build") for name in _BUILDERS),
+    (CronSchedule, "__str__", "render"),
+    (CronSchedule, "to_str", "render"),
+    (parser, "parse_expression", "parse"),
+    (jitter, "_hash_key", "jitter_hash"),
+    (CompiledSchedule, "next_after", "next_fire"),
+    (CompiledSchedule, "prev_before", "prev_fire"),
+)
+METRICS = ("build", "render", "parse", "jitter_hash", "next_fire", "prev_fire")
+
+# The memoized functions whose hit rates are reported, captured before any
+# of them is wrapped
+_CACHES: dict[str, _Cached] = {
+    "parse": parser.parse_expression,
+    "compile": compile_schedule,
+    "canonical": _canonical,
+    "render": _render_values,
+    "jitter_hash": jitter._hash_key,
+}
+
+
+class _Timing:
+    __slots__ = ("calls", "max", "total")
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.total = 0.0
+        self.max = 0.0
+
+
+_lock = threading.Lock()
+# Nesting depth per metric and thread, so that a builder calling another
+# builder (or to_str() calling __str__) is timed once
+_depth = threading.local()
+_originals: dict[tuple[object, str], object] = {}
+_timings = {metric: _Timing() for metric in METRICS}
+# Copied on write, so that recording can iterate without holding the lock
+_callbacks: tuple[Callback, ...] = ()
+
+
+def _cache_counts() -> dict[str, tuple[int, int]]:
+    counts: dict[str, tuple[int, int]] = {}
+    for name, cached in _CACHES.items():
+        info = cached.cache_info()  # type: ignore[attr-defined]
+        counts[name] = (info.hits, info.misses)
+    stats = default_pool.stats()
+    counts["intern"] = (stats.hits, stats.misses)
+    return counts
+
+
+# (hits, misses) of each cache at import or the last reset()
+_baseline = _cache_counts()
+
+
+def _record(metric: str, elapsed: float) -> None:
+    with _lock:
+        timing = _timings[metric]
+        timing.calls += 1
+        timing.total += elapsed
+        timing.max = max(timing.max, elapsed)
+    for callback in _callbacks:
+        callback(metric, elapsed)
+
+
+def _timed[**P, R](func: Callable[P, R], metric: str) -> Callable[P, R]:
+    @wraps(func)
+    def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
+        if getattr(_depth, metric, 0):
+            return func(*args, **kwargs)
+        setattr(_depth, metric, 1)
+        start = perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            elapsed = perf_counter() - start
+            setattr(_depth, metric, 0)
+            _record(metric, elapsed)
+
+    return wrapper
+
+
+def is_enabled() -> bool:
+    """Whether the instrumented functions are currently wrapped."""
+    return bool(_originals)
+
+
+def enable() -> None:
+    """Start timing the instrumented functions. Does nothing if already enabled."""
+    with _lock:
+        if _originals:
+            return
+        for owner, name, metric in _TARGETS:
+            original = vars(owner)[name]
+            _originals[owner, name] = original
+            setattr(owner, name, _timed(original, metric))
+
+
+def disable() -> None:
+    """Restore the original functions. Recorded statistics are kept."""
+    with _lock:
+        for (owner, name), original in _originals.items():
+            setattr(owner, name, original)
+        _originals.clear()
+
+
+def reset() -> None:
+    """Clear the timings and start counting cache hits afresh."""
+    with _lock:
+        for metric in METRICS:
+            _timings[metric] = _Timing()
+        _baseline.update(_cache_counts())
+
+
+def add_callback(callback: Callback) -> None:
+    """
+    Call ``callback(metric, seconds)`` after every timed call, on the thread
+    that made it. ``metric`` is one of :data:`METRICS`.
+    """
+    global _callbacks
+    with _lock:
+        _callbacks = (*_callbacks, callback)
+
+
+def remove_callback(callback: Callback) -> None:
+    """Stop calling a callback registered with :func:`add_callback`."""
+    global _callbacks
+    with _lock:
+        if callback not in _callbacks:
+            raise ValueError("Callback is not registered")
+        callbacks = list(_callbacks)
+        callbacks.remove(callback)
+        _callbacks = tuple(callbacks)
+
+
+def snapshot() -> dict[str, object]:
+    """
+    Return the statistics as plain, JSON-serializable dicts::
+
+        {
+            "enabled": True,
+            "timings": {"parse": {"calls", "total", "mean", "max"}, ...},
+            "caches": {"parse": {"hits", "misses", "hit_rate"}, ...},
+        }
+
+    Times are in seconds. Timings cover calls made while enabled; cache
+    counts cover every lookup since the last :func:`reset` (or since this
+    module was imported).
+    """
+    with _lock:
+        timings = {
+            metric: {
+                "calls": timing.calls,
+                "total": timing.total,
+                "mean": timing.total / timing.calls if timing.calls else 0.0,
+                "max": timing.max,
+            }
+            for metric, timing in _timings.items()
+        }
+        counts = _cache_counts()
+        caches: dict[str, dict[str, float]] = {}
+        for name, (hits, misses) in counts.items():
+            base_hits, base_misses = _baseline.get(name, (0, 0))
+            # The intern pool's counters can be reset independently
+            hits = max(hits - base_hits, 0)
+            misses = max(misses - base_misses, 0)
+            total = hits + misses
+            caches[name] = {
+                "hits": hits,
+                "misses": misses,
+                "hit_rate": hits / total if total else 0.0,
+            }
+        return {"enabled": bool(_originals), "timings": timings, "caches": caches}
@@ -0,0 +1,141 @@
+"""
+Opt-in flyweight cache of canonical CronSchedule instances
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from collections.abc import Iterable
+from typing import TYPE_CHECKING, NamedTuple
+import threading
+
+from .compiled import CompiledSchedule, compile_schedule
+
+if TYPE_CHECKING:
+    from .schedule import CronSchedule
+
+
+class InternStats(NamedTuple):
+    """Counters describing a :class:`SchedulePool`."""
+
+    hits: int
+    misses: int
+    evictions: int
+    size: int
+    maxsize: int
+
+
+class _Entry:
+    __slots__ = ("compiled", "schedule", "text")
+
+    def __init__(self, schedule: CronSchedule) -> None:
+        self.schedule = schedule
+        self.text: str | None = None
+        self.compiled: CompiledSchedule | None = None
+
+
+class SchedulePool:
+    """
+    A bounded, least-recently-used pool of canonical schedules.
+
+    Equal schedules looked up through the same pool resolve to one shared
+    instance, and the pool memoizes each instance's rendered string and
+    compiled form. When the pool is full the least recently used entry is
+    evicted.
+    """
+
+    def __init__(self, maxsize: int = 4096) -> None:
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self.maxsize = maxsize
+        self._entries: OrderedDict[CronSchedule, _Entry] = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, schedule: object) -> bool:
+        return schedule in self._entries
+
+    def _entry(self, schedule: CronSchedule) -> _Entry:
+        with self._lock:
+            entry = self._entries.get(schedule)
+            if entry is not None:
+                self._hits += 1
+                self._entries.move_to_end(schedule)
+                return entry
+            self._misses += 1
+            entry = self._entries[schedule] = _Entry(schedule)
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+            return entry
+
+    def intern(self, schedule: CronSchedule) -> CronSchedule:
+        """Return the pool's canonical instance equal to ``schedule``."""
+        return self._entry(schedule).schedule
+
+    def render(self, schedule: CronSchedule) -> str:
+        """Return ``str(schedule)``, memoized."""
+        entry = self._entry(schedule)
+        if entry.text is None:
+            entry.text = str(entry.schedule)
+        return entry.text
+
+    def compile(self, schedule: CronSchedule) -> CompiledSchedule:
+        """Return the compiled form of ``schedule``, memoized."""
+        entry = self._entry(schedule)
+        if entry.compiled is None:
+            entry.compiled = compile_schedule(entry.schedule)
+        return entry.compiled
+
+    def stats(self) -> InternStats:
+        """Return hit/miss/eviction counters and the current size."""
+        return InternStats(
+            hits=self._hits,
+            misses=self._misses,
+            evictions=self._evictions,
+            size=len(self._entries),
+            maxsize=self.maxsize,
+        )
+
+    def clear(self) -> None:
+        """Drop every entry and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self._hits = self._misses = self._evictions = 0
+
+
+#: The pool used by :meth:`CronSchedule.intern`.
+default_pool = SchedulePool()
+
+
+def dedupe(schedules: Iterable[CronSchedule]) -> tuple[list[CronSchedule], list[int]]:
+    """
+    Collapse ``schedules`` into their distinct canonical forms.
+
+    Returns ``(uniques, index)`` where ``uniques`` holds each distinct
+    :meth:`~fluentcron.CronSchedule.canonical` schedule once, in order of
+    first appearance, and ``index[i]`` is the position in ``uniques`` of the
+    ``i``-th input. Evaluate ``uniques`` once and fan results back out with
+    ``index``.
+    """
+    uniques: list[CronSchedule] = []
+    index: list[int] = []
+    by_canonical: dict[CronSchedule, int] = {}
+    # Inputs usually repeat verbatim; skip canonicalizing those again
+    by_schedule: dict[CronSchedule, int] = {}
+    for schedule in schedules:
+        slot = by_schedule.get(schedule)
+        if slot is None:
+            canonical = schedule.canonical()
+            slot = by_canonical.get(canonical)
+            if slot is None:
+                slot = by_canonical[canonical] = len(uniques)
+                uniques.append(canonical)
+            by_schedule[schedule] = slot
+        index.append(slot)
+    return uniques, index
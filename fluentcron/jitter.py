@@ -0,0 +1,72 @@
+"""
+Hash strategies used to turn jitter strings into deterministic offsets
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from functools import lru_cache
+from typing import Literal
+
+type JitterHash = Callable[[bytes], int]
+type JitterHashName = Literal["sha256", "blake2b"]
+
+
+def sha256_hash(data: bytes) -> int:
+    """
+    SHA-256 of ``data`` as a big-endian integer. This is the default strategy
+    and produces the same offsets as every previous release.
+    """
+    import hashlib  # Deferred: only needed once jitter is actually used
+
+    return int.from_bytes(hashlib.sha256(data).digest())
+
+
+def blake2b_hash(data: bytes) -> int:
+    """
+    64-bit BLAKE2b of ``data``. Faster than SHA-256, but produces different
+    offsets, so switching to it moves every jittered schedule once.
+    """
+    import hashlib
+
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest())
+
+
+HASH_STRATEGIES: dict[JitterHashName, JitterHash] = {
+    "sha256": sha256_hash,
+    "blake2b": blake2b_hash,
+}
+
+_strategy: JitterHash = sha256_hash
+
+
+@lru_cache(maxsize=65536)
+def _hash_key(jitter: str, strategy: JitterHash) -> int:
+    return strategy(jitter.encode("utf-8"))
+
+
+def get_jitter_hash() -> JitterHash:
+    """Return the hash strategy currently used for jitter."""
+    return _strategy
+
+
+def set_jitter_hash(strategy: JitterHashName | JitterHash) -> None:
+    """
+    Select the hash strategy used for jitter, either by name (``"sha256"``,
+    ``"blake2b"``) or as a callable mapping bytes to a non-negative int.
+    """
+    global _strategy
+    if isinstance(strategy, str):
+        if strategy not in HASH_STRATEGIES:
+            raise ValueError(f"Unknown jitter hash strategy: {strategy!r}")
+        strategy = HASH_STRATEGIES[strategy]
+    _strategy = strategy
+
+
+def jitter_offset(jitter: str, modulus: int) -> int:
+    """
+    Deterministically map ``jitter`` to an offset in ``[0, modulus)``. Hashes
+    are memoized per key, so the same key can be reduced by several moduli
+    for the cost of one hash.
+    """
+    return _hash_key(jitter, _strategy) % modulus
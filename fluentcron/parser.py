@@ -0,0 +1,177 @@
+"""
+Cron expression parser
+"""
+
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import NamedTuple
+
+from .schedule import WEEKDAY_MAPPING, CronSchedule
+
+MONTH_MAPPING: dict[str, int] = {
+    "jan": 1,
+    "feb": 2,
+    "mar": 3,
+    "apr": 4,
+    "may": 5,
+    "jun": 6,
+    "jul": 7,
+    "aug": 8,
+    "sep": 9,
+    "oct": 10,
+    "nov": 11,
+    "dec": 12,
+    "january": 1,
+    "february": 2,
+    "march": 3,
+    "april": 4,
+    "june": 6,
+    "july": 7,
+    "august": 8,
+    "september": 9,
+    "october": 10,
+    "november": 11,
+    "december": 12,
+}
+
+MACROS: dict[str, CronSchedule] = {
+    "@yearly": CronSchedule(minute="0", hour="0", day="1", month="1"),
+    "@annually": CronSchedule(minute="0", hour="0", day="1", month="1"),
+    "@monthly": CronSchedule(minute="0", hour="0", day="1"),
+    "@weekly": CronSchedule(minute="0", hour="0", weekday="0"),
+    "@daily": CronSchedule(minute="0", hour="0"),
+    "@midnight": CronSchedule(minute="0", hour="0"),
+    "@hourly": CronSchedule(minute="0"),
+}
+
+
+class _Field(NamedTuple):
+    label: str
+    low: int
+    high: int
+    range_error: str
+    names: dict[str, int] | None = None
+
+
+_SECOND_FIELD = _Field("Second", 0, 59, "Second must be between 0 and 59")
+
+_FIELDS = (
+    _Field("Minute", 0, 59, "Minute must be between 0 and 59"),
+    _Field("Hour", 0, 23, "Hour must be between 0 and 23"),
+    _Field("Day", 1, 31, "Day must be between 1 and 31"),
+    _Field("Month", 1, 12, "Month must be between 1 and 12", MONTH_MAPPING),
+    _Field(
+        "Weekday",
+        0,
+        7,  # 7 is accepted as an alias for Sunday
+        "Weekday must be between 0 (Sunday) and 6 (Saturday)",
+        {name.lower(): value for name, value in WEEKDAY_MAPPING.items()},
+    ),
+)
+
+
+def _read_value(text: str, pos: int, field: _Field) -> tuple[int, int]:
+    """Read a number (or a name, for month/weekday) starting at ``pos``."""
+    end = pos
+    n = len(text)
+    if end < n and text[end].isdigit():
+        while end < n and text[end].isdigit():
+            end += 1
+        value = int(text[pos:end])
+    elif end < n and text[end].isalpha() and field.names is not None:
+        while end < n and text[end].isalpha():
+            end += 1
+        name = text[pos:end].lower()
+        if name not in field.names:
+            raise ValueError(f"Invalid {field.label.lower()} name: {text[pos:end]!r}")
+        value = field.names[name]
+    else:
+        raise ValueError(f"Invalid {field.label.lower()} field at position {pos}")
+    if not (field.low <= value <= field.high):
+        raise ValueError(field.range_error)
+    return value, end
+
+
+def _read_field(text: str, pos: int, field: _Field) -> tuple[str, int]:
+    """
+    Read one whitespace-delimited field starting at ``pos``, returning its
+    normalized form (names replaced by numbers) and the position after it.
+    """
+    n = len(text)
+    parts: list[str] = []
+    while True:
+        if pos < n and text[pos] == "*":
+            part = "*"
+            pos += 1
+        else:
+            start, pos = _read_value(text, pos, field)
+            part = str(start)
+            if pos < n and text[pos] == "-":
+                stop, pos = _read_value(text, pos + 1, field)
+                if stop < start:
+                    raise ValueError(
+                        f"Invalid range in {field.label.lower()} field: {start}-{stop}"
+                    )
+                part = f"{start}-{stop}"
+        if pos < n and text[pos] == "/":
+            end = pos + 1
+            while end < n and text[end].isdigit():
+                end += 1
+            if end == pos + 1:
+                raise ValueError(f"Missing step in {field.label.lower()} field")
+            step = int(text[pos + 1 : end])
+            if not (1 <= step <= field.high):
+                raise ValueError(
+                    f"{field.label} step must be between 1 and {field.high}"
+                )
+            part = f"{part}/{step}"
+            pos = end
+        parts.append(part)
+        if pos < n and text[pos] == ",":
+            pos += 1
+            continue
+        if pos < n and not text[pos].isspace():
+            raise ValueError(
+                f"Unexpected character {text[pos]!r} in {field.label.lower()} field"
+            )
+        return ",".join(parts), pos
+
+
+@lru_cache(maxsize=16384)
+def parse_expression(expr: str) -> CronSchedule:
+    """
+    Parse a cron expression string into a :class:`CronSchedule`.
+
+    Supports lists (``1,15``), ranges (``1-5``), steps (``*/15``, ``3/15``,
+    ``9-17/2``), month and weekday names (``jan``, ``mon-fri``) and the
+    ``@yearly``/``@annually``, ``@monthly``, ``@weekly``, ``@daily``/``@midnight``
+    and ``@hourly`` macros. Names are normalized to numbers. An expression
+    with six fields starts with a seconds field. Results are cached by
+    expression text.
+    """
+    text = expr.strip()
+    if text.startswith("@"):
+        macro = MACROS.get(text.lower())
+        if macro is None:
+            raise ValueError(f"Unsupported cron macro: {text!r}")
+        return macro
+    layout = _FIELDS if len(text.split()) != 6 else (_SECOND_FIELD, *_FIELDS)
+    fields: list[str] = []
+    pos = 0
+    n = len(text)
+    while True:
+        while pos < n and text[pos].isspace():
+            pos += 1
+        if pos == n:
+            break
+        if len(fields) == len(layout):
+            raise ValueError("Cron expression must have 5 or 6 fields")
+        value, pos = _read_field(text, pos, layout[len(fields)])
+        fields.append(value)
+    if len(fields) != len(layout):
+        raise ValueError("Cron expression must have 5 or 6 fields")
+    if len(fields) == 6:
+        second, minute, hour, day, month, weekday = fields
+        return CronSchedule(minute, hour, day, month, weekday, second)
+    return CronSchedule(*fields)
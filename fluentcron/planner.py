@@ -0,0 +1,235 @@
+"""
+Load-aware jitter planning across a fleet of jobs
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Iterator, Mapping
+from functools import lru_cache
+
+from .compiled import HOUR_RANGE, _field_mask
+from .schedule import CronSchedule, _jitter_offset
+
+MINUTES_PER_DAY = 1440
+
+
+def _period(minute: str) -> int:
+    """
+    The spacing of the minute field that jitter chooses an offset within:
+    ``*/n`` and ``a/n`` (``a < n``) jitter within ``n`` minutes, ``*`` cannot
+    be jittered, and a single minute jitters within the hour. Other minute
+    fields (lists, ranges, stepped ranges) are rejected, as replacing them
+    with a jittered ``offset/n`` or single minute would change their fires.
+    """
+    if minute == "*":
+        return 1
+    start, slash, step = minute.partition("/")
+    if not slash:
+        if minute.isdigit():
+            return 60
+    elif step.isdigit() and (
+        start == "*" or start.isdigit() and int(start) < int(step)
+    ):
+        return int(step)
+    raise ValueError(
+        f"Cannot jitter minute field {minute!r}: "
+        "expected '*', '*/n', 'a/n' or a single minute"
+    )
+
+
+@lru_cache(maxsize=1024)
+def _spans(hour_mask: int, period: int) -> tuple[tuple[int, int], ...]:
+    """
+    The (start, stop) minutes of the day of each run of hours in the mask.
+    Consecutive hours share a run when the minute step lines up across
+    them. A job's fires at an offset are ``start + offset:stop:period``.
+    """
+    spans: list[tuple[int, int]] = []
+    for hour in range(24):
+        if not hour_mask >> hour & 1:
+            continue
+        start = hour * 60
+        if spans and spans[-1][1] == start and 60 % period == 0:
+            spans[-1] = (spans[-1][0], start + 60)
+        else:
+            spans.append((start, start + 60))
+    return tuple(spans)
+
+
+class _Job:
+    __slots__ = ("base", "hour_mask", "offset", "period", "spans")
+
+    def __init__(self, base: CronSchedule) -> None:
+        self.base = base
+        self.period = _period(base.minute)
+        self.hour_mask = _field_mask(base.hour, *HOUR_RANGE)
+        self.spans = _spans(self.hour_mask, self.period)
+        self.offset = 0
+
+    def fires_at(self, minute: int) -> bool:
+        """Whether this job fires at the given minute of the day."""
+        hour, minute = divmod(minute, 60)
+        return (
+            bool(self.hour_mask >> hour & 1)
+            and minute >= self.offset
+            and (minute - self.offset) % self.period == 0
+        )
+
+    def schedule(self) -> CronSchedule:
+        if self.period == 1:
+            return self.base
+        if self.period == 60:
+            return self.base._replace(minute=str(self.offset))
+        return self.base._replace(minute=f"{self.offset}/{self.period}")
+
+
+class JitterPlanner:
+    """
+    Assign jitter offsets to a set of jobs so that the peak number of jobs
+    firing in the same minute of the day is as low as possible.
+
+    Each job starts from the offset hash jitter would give it (the same one
+    ``at(..., jitter=key)`` / ``every_n_minutes(..., jitter=key)`` produce)
+    and is placed at the offset that minimizes the resulting peak load,
+    preferring offsets closest to its hashed one. Jobs given to the
+    constructor are placed in hash order, so the plan does not depend on the
+    order they were listed in.
+
+    Adding a job never moves an existing job. Removing one moves at most one
+    other job, from the busiest minute into the freed capacity.
+
+    The base schedule's minute field determines what gets jittered: a fixed
+    minute (``CronSchedule().daily().at(12)``) becomes a minute of the hour,
+    ``*/n`` becomes ``offset/n``, and ``*`` is left untouched. Bases with any
+    other minute field (``0,30``, ``10-20``, ``5-50/15``) raise ``ValueError``.
+    Day, month and weekday fields are ignored when estimating load.
+    """
+
+    def __init__(
+        self,
+        jobs: Mapping[str, CronSchedule] | Iterable[tuple[str, CronSchedule]] = (),
+    ) -> None:
+        self._jobs: dict[str, _Job] = {}
+        self._load = [0] * MINUTES_PER_DAY
+        # Placed jobs by (period, offset), in placement order
+        self._placed: dict[tuple[int, int], dict[_Job, None]] = {}
+        items = jobs.items() if isinstance(jobs, Mapping) else jobs
+        pending = sorted(
+            (_jitter_offset(key, 1 << 32), key, base) for key, base in items
+        )
+        for _, key, base in pending:
+            self.add(key, base)
+
+    def __len__(self) -> int:
+        return len(self._jobs)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._jobs
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._jobs)
+
+    def add(self, key: str, base: CronSchedule) -> CronSchedule:
+        """Place a new job and return its jittered schedule."""
+        job = _Job(base)
+        if key in self._jobs:
+            self.remove(key)
+        self._jobs[key] = job
+        self._place(key, job)
+        return job.schedule()
+
+    def remove(self, key: str) -> None:
+        """Remove a job. Raises ``KeyError`` if it is not planned."""
+        job = self._jobs.pop(key)
+        self._apply(job, job.offset, -1)
+        self._rebalance_one()
+
+    def offset(self, key: str) -> int:
+        """Return the offset assigned to ``key``."""
+        return self._jobs[key].offset
+
+    def schedule(self, key: str) -> CronSchedule:
+        """Return the jittered schedule assigned to ``key``."""
+        return self._jobs[key].schedule()
+
+    def schedules(self) -> dict[str, CronSchedule]:
+        """Return every job's jittered schedule."""
+        return {key: job.schedule() for key, job in self._jobs.items()}
+
+    def load_histogram(self) -> list[int]:
+        """Return the number of jobs firing in each minute of the day (1440 entries)."""
+        return list(self._load)
+
+    def peak(self) -> int:
+        """Return the highest per-minute load."""
+        return max(self._load)
+
+    def _apply(self, job: _Job, offset: int, delta: int) -> None:
+        load, period = self._load, job.period
+        for start, stop in job.spans:
+            fires = slice(start + offset, stop, period)
+            load[fires] = [count + delta for count in load[fires]]
+        placed = self._placed.setdefault((job.period, offset), {})
+        if delta > 0:
+            placed[job] = None
+        else:
+            del placed[job]
+            if not placed:
+                del self._placed[job.period, offset]
+
+    def _peak_at(self, job: _Job, offset: int) -> int:
+        load, period = self._load, job.period
+        return max(
+            max(load[start + offset : stop : period]) for start, stop in job.spans
+        )
+
+    def _firing(self, minute: int) -> Iterator[_Job]:
+        """The jobs firing at the given minute of the day."""
+        minute_of_hour = minute % 60
+        for (period, offset), jobs in self._placed.items():
+            if minute_of_hour >= offset and (minute_of_hour - offset) % period == 0:
+                yield from (job for job in jobs if job.fires_at(minute))
+
+    def _place(self, key: str, job: _Job) -> None:
+        preferred = _jitter_offset(key, job.period)
+        best, best_peak = preferred, self._peak_at(job, preferred)
+        for i in range(1, job.period):
+            if best_peak == 0:
+                break
+            offset = (preferred + i) % job.period
+            peak = self._peak_at(job, offset)
+            if peak < best_peak:
+                best, best_peak = offset, peak
+        job.offset = best
+        self._apply(job, best, 1)
+
+    def _rebalance_one(self) -> None:
+        """Move one job out of the busiest minute if that lowers its load."""
+        if not self._jobs:
+            return
+        load = self._load
+        hottest = max(range(MINUTES_PER_DAY), key=load.__getitem__)
+        # Without the job itself, its busiest minute is the hottest one, one
+        # lower. Its other offsets fire at disjoint minutes, so their peaks
+        # need not discount it.
+        current = load[hottest] - 1
+        # Jobs with the same hours, period and offset would all stay put
+        stuck: set[tuple[int, int, int]] = set()
+        for job in self._firing(hottest):
+            shape = (job.hour_mask, job.period, job.offset)
+            if shape in stuck:
+                continue
+            best, best_peak = job.offset, current
+            for offset in range(job.period):
+                if offset == job.offset:
+                    continue
+                peak = self._peak_at(job, offset)
+                if peak < best_peak:
+                    best, best_peak = offset, peak
+            if best != job.offset:
+                # Moving changes the index being iterated, so stop here
+                self._apply(job, job.offset, -1)
+                job.offset = best
+                self._apply(job, best, 1)
+                return
+            stuck.add(shape)
@@ -0,0 +1,503 @@
+"""
+Runtimes that run callbacks when their schedules fire
+"""
+
+from __future__ import annotations
+
+from collections import deque
+from collections.abc import Awaitable, Callable, Hashable
+from concurrent.futures import ThreadPoolExecutor
+from datetime import UTC, datetime, timedelta
+from functools import partial
+from typing import TYPE_CHECKING, NamedTuple, Self
+import asyncio
+import heapq
+import itertools
+import logging
+import threading
+
+if TYPE_CHECKING:
+    from types import TracebackType
+
+    from .schedule import CronSchedule
+    from .tz import ZonedSchedule
+
+type Trigger = CronSchedule | ZonedSchedule
+type Clock = Callable[[], datetime]
+
+logger = logging.getLogger(__name__)
+
+
+class SchedulerStats(NamedTuple):
+    """Dispatch counters of a scheduler runtime; lags are in seconds."""
+
+    jobs: int
+    dispatched: int
+    skipped: int
+    misfired: int
+    errors: int
+    lag_mean: float
+    lag_max: float
+
+
+def utcnow() -> datetime:
+    """The default scheduler clock: the current time as an aware UTC datetime."""
+    return datetime.now(UTC)
+
+
+class _Job[F]:
+    __slots__ = (
+        "coalesce",
+        "func",
+        "id",
+        "max_instances",
+        "misfire_grace",
+        "next_after",
+        "removed",
+        "running",
+    )
+
+    def __init__(
+        self,
+        job_id: Hashable,
+        trigger: Trigger,
+        func: F,
+        max_instances: int,
+        misfire_grace: float | None,
+        coalesce: bool,
+    ) -> None:
+        from .schedule import CronSchedule
+
+        self.id = job_id
+        self.func = func
+        self.max_instances = max_instances
+        self.coalesce = coalesce
+        self.misfire_grace = (
+            None if misfire_grace is None else timedelta(seconds=misfire_grace)
+        )
+        # Plain schedules are evaluated through their compiled form directly
+        self.next_after: Callable[[datetime], datetime | None] = (
+            trigger.compile().next_after
+            if isinstance(trigger, CronSchedule)
+            else trigger.next_after
+        )
+        self.removed = False
+        self.running = 0
+
+
+class _JobHeap[F]:
+    """
+    Jobs ordered by their next fire time, shared by the scheduler runtimes.
+    Only the dispatcher touches the heap, so job evaluation never contends
+    with running callbacks.
+    """
+
+    def __init__(self, clock: Clock) -> None:
+        self.clock = clock
+        self.jobs: dict[Hashable, _Job[F]] = {}
+        self._heap: list[tuple[datetime, int, _Job[F]]] = []
+        self._seq = itertools.count()
+        self._ids = itertools.count(1)
+        self.dispatched = 0
+        self.skipped = 0
+        self.misfired = 0
+        self.errors = 0
+        self._lag_total = 0.0
+        self._lag_max = 0.0
+
+    def add(
+        self,
+        trigger: Trigger,
+        func: F,
+        job_id: Hashable | None,
+        max_instances: int,
+        misfire_grace: float | None,
+        coalesce: bool,
+    ) -> _Job[F]:
+        if max_instances < 1:
+            raise ValueError("max_instances must be at least 1")
+        if misfire_grace is not None and misfire_grace < 0:
+            raise ValueError("misfire_grace must not be negative")
+        if job_id is None:
+            job_id = next(self._ids)
+            while job_id in self.jobs:
+                job_id = next(self._ids)
+        elif job_id in self.jobs:
+            raise ValueError(f"Duplicate job id: {job_id!r}")
+        job = _Job(job_id, trigger, func, max_instances, misfire_grace, coalesce)
+        self.jobs[job_id] = job
+        self._push(job, job.next_after(self.clock()))
+        return job
+
+    def remove(self, job_id: Hashable) -> None:
+        """Remove a job. Raises ``KeyError`` if it is not registered."""
+        self.jobs.pop(job_id).removed = True
+
+    def _push(self, job: _Job[F], fire: datetime | None) -> None:
+        if fire is not None:
+            heapq.heappush(self._heap, (fire, next(self._seq), job))
+
+    def next_fire(self) -> datetime | None:
+        """The earliest pending fire time, or ``None`` if nothing is pending."""
+        heap = self._heap
+        while heap and heap[0][2].removed:
+            heapq.heappop(heap)
+        return heap[0][0] if heap else None
+
+    def pop_due(self, now: datetime) -> list[tuple[_Job[F], datetime]]:
+        """
+        Pop every fire due at ``now`` and reschedule its job. Returns the
+        ``(job, fire)`` pairs to run, with ``job.running`` already reserved.
+        Fires later than the job's misfire grace, or over its
+        ``max_instances``, are counted and dropped; a coalescing job runs once
+        for all of its fires that are due.
+        """
+        heap = self._heap
+        due: list[tuple[_Job[F], datetime]] = []
+        seq = self._seq
+        while heap and heap[0][0] <= now:
+            fire, _, job = heap[0]
+            if job.removed:
+                heapq.heappop(heap)
+                continue
+            lag = now - fire
+            grace = job.misfire_grace
+            misfired = grace is not None and lag > grace
+            if grace is not None and misfired:
+                # Jump past every fire that is also out of grace
+                following = job.next_after(now - grace)
+            else:
+                following = job.next_after(fire)
+                if job.coalesce and following is not None and following <= now:
+                    # Run once for all the fires that are already due
+                    following = job.next_after(now)
+            # Reschedule in place: one sift instead of a pop and a push
+            if following is None:
+                heapq.heappop(heap)
+            else:
+                heapq.heapreplace(heap, (following, next(seq), job))
+            if misfired:
+                self.misfired += 1
+            elif job.running >= job.max_instances:
+                self.skipped += 1
+            else:
+                job.running += 1
+                seconds = lag.total_seconds()
+                self._lag_total += seconds
+                self._lag_max = max(self._lag_max, seconds)
+                self.dispatched += 1
+                due.append((job, fire))
+        return due
+
+    def stats(self) -> SchedulerStats:
+        return SchedulerStats(
+            jobs=len(self.jobs),
+            dispatched=self.dispatched,
+            skipped=self.skipped,
+            misfired=self.misfired,
+            errors=self.errors,
+            lag_mean=self._lag_total / self.dispatched if self.dispatched else 0.0,
+            lag_max=self._lag_max,
+        )
+
+
+class AsyncScheduler:
+    """
+    Run coroutine functions on an asyncio event loop when their schedules
+    fire.
+
+    All jobs share one heap and one timer: the scheduler sleeps until the
+    earliest pending fire, dispatches every job that is due as a task, and
+    re-arms the timer for the next one. There is no per-job polling task.
+
+    Fire times are evaluated against ``clock`` (UTC by default). A
+    :class:`CronSchedule` is read as UTC wall-clock time; use a
+    :class:`~fluentcron.tz.ZonedSchedule` for another zone.
+    """
+
+    def __init__(self, *, clock: Clock = utcnow) -> None:
+        self._jobs: _JobHeap[Callable[[], Awaitable[object]]] = _JobHeap(clock)
+        self._clock = clock
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._timer: asyncio.Handle | None = None
+        self._timer_fire: datetime | None = None
+        self._tasks: set[asyncio.Task[None]] = set()
+
+    async def __aenter__(self) -> Self:
+        self.start()
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        await self.shutdown()
+
+    def __len__(self) -> int:
+        return len(self._jobs.jobs)
+
+    def add_job(
+        self,
+        trigger: Trigger,
+        func: Callable[[], Awaitable[object]],
+        *,
+        job_id: Hashable | None = None,
+        max_instances: int = 1,
+        misfire_grace: float | None = 1.0,
+        coalesce: bool = False,
+    ) -> Hashable:
+        """
+        Register ``func`` to be called (and awaited) whenever ``trigger``
+        fires, and return the job's id.
+
+        At most ``max_instances`` runs of the job are in flight at once;
+        fires beyond that are skipped. A fire dispatched more than
+        ``misfire_grace`` seconds late is dropped as a misfire (``None``
+        runs it however late). With ``coalesce``, several fires that are due
+        at once (e.g. after the loop was blocked) run the job only once.
+        """
+        job = self._jobs.add(
+            trigger, func, job_id, max_instances, misfire_grace, coalesce
+        )
+        if self._loop is not None:
+            self._arm()
+        return job.id
+
+    def remove_job(self, job_id: Hashable) -> None:
+        """Unregister a job. Runs already in flight are not cancelled."""
+        self._jobs.remove(job_id)
+
+    def start(self) -> None:
+        """Start dispatching on the running event loop."""
+        if self._loop is not None:
+            raise RuntimeError("Scheduler is already running")
+        self._loop = asyncio.get_running_loop()
+        self._arm()
+
+    async def shutdown(self, wait: bool = True) -> None:
+        """
+        Stop dispatching. With ``wait`` (default), wait for in-flight runs to
+        finish; otherwise cancel them.
+        """
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = self._timer_fire = None
+        self._loop = None
+        tasks = list(self._tasks)
+        if not wait:
+            for task in tasks:
+                task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def wakeup(self) -> None:
+        """
+        Re-check for due jobs now instead of at the armed time, e.g. after
+        the system clock was changed.
+        """
+        if self._loop is None:
+            raise RuntimeError("Scheduler is not running")
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = self._loop.call_soon(self._on_timer)
+        self._timer_fire = None
+
+    def stats(self) -> SchedulerStats:
+        """Return the dispatch counters and dispatch lag so far."""
+        return self._jobs.stats()
+
+    def _arm(self) -> None:
+        assert self._loop is not None
+        fire = self._jobs.next_fire()
+        if fire == self._timer_fire and self._timer is not None:
+            return
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer_fire = fire
+        if fire is None:
+            self._timer = None
+            return
+        delay = (fire - self._clock()).total_seconds()
+        self._timer = self._loop.call_later(max(delay, 0.0), self._on_timer)
+
+    def _on_timer(self) -> None:
+        assert self._loop is not None
+        self._timer = self._timer_fire = None
+        for job, _ in self._jobs.pop_due(self._clock()):
+            task = self._loop.create_task(self._run(job))
+            self._tasks.add(task)
+            task.add_done_callback(partial(self._finished, job))
+        self._arm()
+
+    async def _run(self, job: _Job[Callable[[], Awaitable[object]]]) -> None:
+        try:
+            await job.func()
+        finally:
+            job.running -= 1
+
+    def _finished(
+        self, job: _Job[Callable[[], Awaitable[object]]], task: asyncio.Task[None]
+    ) -> None:
+        self._tasks.discard(task)
+        if task.cancelled() or (exc := task.exception()) is None:
+            return
+        # A failing job is reported, but must not stop the scheduler
+        self._jobs.errors += 1
+        task.get_loop().call_exception_handler(
+            {"message": f"Job {job.id!r} raised", "exception": exc, "task": task}
+        )
+
+
+class ThreadPoolScheduler:
+    """
+    Run blocking callables on a bounded :class:`ThreadPoolExecutor` when
+    their schedules fire.
+
+    A single dispatcher thread owns the job heap: it sleeps until the
+    earliest pending fire (or until jobs are added), evaluates every due
+    schedule, and submits the callbacks to the pool. Worker threads only run
+    callbacks and report back through a queue, so they never contend on
+    schedule evaluation.
+
+    Fire times are evaluated against ``clock`` (UTC by default), as for
+    :class:`AsyncScheduler`.
+    """
+
+    def __init__(
+        self, max_workers: int | None = None, *, clock: Clock = utcnow
+    ) -> None:
+        self._jobs: _JobHeap[Callable[[], object]] = _JobHeap(clock)
+        self._clock = clock
+        self._max_workers = max_workers
+        # Created by start(), so that a scheduler can be restarted
+        self._executor: ThreadPoolExecutor | None = None
+        # Guards the heap; held by the dispatcher while it evaluates schedules
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        # (job, failed) pairs appended by workers, drained by the dispatcher
+        self._finished: deque[tuple[_Job[Callable[[], object]], bool]] = deque()
+        self._thread: threading.Thread | None = None
+        self._stopping = False
+
+    def __enter__(self) -> Self:
+        self.start()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        self.shutdown()
+
+    def __len__(self) -> int:
+        return len(self._jobs.jobs)
+
+    def add_job(
+        self,
+        trigger: Trigger,
+        func: Callable[[], object],
+        *,
+        job_id: Hashable | None = None,
+        max_instances: int = 1,
+        misfire_grace: float | None = 1.0,
+        coalesce: bool = False,
+    ) -> Hashable:
+        """
+        Register ``func`` to be called in the pool whenever ``trigger`` fires,
+        and return the job's id. The options are those of
+        :meth:`AsyncScheduler.add_job`.
+        """
+        with self._wakeup:
+            job = self._jobs.add(
+                trigger, func, job_id, max_instances, misfire_grace, coalesce
+            )
+            self._wakeup.notify()
+        return job.id
+
+    def remove_job(self, job_id: Hashable) -> None:
+        """Unregister a job. Runs already in flight are not cancelled."""
+        with self._lock:
+            self._jobs.remove(job_id)
+
+    def start(self) -> None:
+        """Start the worker pool and the dispatcher thread."""
+        if self._thread is not None:
+            raise RuntimeError("Scheduler is already running")
+        self._stopping = False
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                self._max_workers, thread_name_prefix="fluentcron-worker"
+            )
+        self._thread = threading.Thread(
+            target=self._dispatch, name="fluentcron-dispatcher", daemon=True
+        )
+        self._thread.start()
+
+    def wakeup(self) -> None:
+        """
+        Re-check for due jobs now instead of at the armed time, e.g. after
+        the system clock was changed.
+        """
+        with self._wakeup:
+            self._wakeup.notify()
+
+    def shutdown(self, wait: bool = True) -> None:
+        """
+        Stop dispatching and shut down the pool. With ``wait`` (default),
+        drain: block until in-flight and queued runs have finished. Otherwise
+        queued runs are cancelled and running ones are left to finish. A
+        later :meth:`start` starts a new pool.
+        """
+        with self._wakeup:
+            self._stopping = True
+            self._wakeup.notify()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait, cancel_futures=not wait)
+            self._executor = None
+        with self._lock:
+            self._drain_finished()
+
+    def stats(self) -> SchedulerStats:
+        """Return the dispatch counters and dispatch lag so far."""
+        with self._lock:
+            self._drain_finished()
+            return self._jobs.stats()
+
+    def _drain_finished(self) -> None:
+        finished = self._finished
+        while finished:
+            job, failed = finished.popleft()
+            job.running -= 1
+            self._jobs.errors += failed
+
+    def _dispatch(self) -> None:
+        executor = self._executor
+        assert executor is not None
+        with self._wakeup:
+            while not self._stopping:
+                self._drain_finished()
+                for job, _ in self._jobs.pop_due(self._clock()):
+                    executor.submit(self._run, job)
+                fire = self._jobs.next_fire()
+                timeout = None
+                if fire is not None:
+                    timeout = (fire - self._clock()).total_seconds()
+                    timeout = min(max(timeout, 0.0), threading.TIMEOUT_MAX)
+                self._wakeup.wait(timeout)
+
+    def _run(self, job: _Job[Callable[[], object]]) -> None:
+        failed = False
+        try:
+            job.func()
+        except Exception:
+            # A failing job is reported, but must not stop the scheduler
+            failed = True
+            logger.exception("Job %r raised", job.id)
+        finally:
+            self._finished.append((job, failed))
@@ -4,20 +4,45 @@ Core cron schedule DSL functionality
 
 from __future__ import annotations
 
-from typing import NamedTuple
-import hashlib
+from collections.abc import Iterable
+from datetime import date, datetime
+from functools import lru_cache
+from typing import TYPE_CHECKING, Literal, NamedTuple
 
+from .compiled import (
+    DAY_RANGE,
+    HOUR_RANGE,
+    MINUTE_RANGE,
+    MONTH_RANGE,
+    SECOND_RANGE,
+    WEEKDAY_RANGE,
+    CompiledSchedule,
+    _field_mask,
+    _fold_sunday,
+    _render_mask,
+    compile_schedule,
+)
+from .interning import default_pool
+from .jitter import jitter_offset
 from .types import (
     DayOfMonth,
     Hour,
     HourInterval,
     Minute,
     MinuteInterval,
+    Month,
+    SecondInterval,
     Weekday,
     WeekdayInt,
     WeekdayStr,
 )
 
+if TYPE_CHECKING:
+    from zoneinfo import ZoneInfo
+
+    from .algebra import CompositeSchedule
+    from .tz import AmbiguousPolicy, NonexistentPolicy, ZonedSchedule
+
 WEEKDAY_MAPPING: dict[WeekdayStr, WeekdayInt] = {
     # Long names
     "sunday": 0,
@@ -55,8 +80,58 @@ WEEKDAY_MAPPING: dict[WeekdayStr, WeekdayInt] = {
 
 
 def _jitter_offset(jitter: str, modulus: int) -> int:
-    h = hashlib.sha256(jitter.encode("utf-8")).hexdigest()
-    return int(h, 16) % modulus
+    return jitter_offset(jitter, modulus)
+
+
+@lru_cache(maxsize=4096)
+def _render_values(mask: int, low: int, high: int, *, weekday: bool = False) -> str:
+    """
+    Render the values in ``mask`` (bit ``n - low`` for value ``n``) as the
+    shortest list/range/step field. Day-of-month and weekday fields never get
+    a leading ``*``, which would change how cron combines the two.
+    """
+    field = _render_mask(mask, low, high, weekday=weekday)
+    if low == DAY_RANGE[0] or weekday:
+        if field == "*":
+            field = f"{low}-{high - 1 if weekday else high}"
+        else:
+            field = field.replace("*", str(low), 1)
+    return field
+
+
+def _values_field(
+    values: Iterable[int], low: int, high: int, name: str, *, weekday: bool = False
+) -> str:
+    """Validate ``values`` and render them as one cron field."""
+    mask = 0
+    for value in values:
+        if not (low <= value <= high):
+            raise ValueError(f"{name} must be between {low} and {high}")
+        mask |= 1 << (value - low)
+    if not mask:
+        raise ValueError(f"At least one {name.lower()} is required")
+    if weekday:
+        # Render over the full 0-7 range, so steps can't run on to Sunday=7
+        high = WEEKDAY_RANGE[1]
+    return _render_values(mask, low, high, weekday=weekday)
+
+
+def _step_hours(hour: str, n: int) -> str:
+    """Keep the hours of ``hour`` that are a multiple of ``n`` after its first."""
+    if n == 1:
+        return hour
+    mask = _field_mask(hour, *HOUR_RANGE)
+    first = (mask & -mask).bit_length() - 1
+    last = mask.bit_length() - 1
+    if mask == (1 << (last + 1)) - (1 << first):
+        # A single range of hours
+        if first == last:
+            return str(first)
+        if (first, last) == HOUR_RANGE:
+            return f"*/{n}"
+        return f"{first}-{last}/{n}"
+    stepped = sum(1 << h for h in range(first, last + 1, n))
+    return _render_values(mask & stepped, *HOUR_RANGE)
 
 
 def _normalize_weekday(weekday: Weekday) -> WeekdayInt:
@@ -75,6 +150,11 @@ def _normalize_weekday(weekday: Weekday) -> WeekdayInt:
 class CronSchedule(NamedTuple):
     """
     A fluent-interface builder for creating cron schedule expressions.
+
+    ``second`` defaults to ``"0"``, which is a classic minute-resolution
+    schedule rendered with five fields. Any other second field (see
+    :meth:`every_n_seconds`) makes the schedule sub-minute, rendered with a
+    leading seconds field.
     """
 
     minute: str = "*"
@@ -82,14 +162,133 @@ class CronSchedule(NamedTuple):
     day: str = "*"
     month: str = "*"
     weekday: str = "*"
+    second: str = "0"
+
+    @classmethod
+    def parse(cls, expr: str) -> CronSchedule:
+        """
+        Parse a cron expression such as ``"30 5 * * 1-5"`` or ``"@daily"``,
+        or a 6-field expression with a leading seconds field
+        (``"*/10 * * * * *"``).
+
+        Raises ``ValueError`` for malformed expressions or out-of-range values.
+        """
+        from .parser import parse_expression
+
+        return parse_expression(expr)
 
     def __str__(self) -> str:
-        """Return the cron expression string."""
-        return f"{self.minute} {self.hour} {self.day} {self.month} {self.weekday}"
+        """
+        Return the cron expression string: five fields, or six (seconds
+        first) for schedules with a seconds field other than ``"0"``.
+        """
+        classic = f"{self.minute} {self.hour} {self.day} {self.month} {self.weekday}"
+        if self.second == "0":
+            return classic
+        return f"{self.second} {classic}"
+
+    def to_str(self, fields: Literal[5, 6] | None = None) -> str:
+        """
+        Finalize the expression by casting it to a string. With ``fields=6``
+        the seconds field is always included (Quartz/systemd style); with
+        ``fields=5`` it is left out, which raises ``ValueError`` if the
+        schedule fires at any second other than 0.
+        """
+        if fields is None:
+            return str(self)
+        classic = f"{self.minute} {self.hour} {self.day} {self.month} {self.weekday}"
+        if fields == 6:
+            return f"{self.second} {classic}"
+        if fields != 5:
+            raise ValueError("fields must be 5 or 6")
+        if compile_schedule(self).sub_minute:
+            raise ValueError(
+                f"{self.to_str(6)!r} fires at seconds other than 0 "
+                "and has no 5-field form"
+            )
+        return classic
+
+    def __or__(self, other: CronSchedule | CompositeSchedule) -> CompositeSchedule:
+        """Fire whenever either schedule fires."""
+        from .algebra import union
+
+        return union(self, other)
+
+    def __and__(self, other: CronSchedule | CompositeSchedule) -> CompositeSchedule:
+        """Fire when both schedules fire."""
+        from .algebra import intersection
+
+        return intersection(self, other)
+
+    def __sub__(self, other: CronSchedule | CompositeSchedule) -> CompositeSchedule:
+        """Fire when this schedule fires and ``other`` does not."""
+        from .algebra import difference
+
+        return difference(self, other)
+
+    def intern(self) -> CronSchedule:
+        """
+        Return the canonical shared instance equal to this schedule from the
+        default :class:`~fluentcron.interning.SchedulePool`. Use the pool's
+        ``render()`` and ``compile()`` to get memoized string and compiled forms.
+        """
+        return default_pool.intern(self)
+
+    def compile(self) -> CompiledSchedule:
+        """
+        Return the bitmask form of this schedule. Compiled schedules are cached,
+        so repeated calls for equal schedules are cheap.
+        """
+        return compile_schedule(self)
+
+    def canonical(self) -> CronSchedule:
+        """
+        Return the canonical form of this schedule: every field rewritten as
+        the shortest expression of its bitset, so that schedules with the same
+        fire times compare and hash equal (``"0/15"`` and ``"*/15"``,
+        ``"0-59"`` and ``"*"``, weekday ``7`` and ``0``).
+        """
+        return _canonical(self)
+
+    def next_after(self, dt: datetime) -> datetime | None:
+        """
+        Return the first fire time strictly after ``dt``, or ``None`` if the
+        schedule never fires again. ``dt.tzinfo`` is carried over unchanged.
+        """
+        return compile_schedule(self).next_after(dt)
+
+    def prev_before(self, dt: datetime) -> datetime | None:
+        """
+        Return the last fire time strictly before ``dt``, or ``None`` if the
+        schedule never fired before it.
+        """
+        return compile_schedule(self).prev_before(dt)
+
+    def count_between(self, start: datetime, end: datetime) -> int:
+        """
+        Return the number of fire times in ``[start, end)``. The count is
+        computed from the compiled bitmasks rather than by enumerating fires.
+        """
+        return compile_schedule(self).count_between(start, end)
+
+    def fires_per_day_histogram(self, start: date, end: date) -> list[int]:
+        """Return the number of fires on each day in ``[start, end)``."""
+        return compile_schedule(self).fires_per_day_histogram(start, end)
 
-    def to_str(self) -> str:
-        """Finalize the expression by casting it to a string"""
-        return str(self)
+    def in_zone(
+        self,
+        zone: ZoneInfo | str,
+        *,
+        nonexistent: NonexistentPolicy = "shift_forward",
+        ambiguous: AmbiguousPolicy = "first",
+    ) -> ZonedSchedule:
+        """
+        Evaluate this schedule against the wall clock of ``zone``. See
+        :class:`~fluentcron.tz.ZonedSchedule` for the DST policies.
+        """
+        from .tz import ZonedSchedule
+
+        return ZonedSchedule(self, zone, nonexistent=nonexistent, ambiguous=ambiguous)
 
     def at(
         self, hour: Hour, minute: Minute | None = None, *, jitter: str | None = None
@@ -110,6 +309,29 @@ class CronSchedule(NamedTuple):
 
         return self._replace(hour=str(hour), minute=str(resolved_minute))
 
+    def at_hours(
+        self,
+        hours: Iterable[Hour],
+        minute: Minute | None = None,
+        *,
+        jitter: str | None = None,
+    ) -> CronSchedule:
+        """Set several hours (e.g. ``[9, 13, 17]``) and the minute within them."""
+        schedule = self.at(0, minute, jitter=jitter)
+        return schedule._replace(hour=_values_field(hours, *HOUR_RANGE, "Hour"))
+
+    def between_hours(self, start: Hour, end: Hour) -> CronSchedule:
+        """
+        Restrict the schedule to the hours ``start`` to ``end`` (inclusive).
+        Combine with ``every_n_hours_within()`` to step through the range.
+        """
+        if not (0 <= start <= 23 and 0 <= end <= 23):
+            raise ValueError("Hour must be between 0 and 23")
+        if start > end:
+            raise ValueError("Start hour must not be after end hour")
+        hour = str(start) if start == end else f"{start}-{end}"
+        return self._replace(hour=hour)
+
     def every_n_minutes(
         self, n: MinuteInterval, *, jitter: str | None = None
     ) -> CronSchedule:
@@ -123,6 +345,19 @@ class CronSchedule(NamedTuple):
             minute = f"{offset}/{n}"
         return self._replace(minute=minute)
 
+    def every_n_seconds(
+        self, n: SecondInterval, *, jitter: str | None = None
+    ) -> CronSchedule:
+        """Run every N seconds (within the minutes the schedule fires at)."""
+        if not (1 <= n <= 59):
+            raise ValueError("Seconds must be between 1 and 59")
+        if n == 1 or jitter is None:
+            second = f"*/{n}" if n > 1 else "*"
+        else:
+            offset = _jitter_offset(jitter, n)
+            second = f"{offset}/{n}"
+        return self._replace(second=second)
+
     def every_n_hours(
         self, n: HourInterval, *, jitter: str | None = None
     ) -> CronSchedule:
@@ -134,6 +369,23 @@ class CronSchedule(NamedTuple):
             return self._replace(hour=hour, minute=str(_jitter_offset(jitter, 60)))
         return self._replace(hour=hour)
 
+    def every_n_hours_within(
+        self, n: HourInterval, *, jitter: str | None = None
+    ) -> CronSchedule:
+        """
+        Run every N hours within the hours already selected (by
+        ``between_hours()`` or ``at_hours()``), counting from the first. A
+        range of hours becomes ``9-17/n``; any other set keeps the hours that
+        are a multiple of N after its first: ``at_hours([9, 11, 13])`` every
+        4 hours runs at ``9,13``.
+        """
+        if not (1 <= n <= 23):
+            raise ValueError("Hours must be between 1 and 23")
+        hour = _step_hours(self.hour, n)
+        if jitter is not None:
+            return self._replace(hour=hour, minute=str(_jitter_offset(jitter, 60)))
+        return self._replace(hour=hour)
+
     def daily(self) -> CronSchedule:
         """Run daily (every day)."""
         return self._replace(day="*", weekday="*")
@@ -153,6 +405,14 @@ class CronSchedule(NamedTuple):
 
         return self._replace(day=str(day))
 
+    def on_days(self, *days: DayOfMonth) -> CronSchedule:
+        """Set several days of the month (1-31)."""
+        return self._replace(day=_values_field(days, *DAY_RANGE, "Day"))
+
+    def in_months(self, *months: Month) -> CronSchedule:
+        """Restrict the schedule to the given months (1-12)."""
+        return self._replace(month=_values_field(months, *MONTH_RANGE, "Month"))
+
     def on_monday(self) -> CronSchedule:
         """Run on Monday."""
         return self._replace(weekday="1")
@@ -184,3 +444,56 @@ class CronSchedule(NamedTuple):
     def on_weekday(self, weekday: Weekday) -> CronSchedule:
         """Set the weekday (0=Sunday, 1=Monday, ..., 6=Saturday)."""
         return self._replace(weekday=str(_normalize_weekday(weekday)))
+
+    def on_weekdays(self, *weekdays: Weekday) -> CronSchedule:
+        """Set several weekdays, e.g. ``on_weekdays("mon", "wed", "fri")``."""
+        field = _values_field(
+            map(_normalize_weekday, weekdays), 0, 6, "Weekday", weekday=True
+        )
+        return self._replace(weekday=field)
+
+
+def _star_step(mask: int, low: int, high: int, *, weekday: bool = False) -> str | None:
+    """A ``*/n`` spelling of the field bitmask ``mask``, if it has one."""
+    for step in range(2, high - low + 2):
+        candidate = f"*/{step}"
+        parsed = _field_mask(candidate, low, high)
+        if weekday:
+            parsed = _fold_sunday(parsed)
+        if parsed == mask:
+            return candidate
+    return None
+
+
+@lru_cache(maxsize=4096)
+def _canonical(schedule: CronSchedule) -> CronSchedule:
+    compiled = compile_schedule(schedule)
+    day = _render_mask(compiled.day, *DAY_RANGE)
+    weekday = _render_mask(compiled.weekday, *WEEKDAY_RANGE, weekday=True)
+    # Whether day-of-month and weekday are OR-ed depends on the fields'
+    # spelling (neither starting with "*"), which must be preserved.
+    if compiled.day_or_weekday:
+        if day == "*" or weekday == "*":
+            # One of the two matches every day, so the other is irrelevant
+            day = weekday = "*"
+        else:
+            day = day.replace("*", str(DAY_RANGE[0]), 1)
+            weekday = weekday.replace("*", "0", 1)
+    elif "*" not in (day[0], weekday[0]):
+        # Both restricted and AND-ed: one field has to keep a "*/n" spelling
+        day_star = _star_step(compiled.day, *DAY_RANGE)
+        weekday_star = _star_step(compiled.weekday, *WEEKDAY_RANGE, weekday=True)
+        if day_star is not None:
+            day = day_star
+        elif weekday_star is not None:
+            weekday = weekday_star
+        else:
+            day, weekday = schedule.day, schedule.weekday
+    return CronSchedule(
+        second=_render_mask(compiled.second, *SECOND_RANGE),
+        minute=_render_mask(compiled.minute, *MINUTE_RANGE),
+        hour=_render_mask(compiled.hour, *HOUR_RANGE),
+        day=day,
+        month=_render_mask(compiled.month, *MONTH_RANGE),
+        weekday=weekday,
+    )
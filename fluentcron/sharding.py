@@ -0,0 +1,182 @@
+"""
+Load-balanced assignment of jobs to worker nodes
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Iterator, Mapping
+from datetime import datetime
+from functools import lru_cache
+from typing import NamedTuple
+import math
+
+from .compiled import CompiledSchedule
+from .schedule import CronSchedule, _jitter_offset
+
+_MASK64 = (1 << 64) - 1
+
+# Without a century year in between, the calendar repeats every 28 years,
+# so the average over these years is the long-run fire rate of any schedule.
+_CYCLE_START = datetime(2001, 1, 1)
+_CYCLE_END = datetime(2029, 1, 1)
+_CYCLE_DAYS = (_CYCLE_END - _CYCLE_START).days
+
+
+def _mix(x: int) -> int:
+    """splitmix64 finalizer: a 64-bit integer scrambled into another."""
+    x = (x ^ (x >> 30)) * 0xBF58476D1CE4E5B9 & _MASK64
+    x = (x ^ (x >> 27)) * 0x94D049BB133111EB & _MASK64
+    return x ^ (x >> 31)
+
+
+@lru_cache(maxsize=4096)
+def _matching_days(day: int, month: int, weekday: int, day_or_weekday: bool) -> float:
+    """The long-run fraction of days matching the given day fields."""
+    # Once a day, so that counting fires counts matching days
+    daily = CompiledSchedule.from_masks(1, 1, day, month, weekday, day_or_weekday)
+    return daily.count_between(_CYCLE_START, _CYCLE_END) / _CYCLE_DAYS
+
+
+def expected_fires_per_day(schedule: CronSchedule | CompiledSchedule) -> float:
+    """
+    The long-run average number of fires per day, counting days the
+    schedule does not fire on. This is the load a job adds to its node.
+    """
+    c = schedule.compile() if isinstance(schedule, CronSchedule) else schedule
+    return c.fires_per_day() * _matching_days(
+        c.day, c.month, c.weekday, c.day_or_weekday
+    )
+
+
+class Assignment(NamedTuple):
+    """The node owning each job, and the resulting firing load of each node."""
+
+    owners: dict[str, str]
+    loads: dict[str, float]
+
+    def jobs_of(self, node: str) -> list[str]:
+        """The keys of the jobs owned by ``node``."""
+        return [key for key, owner in self.owners.items() if owner == node]
+
+    def moved(self, other: Assignment) -> set[str]:
+        """Keys present in both assignments whose owner differs."""
+        return {
+            key
+            for key, owner in self.owners.items()
+            if other.owners.get(key, owner) != owner
+        }
+
+
+class ShardRing:
+    """
+    Assign each job to exactly one of a set of nodes, balancing the firing
+    load (expected fires per day) rather than the number of jobs.
+
+    Nodes are ranked per job by weighted rendezvous (highest random weight)
+    hashing: each node scores every job key, and a node's ``weight`` scales
+    its share. The key is hashed the same way as jitter
+    (``_jitter_offset(key, 2**64)``), and only mixed with each node's hash
+    afterwards, so each key is hashed once however many nodes there are.
+
+    :meth:`assign` places each job on the highest ranked node that stays
+    within ``1 + slack`` times its fair share of the total load (consistent
+    hashing with bounded loads). Jobs are placed in key hash order, like
+    :class:`~fluentcron.planner.JitterPlanner` does, so the result does not
+    depend on the order jobs are listed in, and a node joining or leaving
+    mostly moves just the jobs that rank it first, plus the few displaced
+    by the load bounds.
+
+    The result only depends on the jobs, the nodes and their weights, and
+    the jitter hash strategy, so every dispatcher given the same inputs
+    computes the same assignment without coordinating.
+    """
+
+    def __init__(
+        self,
+        nodes: Mapping[str, float] | Iterable[str] = (),
+        *,
+        slack: float = 0.1,
+    ) -> None:
+        if slack < 0:
+            raise ValueError("slack must not be negative")
+        self.slack = slack
+        self._nodes: dict[str, tuple[float, int]] = {}
+        if isinstance(nodes, Mapping):
+            for node, weight in nodes.items():
+                self.add(node, weight)
+        else:
+            for node in nodes:
+                self.add(node)
+
+    def __len__(self) -> int:
+        return len(self._nodes)
+
+    def __contains__(self, node: object) -> bool:
+        return node in self._nodes
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._nodes)
+
+    def add(self, node: str, weight: float = 1.0) -> None:
+        """Add a node, or change the weight of an existing one."""
+        if not weight > 0:
+            raise ValueError("Node weight must be positive")
+        self._nodes[node] = (weight, _mix(_jitter_offset(node, 1 << 64)))
+
+    def remove(self, node: str) -> None:
+        """Remove a node. Its jobs are reassigned by the next :meth:`assign`."""
+        if node not in self._nodes:
+            raise KeyError(node)
+        del self._nodes[node]
+
+    def rank(self, key: str) -> list[str]:
+        """All nodes, in order of preference for the job ``key``."""
+        return [node for _, node in self._scores(_jitter_offset(key, 1 << 64))]
+
+    def owner(self, key: str) -> str:
+        """The node ranked first for ``key``, ignoring load."""
+        if not self._nodes:
+            raise ValueError("No nodes to assign to")
+        return self.rank(key)[0]
+
+    def _scores(self, key_hash: int) -> list[tuple[float, str]]:
+        scores: list[tuple[float, str]] = []
+        for node, (weight, node_hash) in self._nodes.items():
+            # Uniform in (0, 1); -weight / ln(u) is the weighted rendezvous score
+            u = (_mix(key_hash ^ node_hash) + 1) / (_MASK64 + 2)
+            scores.append((-weight / math.log(u), node))
+        scores.sort(reverse=True)
+        return scores
+
+    def assign(
+        self,
+        jobs: Mapping[str, CronSchedule | CompiledSchedule]
+        | Iterable[tuple[str, CronSchedule | CompiledSchedule]],
+    ) -> Assignment:
+        """Assign every job to one node, balancing expected fires per day."""
+        if not self._nodes:
+            raise ValueError("No nodes to assign to")
+        items = jobs.items() if isinstance(jobs, Mapping) else jobs
+        pending = sorted(
+            (_jitter_offset(key, 1 << 64), key, expected_fires_per_day(schedule))
+            for key, schedule in items
+        )
+        total_weight = sum(weight for weight, _ in self._nodes.values())
+        total_load = sum(load for _, _, load in pending)
+        capacity = {
+            node: (1 + self.slack) * total_load * weight / total_weight
+            for node, (weight, _) in self._nodes.items()
+        }
+        loads = dict.fromkeys(self._nodes, 0.0)
+        owners: dict[str, str] = {}
+        for key_hash, key, load in pending:
+            scores = self._scores(key_hash)
+            for _, node in scores:
+                if loads[node] + load <= capacity[node]:
+                    break
+            else:
+                # Too heavy for any node's remaining share: take the most room
+                node = max(scores, key=lambda s: capacity[s[1]] - loads[s[1]])[1]
+            owners[key] = node
+            loads[node] += load
+        return Assignment(owners, loads)
@@ -0,0 +1,53 @@
+"""
+Lazy, chronologically ordered fire times across many schedules
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Iterator, Mapping
+from datetime import datetime, timedelta
+import heapq
+
+from .compiled import CompiledSchedule
+from .schedule import CronSchedule
+
+_EPSILON = timedelta(microseconds=1)
+
+
+def iter_fires[K](
+    schedules: Mapping[K, CronSchedule | CompiledSchedule]
+    | Iterable[tuple[K, CronSchedule | CompiledSchedule]],
+    start: datetime,
+    end: datetime | None = None,
+) -> Iterator[tuple[datetime, K]]:
+    """
+    Yield ``(fire_time, key)`` pairs for every fire of every schedule with
+    ``start <= fire_time < end``, in chronological order. Fires at the same
+    minute are yielded in the order the schedules were given. With no ``end``
+    the stream is infinite (unless no schedule ever fires again).
+
+    A heap holds one pending fire per schedule; only the schedule that just
+    fired is advanced, so memory is O(number of schedules) and the first
+    event is produced right away.
+    """
+    items = schedules.items() if isinstance(schedules, Mapping) else schedules
+    heap: list[tuple[datetime, int, K, CompiledSchedule]] = []
+    seed = start - _EPSILON
+    for seq, (key, schedule) in enumerate(items):
+        compiled = (
+            schedule.compile() if isinstance(schedule, CronSchedule) else schedule
+        )
+        fire = compiled.next_after(seed)
+        if fire is not None:
+            heap.append((fire, seq, key, compiled))
+    heapq.heapify(heap)
+    while heap:
+        fire, seq, key, compiled = heap[0]
+        if end is not None and fire >= end:
+            return
+        yield fire, key
+        following = compiled.next_after(fire)
+        if following is None:
+            heapq.heappop(heap)
+        else:
+            heapq.heapreplace(heap, (following, seq, key, compiled))
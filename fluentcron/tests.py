@@ -1,16 +1,55 @@
+from array import array
+from collections import Counter
+from collections.abc import Awaitable, Callable
+from datetime import UTC, date, datetime, timedelta
+from typing import ClassVar
+from zoneinfo import ZoneInfo
+import asyncio
+import hashlib
+import importlib.util
+import json
+import multiprocessing
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
 import unittest
 
 from . import (
+    CalendarCache,
     CommonSchedules,
+    CompiledSchedule,
+    CompositeSchedule,
     CronSchedule,
+    JitterPlanner,
+    ScheduleIndex,
+    SchedulePool,
     WeekdayStr,
+    ZonedSchedule,
+    batch,
+    bench,
+    binary,
+    bulk,
     daily_at,
+    dedupe,
     every_n_hours,
     every_n_minutes,
+    instrument,
+    iter_fires,
     monthly_on_day,
+    sharding,
     weekly_on,
 )
+from .algebra import DifferenceSchedule, LeafSchedule
+from .analysis import collisions
+from .compiled import compile_schedule
+from .interning import default_pool
+from .jitter import blake2b_hash, get_jitter_hash, set_jitter_hash
+from .runtime import AsyncScheduler, ThreadPoolScheduler
 from .schedule import _jitter_offset
+from .tz import TransitionTable, transitions
 
 
 class TestCronSchedule(unittest.TestCase):
@@ -177,6 +216,38 @@ class TestCronSchedule(unittest.TestCase):
         schedule = CronSchedule().every_n_hours(1)
         self.assertEqual(str(schedule), "* * * * *")
 
+    def test_every_n_hours_replaces_hours(self) -> None:
+        """every_n_hours() keeps replacing the hour field, as it always has."""
+        self.assertEqual(CronSchedule().at(12).every_n_hours(3).hour, "*/3")
+        self.assertEqual(CronSchedule(hour="*/3").every_n_hours(2).hour, "*/2")
+        self.assertEqual(CronSchedule(hour="9-17").every_n_hours(2).hour, "*/2")
+        self.assertEqual(CronSchedule().between_hours(9, 17).every_n_hours(1).hour, "*")
+
+    def test_every_n_hours_within(self) -> None:
+        """every_n_hours_within() steps from the first hour already selected."""
+        cases = [
+            (CronSchedule().between_hours(9, 17), 2, "9-17/2"),
+            (CronSchedule().at_hours([9, 10, 11, 12]), 2, "9-12/2"),
+            (CronSchedule().at_hours([9, 11, 13]), 2, "9,11,13"),
+            (CronSchedule().at_hours([9, 11, 13]), 4, "9,13"),
+            (CronSchedule().at_hours([9, 11, 13]), 1, "9,11,13"),
+            (CronSchedule(), 5, "*/5"),
+            (CronSchedule().at_hours([12]), 3, "12"),
+        ]
+        for base, n, hour in cases:
+            with self.subTest(base=str(base), n=n):
+                schedule = base.every_n_hours_within(n)  # type: ignore[arg-type]
+                self.assertEqual(schedule.hour, hour)
+                hours = schedule.compile().hour
+                self.assertEqual(hours & ~base.compile().hour, 0)
+        schedule = CronSchedule().between_hours(9, 17)
+        self.assertEqual(
+            schedule.every_n_hours_within(2, jitter="my-unique-task-id").minute,
+            schedule.every_n_hours(2, jitter="my-unique-task-id").minute,
+        )
+        with self.assertRaises(ValueError):
+            schedule.every_n_hours_within(24)  # type: ignore[arg-type]
+
     def test_every_n_hours_validation(self) -> None:
         """Test validation in every_n_hours method."""
         schedule = CronSchedule()
@@ -187,6 +258,59 @@ class TestCronSchedule(unittest.TestCase):
         with self.assertRaises(ValueError):
             schedule.every_n_hours(24)  # type: ignore[arg-type]
 
+    def test_multi_value_builders(self) -> None:
+        """Test the multi-value and range builders."""
+        schedule = CronSchedule().on_weekdays("mon", "tue", "wed", "thu", "fri")
+        self.assertEqual(str(schedule.at_hours([9, 13, 17])), "0 9,13,17 * * 1-5")
+        self.assertEqual(
+            str(CronSchedule().at_hours([17, 9, 9, 13], 30)), "30 9,13,17 * * *"
+        )
+        self.assertEqual(
+            str(CronSchedule().every_n_minutes(15).between_hours(9, 17)),
+            "*/15 9-17 * * *",
+        )
+        self.assertEqual(
+            str(CronSchedule().between_hours(9, 17).every_n_hours_within(2)),
+            "* 9-17/2 * * *",
+        )
+        self.assertEqual(str(CronSchedule().between_hours(8, 8)), "* 8 * * *")
+        self.assertEqual(str(CronSchedule().at_hours([0, 6, 12, 18])), "0 */6 * * *")
+        self.assertEqual(str(CronSchedule().in_months(1, 4, 7, 10)), "* * * 1/3 *")
+        self.assertEqual(str(CronSchedule().on_days(1, 2, 3, 15)), "* * 1-3,15 * *")
+
+    def test_multi_value_day_and_weekday_keep_semantics(self) -> None:
+        """Day and weekday lists never render with a leading ``*``."""
+        schedule = CronSchedule().on_days(1, 15).on_weekdays(*range(7))
+        self.assertEqual(schedule.weekday, "0-6")
+        self.assertTrue(schedule.compile().matches(datetime(2026, 3, 2)))
+        schedule = CronSchedule().on_days(*range(1, 32, 2)).on_weekdays(0, 2, 4, 6)
+        self.assertEqual((schedule.day, schedule.weekday), ("1/2", "0/2"))
+        schedule = CronSchedule().on_weekdays("mon", "wed", "fri")
+        self.assertEqual(schedule.weekday, "1,3,5")
+        self.assertEqual(schedule.compile().weekday, 0b101010)
+
+    def test_multi_value_builder_validation(self) -> None:
+        """Test validation in the multi-value and range builders."""
+        schedule = CronSchedule()
+
+        with self.assertRaises(ValueError):
+            schedule.at_hours([])
+
+        with self.assertRaises(ValueError):
+            schedule.at_hours([9, 24])  # type: ignore[list-item]
+
+        with self.assertRaises(ValueError):
+            schedule.between_hours(17, 9)
+
+        with self.assertRaises(ValueError):
+            schedule.on_weekdays("mon", "funday")  # type: ignore[arg-type]
+
+        with self.assertRaises(ValueError):
+            schedule.in_months(13)  # type: ignore[arg-type]
+
+        with self.assertRaises(ValueError):
+            schedule.on_days()
+
     def test_method_chaining(self) -> None:
         """Test that methods can be chained together."""
         schedule = CronSchedule().weekly().on_monday().at(5, 30)
@@ -263,6 +387,7 @@ class TestCronSchedule(unittest.TestCase):
             "day": "*",
             "month": "*",
             "weekday": "*",
+            "second": "0",
         }
         self.assertEqual(schedule_dict, expected_dict)
 
@@ -395,6 +520,51 @@ class TestJitter(unittest.TestCase):
         self.assertEqual(_jitter_offset("test", 60), 12)
         self.assertEqual(_jitter_offset("", 60), 49)
 
+    def test_jitter_offset_matches_hexdigest(self) -> None:
+        """The digest-based hash reproduces the original hexdigest offsets."""
+        keys = [f"job-{i}" for i in range(5000)]
+        expected = [
+            int(hashlib.sha256(key.encode("utf-8")).hexdigest(), 16) for key in keys
+        ]
+
+        def check() -> None:
+            for key, h in zip(keys, expected, strict=True):
+                for modulus in [7, 15, 24, 60, 1440]:
+                    self.assertEqual(_jitter_offset(key, modulus), h % modulus)
+
+        default = get_jitter_hash()
+        check()
+        try:
+            # Selecting SHA-256 explicitly, also after another strategy has
+            # filled the memo, gives the same offsets
+            set_jitter_hash("blake2b")
+            _jitter_offset(keys[0], 60)
+            set_jitter_hash("sha256")
+            check()
+        finally:
+            set_jitter_hash(default)
+
+    def test_jitter_hash_strategy(self) -> None:
+        """The hash strategy can be swapped by name or callable."""
+        default = get_jitter_hash()
+        try:
+            set_jitter_hash("blake2b")
+            self.assertIs(get_jitter_hash(), blake2b_hash)
+            self.assertEqual(
+                _jitter_offset("my-unique-task-id", 60),
+                blake2b_hash(b"my-unique-task-id") % 60,
+            )
+            set_jitter_hash(lambda data: len(data))
+            self.assertEqual(_jitter_offset("abc", 60), 3)
+            self.assertEqual(
+                str(CronSchedule().daily().at(12, jitter="abcd")), "4 12 * * *"
+            )
+            with self.assertRaises(ValueError):
+                set_jitter_hash("md5")  # type: ignore[arg-type]
+        finally:
+            set_jitter_hash(default)
+        self.assertEqual(_jitter_offset("my-unique-task-id", 60), 33)
+
     def test_at_with_jitter(self) -> None:
         """at() with jitter computes minute from hash."""
         schedule = CronSchedule().daily().at(12, jitter="my-unique-task-id")
@@ -459,3 +629,1940 @@ class TestJitter(unittest.TestCase):
             weekly_on("monday", 12, 30, jitter="task")
         with self.assertRaises(ValueError):
             monthly_on_day(1, 12, 30, jitter="task")
+
+
+def _brute_force_next(schedule: CronSchedule, dt: datetime) -> datetime:
+    """Reference implementation: step minute by minute."""
+    compiled = compile_schedule(schedule)
+    t = dt.replace(second=0, microsecond=0) + timedelta(minutes=1)
+    while True:
+        dom = compiled.day >> (t.day - 1) & 1
+        dow = compiled.weekday >> ((t.weekday() + 1) % 7) & 1
+        day_matches = (dom or dow) if compiled.day_or_weekday else (dom and dow)
+        if (
+            compiled.minute >> t.minute & 1
+            and compiled.hour >> t.hour & 1
+            and compiled.month >> (t.month - 1) & 1
+            and day_matches
+        ):
+            return t
+        t += timedelta(minutes=1)
+
+
+class TestNextFire(unittest.TestCase):
+    """Test cases for next_after() / prev_before()."""
+
+    def test_next_after_daily(self) -> None:
+        """Daily schedules fire later the same day or on the next day."""
+        schedule = CronSchedule().daily().at(5, 30)
+        self.assertEqual(
+            schedule.next_after(datetime(2026, 3, 1, 4, 0)),
+            datetime(2026, 3, 1, 5, 30),
+        )
+        self.assertEqual(
+            schedule.next_after(datetime(2026, 3, 1, 5, 30)),
+            datetime(2026, 3, 2, 5, 30),
+        )
+        self.assertEqual(
+            schedule.next_after(datetime(2026, 12, 31, 23, 59)),
+            datetime(2027, 1, 1, 5, 30),
+        )
+
+    def test_next_after_truncates_seconds(self) -> None:
+        """Seconds on the reference time are ignored."""
+        schedule = CronSchedule()
+        self.assertEqual(
+            schedule.next_after(datetime(2026, 3, 1, 4, 0, 59, 999)),
+            datetime(2026, 3, 1, 4, 1),
+        )
+
+    def test_next_after_intervals(self) -> None:
+        """Step fields advance to the next matching value."""
+        schedule = CronSchedule().every_n_minutes(15)
+        self.assertEqual(
+            schedule.next_after(datetime(2026, 3, 1, 4, 46)),
+            datetime(2026, 3, 1, 5, 0),
+        )
+        schedule = CronSchedule(minute="3/15")
+        self.assertEqual(
+            schedule.next_after(datetime(2026, 3, 1, 4, 49)),
+            datetime(2026, 3, 1, 5, 3),
+        )
+        schedule = CronSchedule().every_n_hours(6, jitter="my-unique-task-id")
+        self.assertEqual(
+            schedule.next_after(datetime(2026, 3, 1, 6, 34)),
+            datetime(2026, 3, 1, 12, 33),
+        )
+
+    def test_next_after_weekday(self) -> None:
+        """Weekly schedules land on the requested weekday."""
+        schedule = CronSchedule().weekly().on_monday().at(9)
+        # 2026-03-04 is a Wednesday
+        self.assertEqual(
+            schedule.next_after(datetime(2026, 3, 4, 12, 0)),
+            datetime(2026, 3, 9, 9, 0),
+        )
+        schedule = CronSchedule(minute="0", hour="0", weekday="7")
+        self.assertEqual(
+            schedule.next_after(datetime(2026, 3, 4)),
+            datetime(2026, 3, 8),
+        )
+
+    def test_next_after_leap_day(self) -> None:
+        """Sparse schedules jump straight to the next leap year."""
+        schedule = CronSchedule(minute="0", hour="0", day="29", month="2")
+        self.assertEqual(
+            schedule.next_after(datetime(2026, 3, 1)),
+            datetime(2028, 2, 29),
+        )
+        self.assertEqual(
+            schedule.next_after(datetime(2097, 1, 1)),
+            datetime(2104, 2, 29),
+        )
+        self.assertEqual(
+            schedule.prev_before(datetime(2026, 3, 1)),
+            datetime(2024, 2, 29),
+        )
+
+    def test_day_or_weekday(self) -> None:
+        """Restricting both day and weekday matches either one."""
+        schedule = CronSchedule(minute="0", hour="0", day="15", weekday="1")
+        # 2026-03-09 is a Monday, the 15th is a Sunday
+        self.assertEqual(
+            schedule.next_after(datetime(2026, 3, 4)),
+            datetime(2026, 3, 9),
+        )
+        self.assertEqual(
+            schedule.next_after(datetime(2026, 3, 14)),
+            datetime(2026, 3, 15),
+        )
+        # A starred day field is combined with the weekday using AND
+        schedule = CronSchedule(minute="0", hour="0", day="*/2", weekday="1")
+        fire = schedule.next_after(datetime(2026, 3, 1))
+        assert fire is not None
+        self.assertEqual(fire.weekday(), 0)
+        self.assertEqual(fire.day % 2, 1)
+
+    def test_never_fires(self) -> None:
+        """Impossible schedules return None instead of searching forever."""
+        schedule = CronSchedule(minute="0", hour="0", day="31", month="2")
+        self.assertIsNone(schedule.next_after(datetime(2026, 1, 1)))
+        self.assertIsNone(schedule.prev_before(datetime(2026, 1, 1)))
+
+    def test_datetime_bounds(self) -> None:
+        """Searching off the end of the datetime range returns None."""
+        schedule = CronSchedule().daily().at(5)
+        self.assertIsNone(schedule.next_after(datetime.max))
+        self.assertIsNone(schedule.prev_before(datetime.min))
+
+    def test_prev_before(self) -> None:
+        """prev_before() walks backwards to the previous fire."""
+        schedule = CronSchedule().daily().at(5, 30)
+        self.assertEqual(
+            schedule.prev_before(datetime(2026, 3, 1, 5, 30)),
+            datetime(2026, 2, 28, 5, 30),
+        )
+        self.assertEqual(
+            schedule.prev_before(datetime(2026, 3, 1, 5, 30, 1)),
+            datetime(2026, 3, 1, 5, 30),
+        )
+        schedule = CronSchedule().monthly().on_day(31).at(0)
+        self.assertEqual(
+            schedule.prev_before(datetime(2026, 3, 1)),
+            datetime(2026, 1, 31),
+        )
+
+    def test_tzinfo_preserved(self) -> None:
+        """The reference time's tzinfo is attached to the result."""
+        schedule = CronSchedule().daily().at(5)
+        fire = schedule.next_after(datetime(2026, 3, 1, tzinfo=UTC))
+        self.assertEqual(fire, datetime(2026, 3, 1, 5, tzinfo=UTC))
+
+    def test_matches_brute_force(self) -> None:
+        """next_after() and prev_before() agree with a minute-by-minute scan."""
+        schedules = [
+            CronSchedule(),
+            CronSchedule().every_n_minutes(7, jitter="a"),
+            CronSchedule().weekly().on_friday().at(17, 30),
+            CronSchedule().monthly().on_day(31).at(23, 59),
+            CronSchedule(minute="0,30", hour="9-17", weekday="1-5"),
+            CronSchedule(minute="15", hour="*/5", day="1,15", weekday="0"),
+            CronSchedule(minute="0", hour="0", month="*/3"),
+        ]
+        start = datetime(2026, 1, 30, 22, 0)
+        for schedule in schedules:
+            t = start
+            for _ in range(8):
+                expected = _brute_force_next(schedule, t)
+                actual = schedule.next_after(t)
+                self.assertEqual(actual, expected, str(schedule))
+                self.assertLess(schedule.prev_before(expected) or t, expected)
+                self.assertEqual(
+                    schedule.prev_before(expected + timedelta(minutes=1)), expected
+                )
+                t = expected + timedelta(minutes=3)
+
+
+class TestCompiledSchedule(unittest.TestCase):
+    """Test cases for the bitmask form of a schedule."""
+
+    def test_masks(self) -> None:
+        """Each field is stored as an integer bitmask."""
+        compiled = CronSchedule(
+            minute="*/15", hour="9-17", day="1,15", month="3/3", weekday="1-5"
+        ).compile()
+        self.assertEqual(compiled.minute, 1 | 1 << 15 | 1 << 30 | 1 << 45)
+        self.assertEqual(compiled.hour, 0b111111111 << 9)
+        self.assertEqual(compiled.day, 1 | 1 << 14)
+        self.assertEqual(compiled.month, 1 << 2 | 1 << 5 | 1 << 8 | 1 << 11)
+        self.assertEqual(compiled.weekday, 0b0111110)
+        self.assertTrue(compiled.day_or_weekday)
+
+    def test_sunday_alias(self) -> None:
+        """Weekday 7 is folded onto 0."""
+        self.assertEqual(
+            CronSchedule(weekday="7").compile(), CronSchedule(weekday="0").compile()
+        )
+
+    def test_invalid_fields(self) -> None:
+        """Malformed or out-of-range fields raise ValueError."""
+        for schedule in [
+            CronSchedule(minute="60"),
+            CronSchedule(hour="*/0"),
+            CronSchedule(day="0"),
+            CronSchedule(month="5-3"),
+            CronSchedule(weekday="8"),
+            CronSchedule(day="L"),
+        ]:
+            with self.assertRaises(ValueError):
+                CompiledSchedule(schedule)
+
+    def test_compact(self) -> None:
+        """Compiled schedules are slotted, small, and share their masks."""
+        compiled = CronSchedule().daily().at(5, 30).compile()
+        self.assertFalse(hasattr(compiled, "__dict__"))
+        self.assertLess(sys.getsizeof(compiled), 100)
+        other = CronSchedule().weekly().on_monday().at(17, 30).compile()
+        self.assertIs(compiled.minute, other.minute)
+
+    def test_compile_cached(self) -> None:
+        """Equal schedules compile to the same cached instance."""
+        self.assertIs(
+            CronSchedule().daily().at(5).compile(),
+            CronSchedule(minute="0", hour="5").compile(),
+        )
+
+    def test_matches(self) -> None:
+        """matches() agrees with the minute-by-minute reference."""
+        schedule = CronSchedule(minute="0,30", hour="9-17", day="13", weekday="5")
+        compiled = schedule.compile()
+        t = datetime(2026, 3, 1)
+        fires = set()
+        fire = _brute_force_next(schedule, t - timedelta(minutes=1))
+        while fire < datetime(2026, 4, 1):
+            fires.add(fire)
+            fire = _brute_force_next(schedule, fire)
+        while t < datetime(2026, 4, 1):
+            self.assertEqual(compiled.matches(t), t in fires, t)
+            t += timedelta(minutes=10)
+        self.assertTrue(compiled.matches(datetime(2026, 3, 13, 9, 30, 59)))
+
+
+class TestParse(unittest.TestCase):
+    """Test cases for CronSchedule.parse()."""
+
+    def test_round_trip(self) -> None:
+        """Builder output parses back into an equal CronSchedule."""
+        schedules = [
+            CronSchedule(),
+            CronSchedule().daily().at(5, 30),
+            CronSchedule().weekly().on_friday().at(17),
+            CronSchedule().monthly().on_day(31).at(0),
+            CronSchedule().every_n_minutes(15),
+            CronSchedule().every_n_minutes(15, jitter="my-unique-task-id"),
+            CronSchedule().every_n_hours(6, jitter="my-unique-task-id"),
+        ]
+        for schedule in schedules:
+            self.assertEqual(CronSchedule.parse(str(schedule)), schedule)
+
+    def test_lists_ranges_steps(self) -> None:
+        """Lists, ranges and steps are kept as written."""
+        schedule = CronSchedule.parse("0,30 9-17/2 1,15 */3 1-5")
+        self.assertEqual(
+            schedule,
+            CronSchedule(
+                minute="0,30", hour="9-17/2", day="1,15", month="*/3", weekday="1-5"
+            ),
+        )
+        self.assertEqual(str(schedule), "0,30 9-17/2 1,15 */3 1-5")
+
+    def test_whitespace(self) -> None:
+        """Fields may be separated by any run of whitespace."""
+        self.assertEqual(
+            CronSchedule.parse("  30\t5  * *   1-5 \n"),
+            CronSchedule(minute="30", hour="5", weekday="1-5"),
+        )
+
+    def test_names(self) -> None:
+        """Month and weekday names are normalized to numbers."""
+        self.assertEqual(
+            CronSchedule.parse("0 9 * JAN,jul mon-FRI"),
+            CronSchedule(minute="0", hour="9", month="1,7", weekday="1-5"),
+        )
+        self.assertEqual(CronSchedule.parse("0 9 * * sunday").weekday, "0")
+
+    def test_macros(self) -> None:
+        """@-macros expand to their 5-field equivalents."""
+        self.assertEqual(str(CronSchedule.parse("@daily")), "0 0 * * *")
+        self.assertEqual(str(CronSchedule.parse("@hourly")), "0 * * * *")
+        self.assertEqual(str(CronSchedule.parse("@weekly")), "0 0 * * 0")
+        self.assertEqual(str(CronSchedule.parse("@monthly")), "0 0 1 * *")
+        self.assertEqual(str(CronSchedule.parse("@yearly")), "0 0 1 1 *")
+        self.assertEqual(CronSchedule.parse("@annually"), CronSchedule.parse("@yearly"))
+        with self.assertRaises(ValueError):
+            CronSchedule.parse("@reboot")
+
+    def test_validation(self) -> None:
+        """Malformed expressions and out-of-range values raise ValueError."""
+        invalid = [
+            "",
+            "* * * *",
+            "* * * * * * *",
+            "60 * * * * *",
+            "60 * * * *",
+            "* 24 * * *",
+            "* * 0 * *",
+            "* * 32 * *",
+            "* * * 13 *",
+            "* * * * 8",
+            "*/0 * * * *",
+            "*/60 * * * *",
+            "5-3 * * * *",
+            "1,,2 * * * *",
+            "1- * * * *",
+            "*/ * * * *",
+            "a * * * *",
+            "* * * foo *",
+            "* * * * mon-",
+            "0 0 L * *",
+            "1x * * * *",
+        ]
+        for expr in invalid:
+            with self.assertRaises(ValueError, msg=expr):
+                CronSchedule.parse(expr)
+
+    def test_validation_messages(self) -> None:
+        """Range errors use the same messages as the builder methods."""
+        with self.assertRaisesRegex(ValueError, "Hour must be between 0 and 23"):
+            CronSchedule.parse("0 24 * * *")
+        with self.assertRaisesRegex(ValueError, "Minute must be between 0 and 59"):
+            CronSchedule.parse("60 0 * * *")
+        with self.assertRaisesRegex(ValueError, "Day must be between 1 and 31"):
+            CronSchedule.parse("0 0 32 * *")
+
+    def test_sunday_alias(self) -> None:
+        """Weekday 7 is accepted as Sunday."""
+        schedule = CronSchedule.parse("0 0 * * 7")
+        self.assertEqual(schedule.weekday, "7")
+        self.assertEqual(
+            schedule.next_after(datetime(2026, 3, 4)), datetime(2026, 3, 8)
+        )
+
+    def test_cached(self) -> None:
+        """Parsing the same text twice returns the cached instance."""
+        self.assertIs(
+            CronSchedule.parse("15 3 * * 2"), CronSchedule.parse("15 3 * * 2")
+        )
+
+
+HAS_NUMPY = importlib.util.find_spec("numpy") is not None
+
+
+def _epoch_minutes(dt: datetime) -> int:
+    return int(dt.replace(tzinfo=UTC).timestamp()) // 60
+
+
+class TestBatchMatches(unittest.TestCase):
+    """Test cases for fluentcron.batch.matches()."""
+
+    schedules: ClassVar[list[CronSchedule]] = [
+        CronSchedule(),
+        CronSchedule().daily().at(5, 30),
+        CronSchedule().every_n_minutes(7, jitter="a"),
+        CronSchedule(minute="0,30", hour="9-17", weekday="1-5"),
+        CronSchedule(minute="15", hour="*/5", day="1,15", weekday="0"),
+        CronSchedule(minute="0", hour="0", day="29", month="2"),
+        CronSchedule(minute="*/10", month="3"),
+    ]
+
+    def _expected(self, schedule: CronSchedule, minutes: list[int]) -> bytearray:
+        compiled = schedule.compile()
+        return bytearray(
+            compiled.matches(datetime(1970, 1, 1) + timedelta(minutes=m))
+            for m in minutes
+        )
+
+    def test_matches_array(self) -> None:
+        """array('q') input agrees with per-datetime matching."""
+        start = _epoch_minutes(datetime(2028, 1, 20))
+        timestamps = array("q", range(start, start + 60 * 24 * 45, 5))
+        for schedule in self.schedules:
+            result = batch.matches(schedule, timestamps)
+            self.assertIsInstance(result, bytearray)
+            self.assertEqual(
+                result, self._expected(schedule, list(timestamps)), str(schedule)
+            )
+
+    def test_unordered_and_negative(self) -> None:
+        """Timestamps need not be sorted and may precede the epoch."""
+        timestamps = [
+            _epoch_minutes(datetime(1969, 12, 31, 5, 30)),
+            _epoch_minutes(datetime(2026, 3, 1, 5, 30)),
+            _epoch_minutes(datetime(2001, 7, 4, 5, 31)),
+            _epoch_minutes(datetime(1999, 12, 31, 5, 30)),
+        ]
+        schedule = CronSchedule().daily().at(5, 30)
+        self.assertEqual(batch.matches(schedule, timestamps), bytearray([1, 1, 0, 1]))
+        self.assertEqual(
+            batch.matches(schedule.compile(), iter(timestamps)),
+            bytearray([1, 1, 0, 1]),
+        )
+
+    def test_empty(self) -> None:
+        """An empty input gives an empty mask."""
+        self.assertEqual(batch.matches(CronSchedule(), array("q")), bytearray())
+
+    @unittest.skipUnless(HAS_NUMPY, "NumPy is not installed")
+    def test_matches_numpy(self) -> None:
+        """NumPy input returns a bool array."""
+        import numpy as np
+
+        start = _epoch_minutes(datetime(2028, 2, 1))
+        timestamps = np.arange(start, start + 60 * 24 * 40, 3, dtype=np.int64)
+        for schedule in self.schedules:
+            result = batch.matches(schedule, timestamps)
+            self.assertEqual(result.dtype, np.bool_)
+            self.assertEqual(
+                bytearray(result.astype(np.uint8).tobytes()),
+                self._expected(schedule, timestamps.tolist()),
+            )
+
+
+class TestScheduleIndex(unittest.TestCase):
+    """Test cases for ScheduleIndex."""
+
+    def _schedules(self) -> dict[str, CronSchedule]:
+        return {
+            "every-minute": CronSchedule(),
+            "daily": CronSchedule().daily().at(5, 30),
+            "daily-copy": CronSchedule().daily().at(5, 30),
+            "jittered": CronSchedule().every_n_minutes(15, jitter="my-unique-task-id"),
+            "business": CronSchedule(minute="0,30", hour="9-17", weekday="1-5"),
+            "either": CronSchedule(minute="0", hour="9", day="15", weekday="1"),
+            "leap": CronSchedule(minute="0", hour="0", day="29", month="2"),
+            "never": CronSchedule(minute="0", hour="0", day="31", month="2"),
+        }
+
+    def test_due_at_matches_linear_scan(self) -> None:
+        """due_at() returns the same keys as checking every schedule."""
+        schedules = self._schedules()
+        index = ScheduleIndex(schedules)
+        t = datetime(2028, 2, 27)
+        while t < datetime(2028, 3, 20):
+            expected = {k for k, s in schedules.items() if s.compile().matches(t)}
+            self.assertEqual(set(index.due_at(t)), expected, t)
+            t += timedelta(minutes=15)
+
+    def test_identical_schedules_share_a_bucket(self) -> None:
+        """Equal schedules occupy a single slot."""
+        index = ScheduleIndex(self._schedules())
+        self.assertEqual(len(index), 8)
+        self.assertEqual(len(index._slots), 7)
+        self.assertEqual(
+            index.due_at(datetime(2026, 3, 2, 5, 30)),
+            ["every-minute", "daily", "daily-copy"],
+        )
+
+    def test_add_remove(self) -> None:
+        """The index can be updated incrementally."""
+        index: ScheduleIndex[str] = ScheduleIndex()
+        t = datetime(2026, 3, 2, 5, 30)
+        self.assertEqual(index.due_at(t), [])
+        index.add("a", CronSchedule().daily().at(5, 30))
+        index.add("b", CronSchedule().daily().at(6))
+        self.assertEqual(index.due_at(t), ["a"])
+        # Re-adding a key replaces its schedule
+        index.add("a", CronSchedule().daily().at(6))
+        self.assertEqual(index.due_at(t), [])
+        self.assertEqual(index.due_at(t.replace(hour=6, minute=0)), ["b", "a"])
+        index.remove("b")
+        self.assertNotIn("b", index)
+        self.assertEqual(index.due_at(t.replace(hour=6, minute=0)), ["a"])
+        with self.assertRaises(KeyError):
+            index.remove("b")
+        index.discard("b")
+        # Freed slots are reused
+        index.add("c", CronSchedule().weekly().on_monday().at(5, 30))
+        self.assertEqual(index.due_at(t), ["c"])
+        self.assertEqual(len(index._buckets), 2)
+        self.assertEqual(
+            index.get("c"), CronSchedule(minute="30", hour="5", weekday="1").compile()
+        )
+
+    def test_many_schedules(self) -> None:
+        """Large sets of distinct schedules grow the bitmaps correctly."""
+        index: ScheduleIndex[int] = ScheduleIndex(
+            (i, CronSchedule(minute=str(i % 60), hour=str(i // 60 % 24)))
+            for i in range(2000)
+        )
+        self.assertEqual(index.due_at(datetime(2026, 3, 2, 3, 7)), [187, 1627])
+        for i in range(0, 2000, 2):
+            index.remove(i)
+        self.assertEqual(index.due_at(datetime(2026, 3, 2, 3, 7)), [187, 1627])
+        self.assertEqual(index.due_at(datetime(2026, 3, 2, 3, 8)), [])
+
+
+class TestIterFires(unittest.TestCase):
+    """Test cases for iter_fires()."""
+
+    def test_merged_order(self) -> None:
+        """Fires from all schedules are merged chronologically."""
+        schedules = {
+            "quarter-hour": CronSchedule().every_n_minutes(15),
+            "hourly": CronSchedule(minute="0"),
+            "daily": CronSchedule().daily().at(1, 10),
+        }
+        start = datetime(2026, 3, 1, 0, 50)
+        fires = list(iter_fires(schedules, start, datetime(2026, 3, 1, 1, 31)))
+        self.assertEqual(
+            fires,
+            [
+                (datetime(2026, 3, 1, 1, 0), "quarter-hour"),
+                (datetime(2026, 3, 1, 1, 0), "hourly"),
+                (datetime(2026, 3, 1, 1, 10), "daily"),
+                (datetime(2026, 3, 1, 1, 15), "quarter-hour"),
+                (datetime(2026, 3, 1, 1, 30), "quarter-hour"),
+            ],
+        )
+
+    def test_matches_per_schedule_enumeration(self) -> None:
+        """The stream equals sorting every schedule's individual fires."""
+        schedules = [
+            (0, CronSchedule().every_n_minutes(7, jitter="a")),
+            (1, CronSchedule(minute="0,30", hour="9-17", weekday="1-5")),
+            (2, CronSchedule().monthly().on_day(31).at(23, 59)),
+            (3, CronSchedule(minute="0", hour="0", day="31", month="2")),
+        ]
+        start, end = datetime(2026, 1, 30), datetime(2026, 4, 2)
+        expected = []
+        for key, schedule in schedules:
+            fire = schedule.next_after(start - timedelta(minutes=1))
+            while fire is not None and fire < end:
+                expected.append((fire, key))
+                fire = schedule.next_after(fire)
+        expected.sort()
+        self.assertEqual(list(iter_fires(schedules, start, end)), expected)
+
+    def test_start_inclusive(self) -> None:
+        """A fire exactly at start is included; one before it is not."""
+        schedule = CronSchedule().daily().at(5)
+        fires = iter_fires({"a": schedule}, datetime(2026, 3, 1, 5))
+        self.assertEqual(next(fires), (datetime(2026, 3, 1, 5), "a"))
+        fires = iter_fires({"a": schedule}, datetime(2026, 3, 1, 5, 0, 1))
+        self.assertEqual(next(fires), (datetime(2026, 3, 2, 5), "a"))
+
+    def test_unbounded_is_lazy(self) -> None:
+        """Without an end the stream is infinite but lazy."""
+        fires = iter_fires({"a": CronSchedule()}, datetime(2026, 3, 1))
+        self.assertEqual(next(fires), (datetime(2026, 3, 1), "a"))
+        self.assertEqual(next(fires), (datetime(2026, 3, 1, 0, 1), "a"))
+
+    def test_empty(self) -> None:
+        """Schedules that never fire produce an empty stream."""
+        never = CronSchedule(minute="0", hour="0", day="30", month="2")
+        self.assertEqual(list(iter_fires({"a": never}, datetime(2026, 3, 1))), [])
+        self.assertEqual(list(iter_fires({}, datetime(2026, 3, 1))), [])
+
+
+class TestInterning(unittest.TestCase):
+    """Test cases for SchedulePool and CronSchedule.intern()."""
+
+    def test_intern_returns_canonical_instance(self) -> None:
+        """Equal schedules intern to the same object."""
+        first = CronSchedule().daily().at(5, 30).intern()
+        second = CronSchedule(minute="30", hour="5").intern()
+        self.assertIs(first, second)
+        self.assertIn(first, default_pool)
+
+    def test_memoized_render_and_compile(self) -> None:
+        """Rendered strings and compiled forms are computed once per entry."""
+        pool = SchedulePool()
+        schedule = CronSchedule().weekly().on_monday().at(9)
+        text = pool.render(schedule)
+        self.assertEqual(text, "0 9 * * 1")
+        self.assertIs(pool.render(CronSchedule().weekly().on_monday().at(9)), text)
+        compiled = pool.compile(schedule)
+        self.assertIs(pool.compile(schedule), compiled)
+        self.assertEqual(compiled, schedule.compile())
+
+    def test_counters_and_eviction(self) -> None:
+        """The pool is bounded and counts hits, misses and evictions."""
+        pool = SchedulePool(maxsize=2)
+        a, b, c = CronSchedule().at(1), CronSchedule().at(2), CronSchedule().at(3)
+        pool.intern(a)
+        pool.intern(b)
+        pool.intern(a)  # a is now the most recently used
+        pool.intern(c)  # evicts b
+        self.assertIn(a, pool)
+        self.assertNotIn(b, pool)
+        self.assertEqual(tuple(pool.stats()), (1, 3, 1, 2, 2))
+        pool.clear()
+        self.assertEqual(tuple(pool.stats()), (0, 0, 0, 0, 2))
+        with self.assertRaises(ValueError):
+            SchedulePool(maxsize=0)
+
+
+class TestJitterPlanner(unittest.TestCase):
+    """Test cases for JitterPlanner."""
+
+    def test_balances_daily_jobs(self) -> None:
+        """Jobs at the same hour are spread evenly across its minutes."""
+        base = CronSchedule().daily().at(12)
+        keys = [f"job-{i}" for i in range(1000)]
+        planner = JitterPlanner({key: base for key in keys})
+        self.assertEqual(planner.peak(), 17)  # ceil(1000 / 60)
+        hashed = [0] * 60
+        for key in keys:
+            hashed[_jitter_offset(key, 60)] += 1
+        self.assertGreater(max(hashed), planner.peak())
+        histogram = planner.load_histogram()
+        self.assertEqual(len(histogram), 1440)
+        self.assertEqual(sum(histogram), 1000)
+        self.assertEqual(sum(histogram[12 * 60 : 13 * 60]), 1000)
+
+    def test_schedules(self) -> None:
+        """Planned schedules keep the base's other fields."""
+        planner = JitterPlanner(
+            {
+                "a": CronSchedule().weekly().on_monday().at(9),
+                "b": CronSchedule().every_n_minutes(15),
+                "c": CronSchedule(),
+            }
+        )
+        a = planner.schedule("a")
+        self.assertEqual((a.hour, a.weekday), ("9", "1"))
+        self.assertEqual(a.minute, str(planner.offset("a")))
+        self.assertEqual(planner.schedule("b").minute, f"{planner.offset('b')}/15")
+        self.assertEqual(planner.schedule("c"), CronSchedule())
+        self.assertEqual(set(planner.schedules()), {"a", "b", "c"})
+        self.assertEqual(planner.peak(), 2)
+
+    def test_empty_planner_uses_hash_offset(self) -> None:
+        """A lone job gets the same offset as hash jitter."""
+        planner = JitterPlanner()
+        schedule = planner.add("my-unique-task-id", CronSchedule().daily().at(12))
+        self.assertEqual(
+            schedule, CronSchedule().daily().at(12, jitter="my-unique-task-id")
+        )
+
+    def test_order_independent(self) -> None:
+        """The plan does not depend on the order jobs are listed in."""
+        jobs = [(f"job-{i}", CronSchedule().every_n_minutes(10)) for i in range(200)]
+        forward = JitterPlanner(jobs).schedules()
+        backward = JitterPlanner(reversed(jobs)).schedules()
+        self.assertEqual(forward, backward)
+
+    def test_incremental_changes_move_few_jobs(self) -> None:
+        """Adding moves no existing job; removing moves at most one."""
+        base = CronSchedule().daily().at(3)
+        planner = JitterPlanner({f"job-{i}": base for i in range(500)})
+        before = planner.schedules()
+        planner.add("new-job", base)
+        after = planner.schedules()
+        moved = [k for k in before if before[k] != after[k]]
+        self.assertEqual(moved, [])
+        planner.remove("job-7")
+        final = planner.schedules()
+        moved = [k for k in final if final[k] != after[k]]
+        self.assertLessEqual(len(moved), 1)
+        self.assertEqual(planner.peak(), 9)  # ceil(500 / 60)
+        self.assertNotIn("job-7", planner)
+        with self.assertRaises(KeyError):
+            planner.remove("job-7")
+
+    def test_load_matches_schedules(self) -> None:
+        """The load histogram counts the fires of the planned schedules."""
+        bases = [
+            CronSchedule().daily().at(9),
+            CronSchedule().every_n_minutes(7),
+            CronSchedule().every_n_minutes(15).between_hours(8, 17),
+            CronSchedule(minute="5/20", hour="*/3"),
+        ]
+        planner = JitterPlanner({f"job-{i}": bases[i % len(bases)] for i in range(400)})
+        for i in range(0, 400, 3):
+            planner.remove(f"job-{i}")
+        expected = [0] * 1440
+        for schedule in planner.schedules().values():
+            c = schedule.compile()
+            for minute in range(1440):
+                if c.hour >> (minute // 60) & 1 and c.minute >> (minute % 60) & 1:
+                    expected[minute] += 1
+        self.assertEqual(planner.load_histogram(), expected)
+
+    def test_rejects_unjitterable_minutes(self) -> None:
+        """Minute fields that jitter cannot shift raise ValueError."""
+        planner = JitterPlanner({"a": CronSchedule().daily().at(9)})
+        for minute in ("0,30", "10-20", "5-50/15", "30/15"):
+            with self.assertRaisesRegex(ValueError, "Cannot jitter minute field"):
+                planner.add("a", CronSchedule(minute=minute))
+        self.assertEqual(planner.schedule("a").hour, "9")
+
+
+class TestBench(unittest.TestCase):
+    """Smoke test for the benchmark runner."""
+
+    def test_json_report(self) -> None:
+        """python -m fluentcron.bench writes a JSON report."""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "bench.json")
+            code = bench.main(["--sizes", "20", "--repeat", "1", "--output", path])
+            self.assertEqual(code, 0)
+            with open(path) as f:
+                report = json.load(f)
+        self.assertTrue(report["jitter_stable"])
+        self.assertEqual(
+            {result["name"] for result in report["results"]}, set(bench.BENCHMARKS)
+        )
+        for result in report["results"]:
+            self.assertEqual(result["size"], 20)
+            self.assertGreaterEqual(result["best_s"], 0)
+
+
+def _brute_force_zoned(
+    schedule: CronSchedule, zone: ZoneInfo, start: datetime, end: datetime
+) -> list[datetime]:
+    """Every UTC minute in [start, end) whose wall time in ``zone`` matches."""
+    compiled = schedule.compile()
+    result = []
+    t = start
+    while t < end:
+        local = t.astimezone(zone)
+        if compiled.matches(local.replace(tzinfo=None)):
+            result.append(local)
+        t += timedelta(minutes=1)
+    return result
+
+
+class TestZonedSchedule(unittest.TestCase):
+    """Test cases for time zone aware evaluation."""
+
+    new_york = ZoneInfo("America/New_York")
+
+    def _fires(
+        self, zoned: ZonedSchedule, start: datetime, end: datetime
+    ) -> list[datetime]:
+        result = []
+        t = zoned.next_after(start - timedelta(microseconds=1))
+        while t is not None and t < end:
+            result.append(t)
+            t = zoned.next_after(t)
+        return result
+
+    def test_transition_table(self) -> None:
+        """Transitions are found to the second and cached per zone."""
+        table = transitions(self.new_york, datetime(2026, 6, 1))
+        self.assertIs(table, transitions(self.new_york, datetime(2027, 1, 1)))
+        self.assertIn(datetime(2026, 3, 8, 7), table.instants)
+        self.assertIn(datetime(2026, 11, 1, 6), table.instants)
+        self.assertEqual(
+            table.offset_at(datetime(2026, 3, 8, 6, 59)), timedelta(hours=-5)
+        )
+        self.assertEqual(table.offset_at(datetime(2026, 3, 8, 7)), timedelta(hours=-4))
+        self.assertEqual(table.resolve(datetime(2026, 3, 8, 2, 30)), [])
+        self.assertEqual(len(table.resolve(datetime(2026, 11, 1, 1, 30))), 2)
+        self.assertIsInstance(table, TransitionTable)
+
+    def test_matches_brute_force_with_both_and_skip(self) -> None:
+        """With skip/both, fires are exactly the UTC minutes whose wall time matches."""
+        schedules = [
+            CronSchedule().every_n_minutes(15),
+            CronSchedule().daily().at(1, 30),
+            CronSchedule().daily().at(2, 30),
+            CronSchedule(minute="0", hour="*"),
+        ]
+        for start in [
+            datetime(2026, 3, 7, 12, tzinfo=UTC),
+            datetime(2026, 10, 31, 12, tzinfo=UTC),
+        ]:
+            end = start + timedelta(days=2)
+            for schedule in schedules:
+                zoned = schedule.in_zone(
+                    self.new_york, nonexistent="skip", ambiguous="both"
+                )
+                self.assertEqual(
+                    self._fires(zoned, start, end),
+                    _brute_force_zoned(schedule, self.new_york, start, end),
+                    str(schedule),
+                )
+
+    def test_nonexistent_policies(self) -> None:
+        """Times in the spring-forward gap are skipped or shifted."""
+        start = datetime(2026, 3, 7, 12, tzinfo=self.new_york)
+        schedule = CronSchedule().daily().at(2, 30)
+        self.assertEqual(
+            schedule.in_zone(self.new_york).next_after(start),
+            datetime(2026, 3, 8, 3, 0, tzinfo=self.new_york),
+        )
+        self.assertEqual(
+            schedule.in_zone(self.new_york, nonexistent="skip").next_after(start),
+            datetime(2026, 3, 9, 2, 30, tzinfo=self.new_york),
+        )
+        # Every fire in the gap collapses into one at the end of the gap
+        zoned = CronSchedule().every_n_minutes(15).in_zone(self.new_york)
+        fires = self._fires(
+            zoned,
+            datetime(2026, 3, 8, 1, 40, tzinfo=self.new_york),
+            datetime(2026, 3, 8, 3, 20, tzinfo=self.new_york),
+        )
+        self.assertEqual(
+            [f.strftime("%H:%M%z") for f in fires],
+            ["01:45-0500", "03:00-0400", "03:15-0400"],
+        )
+
+    def test_ambiguous_policies(self) -> None:
+        """Times in the fall-back fold fire once or twice depending on policy."""
+        start = datetime(2026, 10, 31, 12, tzinfo=self.new_york)
+        end = datetime(2026, 11, 1, 12, tzinfo=self.new_york)
+        schedule = CronSchedule().daily().at(1, 30)
+        first = self._fires(schedule.in_zone(self.new_york), start, end)
+        self.assertEqual([f.utcoffset() for f in first], [timedelta(hours=-4)])
+        last = self._fires(
+            schedule.in_zone(self.new_york, ambiguous="last"), start, end
+        )
+        self.assertEqual([f.utcoffset() for f in last], [timedelta(hours=-5)])
+        self.assertEqual(last[0].fold, 1)
+        both = self._fires(
+            schedule.in_zone("America/New_York", ambiguous="both"), start, end
+        )
+        self.assertEqual(
+            [f.utcoffset() for f in both], [timedelta(hours=-4), timedelta(hours=-5)]
+        )
+
+    def test_starting_inside_fold(self) -> None:
+        """Starting in the first pass of a fold still finds second-pass fires."""
+        zoned = CronSchedule(minute="10", hour="1").in_zone(
+            self.new_york, ambiguous="both"
+        )
+        start = datetime(2026, 11, 1, 1, 50, tzinfo=self.new_york)  # first pass
+        fire = zoned.next_after(start)
+        assert fire is not None
+        self.assertEqual(fire.fold, 1)
+        self.assertEqual(fire.utcoffset(), timedelta(hours=-5))
+
+    def test_validation(self) -> None:
+        """Naive datetimes and unknown policies are rejected."""
+        zoned = CronSchedule().in_zone("Europe/London")
+        with self.assertRaises(ValueError):
+            zoned.next_after(datetime(2026, 1, 1))
+        with self.assertRaises(ValueError):
+            ZonedSchedule(CronSchedule(), "UTC", ambiguous="never")  # type: ignore[arg-type]
+
+
+class TestBulkCompile(unittest.TestCase):
+    """Test cases for compiling many spec tuples at once."""
+
+    specs: ClassVar[list[tuple[object, ...]]] = [
+        ("daily_at", 5),
+        ("daily_at", 5, 30),
+        ("daily_at", 12, None, "job-1"),
+        ("weekly_on", "monday", 9),
+        ("weekly_on", 5, 17, None, "job-2"),
+        ("monthly_on_day", 1, 0),
+        ("every_n_minutes", 15, "job-3"),
+        ("every_n_hours", 4),
+    ] * 5
+
+    def test_matches_shortcuts(self) -> None:
+        """Rendered specs equal the corresponding shortcut calls."""
+        self.assertEqual(
+            list(bulk.compile_many(self.specs[:8])),
+            [
+                daily_at(5),
+                daily_at(5, 30),
+                daily_at(12, jitter="job-1"),
+                weekly_on("monday", 9),
+                weekly_on(5, 17, jitter="job-2"),
+                monthly_on_day(1, 0),
+                every_n_minutes(15, jitter="job-3"),
+                every_n_hours(4),
+            ],
+        )
+
+    def test_process_pool_matches_serial(self) -> None:
+        """The process pool yields the serial results in input order."""
+        serial = list(bulk.compile_many(self.specs, workers=1))
+        parallel = list(
+            bulk.compile_many(self.specs, workers=2, chunksize=3, serial_threshold=0)
+        )
+        self.assertEqual(parallel, serial)
+
+    def test_compiled_output(self) -> None:
+        """output="compiled" yields CompiledSchedule objects."""
+        compiled = list(
+            bulk.compile_many(
+                iter(self.specs),
+                workers=2,
+                output="compiled",
+                chunksize=7,
+                serial_threshold=0,
+            )
+        )
+        self.assertEqual(
+            compiled,
+            [bulk.build(spec).compile() for spec in self.specs],
+        )
+
+    def test_workers_use_jitter_hash(self) -> None:
+        """Workers use the caller's jitter hash strategy, even when spawned."""
+        specs = [("every_n_minutes", 15, f"job-{i}") for i in range(40)]
+        default = get_jitter_hash()
+        start_method = multiprocessing.get_start_method(allow_none=True)
+        try:
+            multiprocessing.set_start_method("spawn", force=True)
+            set_jitter_hash("blake2b")
+            serial = list(bulk.compile_many(specs, workers=1))
+            self.assertEqual(serial[0], every_n_minutes(15, jitter="job-0"))
+            self.assertEqual(
+                list(bulk.compile_many(specs, workers=2, serial_threshold=10)),
+                serial,
+            )
+            # A strategy that cannot be pickled is compiled in-process
+            set_jitter_hash(lambda data: len(data))
+            self.assertEqual(
+                list(bulk.compile_many(specs, workers=2, serial_threshold=10)),
+                list(bulk.compile_many(specs, workers=1)),
+            )
+        finally:
+            set_jitter_hash(default)
+            multiprocessing.set_start_method(start_method, force=True)
+
+    def test_invalid_specs(self) -> None:
+        """Invalid specs raise the builder's ValueError on either path."""
+        specs = [("daily_at", 5), ("daily_at", 24)]
+        for threshold in (bulk.SERIAL_THRESHOLD, 0):
+            with self.assertRaisesRegex(ValueError, "Hour must be between"):
+                list(bulk.compile_many(specs, workers=2, serial_threshold=threshold))
+        with self.assertRaisesRegex(ValueError, "Unknown schedule spec"):
+            list(bulk.compile_many([("yearly", 1)]))
+        with self.assertRaises(ValueError):
+            bulk.compile_many([], output="json")  # type: ignore[call-overload]
+        for workers in (1, 2):
+            with self.assertRaisesRegex(ValueError, "chunksize"):
+                bulk.compile_many(self.specs, workers, chunksize=0)
+
+    def test_serial_chunksize(self) -> None:
+        """The in-process path builds ``chunksize`` specs at a time."""
+        specs = iter(self.specs)
+        results = bulk.compile_many(specs, 1, chunksize=3, serial_threshold=0)
+        self.assertEqual(next(results), daily_at(5))
+        # Only the first chunk has been taken from the input
+        self.assertEqual(next(specs), self.specs[3])
+
+
+class TestCountBetween(unittest.TestCase):
+    """Test cases for count_between() / fires_per_day_histogram()."""
+
+    def _enumerate(self, schedule: CronSchedule, start: datetime, end: datetime) -> int:
+        count = 0
+        fire = schedule.next_after(start - timedelta(microseconds=1))
+        while fire is not None and fire < end:
+            count += 1
+            fire = schedule.next_after(fire)
+        return count
+
+    def test_every_minute_for_a_year(self) -> None:
+        """A year of "* * * * *" is counted without enumeration."""
+        schedule = CronSchedule()
+        self.assertEqual(
+            schedule.count_between(datetime(2025, 1, 1), datetime(2026, 1, 1)),
+            365 * 1440,
+        )
+        self.assertEqual(
+            schedule.count_between(datetime(2024, 1, 1), datetime(2025, 1, 1)),
+            366 * 1440,
+        )
+        # Spans of several 400-year cycles
+        self.assertEqual(
+            schedule.count_between(datetime(1, 1, 1), datetime(2001, 1, 1)),
+            (datetime(2001, 1, 1) - datetime(1, 1, 1)).days * 1440,
+        )
+
+    def test_matches_enumeration(self) -> None:
+        """Counts agree with enumerating fires, including partial days."""
+        expressions = [
+            "0 0 13 * 5",
+            "*/7 3-5 * 2 *",
+            "30 12 29 2 *",
+            "5 * 1,15 * 1-3",
+            "0 0 31 * *",
+            "*/20 */3 */2 */3 0,6",
+        ]
+        windows = [
+            (datetime(2024, 1, 1), datetime(2025, 1, 1)),
+            (datetime(2023, 2, 28, 12, 30, 30), datetime(2024, 3, 1, 4, 5)),
+            (datetime(2025, 6, 15, 5, 1), datetime(2025, 6, 15, 5, 1, 0, 1)),
+            (datetime(2026, 12, 31, 23, 59), datetime(2027, 2, 1)),
+        ]
+        for expr in expressions:
+            schedule = CronSchedule.parse(expr)
+            for start, end in windows:
+                with self.subTest(expr=expr, start=start, end=end):
+                    self.assertEqual(
+                        schedule.count_between(start, end),
+                        self._enumerate(schedule, start, end),
+                    )
+
+    def test_empty_and_unsatisfiable(self) -> None:
+        """Empty windows and impossible schedules count zero."""
+        start = datetime(2026, 1, 1)
+        self.assertEqual(CronSchedule().count_between(start, start), 0)
+        self.assertEqual(
+            CronSchedule().count_between(start, start - timedelta(days=1)), 0
+        )
+        self.assertEqual(
+            CronSchedule.parse("0 0 30 2 *").count_between(start, datetime(2030, 1, 1)),
+            0,
+        )
+
+    def test_histogram(self) -> None:
+        """The histogram has one entry per day and sums to count_between()."""
+        schedule = CronSchedule.parse("0 9,17 * * 1-5")
+        histogram = schedule.fires_per_day_histogram(date(2026, 3, 1), date(2026, 3, 8))
+        self.assertEqual(histogram, [0, 2, 2, 2, 2, 2, 0])
+        start, end = date(2025, 12, 20), date(2027, 1, 3)
+        histogram = schedule.fires_per_day_histogram(start, end)
+        self.assertEqual(len(histogram), (end - start).days)
+        self.assertEqual(
+            sum(histogram),
+            schedule.count_between(
+                datetime.combine(start, datetime.min.time()),
+                datetime.combine(end, datetime.min.time()),
+            ),
+        )
+        self.assertEqual(schedule.fires_per_day_histogram(end, start), [])
+
+
+class _FakeClock:
+    """A UTC clock that runs in real time from ``start`` and can be moved."""
+
+    def __init__(self, start: datetime) -> None:
+        self.offset = start - datetime.now(UTC)
+
+    def __call__(self) -> datetime:
+        return datetime.now(UTC) + self.offset
+
+
+class TestAsyncScheduler(unittest.TestCase):
+    """Test cases for the asyncio scheduler runtime."""
+
+    def test_dispatches_due_jobs(self) -> None:
+        """Jobs run once their fire time is reached, and not before."""
+        clock = _FakeClock(datetime(2026, 3, 1, 11, 59, 59, 900_000, tzinfo=UTC))
+        runs: list[str] = []
+
+        def job(name: str) -> Callable[[], Awaitable[None]]:
+            async def run() -> None:
+                runs.append(name)
+
+            return run
+
+        async def main() -> AsyncScheduler:
+            async with AsyncScheduler(clock=clock) as scheduler:
+                scheduler.add_job(CronSchedule().daily().at(12), job("noon"))
+                scheduler.add_job(CronSchedule().daily().at(13), job("one"))
+                scheduler.add_job(
+                    CronSchedule().daily().at(12).in_zone("Europe/London"),
+                    job("zoned"),
+                )
+                await asyncio.sleep(0.3)
+            return scheduler
+
+        scheduler = asyncio.run(main())
+        self.assertEqual(sorted(runs), ["noon", "zoned"])
+        stats = scheduler.stats()
+        self.assertEqual((stats.jobs, stats.dispatched), (3, 2))
+        self.assertGreaterEqual(stats.lag_max, 0.0)
+        self.assertLess(stats.lag_max, 0.5)
+
+    def test_max_instances_and_errors(self) -> None:
+        """Fires over max_instances are skipped; errors are counted."""
+        clock = _FakeClock(datetime(2026, 3, 1, 11, 59, 59, 900_000, tzinfo=UTC))
+
+        async def main() -> AsyncScheduler:
+            release = asyncio.Event()
+
+            async def slow() -> None:
+                await release.wait()
+
+            async def broken() -> None:
+                raise RuntimeError("boom")
+
+            asyncio.get_running_loop().set_exception_handler(lambda loop, ctx: None)
+            scheduler = AsyncScheduler(clock=clock)
+            scheduler.add_job(CronSchedule(), slow, max_instances=1)
+            scheduler.add_job(CronSchedule(), broken)
+            scheduler.start()
+            await asyncio.sleep(0.2)
+            # Jump to the next minute while the first slow run is in flight
+            clock.offset += timedelta(minutes=1)
+            scheduler.wakeup()
+            await asyncio.sleep(0.05)
+            release.set()
+            await scheduler.shutdown()
+            return scheduler
+
+        stats = asyncio.run(main()).stats()
+        self.assertEqual(
+            (stats.dispatched, stats.skipped, stats.errors, stats.misfired),
+            (3, 1, 2, 0),
+        )
+
+    def test_misfire_grace(self) -> None:
+        """Fires found later than the grace period are dropped as misfires."""
+        clock = _FakeClock(datetime(2026, 3, 1, 11, 59, 59, 900_000, tzinfo=UTC))
+        runs: list[datetime] = []
+
+        async def record() -> None:
+            runs.append(clock())
+
+        async def main() -> AsyncScheduler:
+            scheduler = AsyncScheduler(clock=clock)
+            scheduler.add_job(CronSchedule().daily().at(12), record, misfire_grace=5)
+            scheduler.add_job(CronSchedule().daily().at(12), record, misfire_grace=None)
+            scheduler.start()
+            # Simulate the loop being stalled past the fire time
+            clock.offset += timedelta(seconds=10)
+            await asyncio.sleep(0.3)
+            await scheduler.shutdown()
+            return scheduler
+
+        scheduler = asyncio.run(main())
+        self.assertEqual(len(runs), 1)
+        stats = scheduler.stats()
+        self.assertEqual((stats.dispatched, stats.misfired), (1, 1))
+        self.assertGreater(stats.lag_max, 9)
+
+    def test_validation(self) -> None:
+        """Invalid job settings and duplicate ids are rejected."""
+
+        async def noop() -> None:
+            pass
+
+        scheduler = AsyncScheduler()
+        job_id = scheduler.add_job(CronSchedule(), noop)
+        with self.assertRaises(ValueError):
+            scheduler.add_job(CronSchedule(), noop, job_id=job_id)
+        with self.assertRaises(ValueError):
+            scheduler.add_job(CronSchedule(), noop, max_instances=0)
+        with self.assertRaises(ValueError):
+            scheduler.add_job(CronSchedule(), noop, misfire_grace=-1)
+        scheduler.remove_job(job_id)
+        with self.assertRaises(KeyError):
+            scheduler.remove_job(job_id)
+        self.assertEqual(len(scheduler), 0)
+
+
+class TestThreadPoolScheduler(unittest.TestCase):
+    """Test cases for the thread pool scheduler runtime."""
+
+    def _wait_for(self, condition: Callable[[], bool]) -> None:
+        deadline = time.monotonic() + 5
+        while not condition():
+            self.assertLess(time.monotonic(), deadline, "timed out")
+            time.sleep(0.01)
+
+    def test_dispatches_due_jobs(self) -> None:
+        """Due jobs run on pool threads; others wait for their fire time."""
+        clock = _FakeClock(datetime(2026, 3, 1, 11, 59, 59, 900_000, tzinfo=UTC))
+        threads: list[str] = []
+        done = threading.Event()
+
+        def noon() -> None:
+            threads.append(threading.current_thread().name)
+            done.set()
+
+        with ThreadPoolScheduler(2, clock=clock) as scheduler:
+            scheduler.add_job(CronSchedule().daily().at(12), noon)
+            scheduler.add_job(CronSchedule().daily().at(13), noon)
+            self.assertTrue(done.wait(5))
+        self.assertEqual(len(threads), 1)
+        self.assertTrue(threads[0].startswith("fluentcron-worker"))
+        self.assertEqual(scheduler.stats().dispatched, 1)
+
+    def test_max_instances_and_coalescing(self) -> None:
+        """Busy jobs skip fires; coalescing jobs run once for missed fires."""
+        clock = _FakeClock(datetime(2026, 3, 1, 11, 59, 59, 900_000, tzinfo=UTC))
+        release = threading.Event()
+        counts = {"coalesced": 0, "each": 0}
+        lock = threading.Lock()
+
+        def count(name: str) -> Callable[[], None]:
+            def run() -> None:
+                with lock:
+                    counts[name] += 1
+
+            return run
+
+        scheduler = ThreadPoolScheduler(4, clock=clock)
+        scheduler.add_job(CronSchedule(), release.wait, job_id="slow")
+        scheduler.start()
+        self._wait_for(lambda: scheduler.stats().dispatched == 1)
+        # The next fire finds the first run still in flight
+        clock.offset += timedelta(minutes=1)
+        scheduler.wakeup()
+        self._wait_for(lambda: scheduler.stats().skipped == 1)
+        scheduler.remove_job("slow")
+        release.set()
+
+        scheduler.add_job(
+            CronSchedule(), count("coalesced"), coalesce=True, misfire_grace=None
+        )
+        scheduler.add_job(
+            CronSchedule(), count("each"), max_instances=5, misfire_grace=None
+        )
+        # Five fires are missed at once
+        clock.offset += timedelta(minutes=5)
+        scheduler.wakeup()
+        self._wait_for(lambda: counts["each"] == 5)
+        scheduler.shutdown()
+        self.assertEqual(counts, {"coalesced": 1, "each": 5})
+
+    def test_shutdown_drains_and_errors(self) -> None:
+        """shutdown() waits for in-flight runs; failing jobs are logged."""
+        clock = _FakeClock(datetime(2026, 3, 1, 11, 59, 59, 900_000, tzinfo=UTC))
+        started = threading.Event()
+        finished = threading.Event()
+
+        def slow() -> None:
+            started.set()
+            time.sleep(0.2)
+            finished.set()
+
+        def broken() -> None:
+            raise RuntimeError("boom")
+
+        scheduler = ThreadPoolScheduler(2, clock=clock)
+        scheduler.add_job(CronSchedule(), slow)
+        scheduler.add_job(CronSchedule(), broken)
+        with self.assertLogs("fluentcron.runtime", "ERROR"):
+            scheduler.start()
+            self.assertTrue(started.wait(5))
+            scheduler.shutdown()
+        self.assertTrue(finished.is_set())
+        stats = scheduler.stats()
+        self.assertEqual((stats.dispatched, stats.errors), (2, 1))
+
+    def test_restart_after_shutdown(self) -> None:
+        """start() after shutdown() runs jobs on a fresh pool."""
+        clock = _FakeClock(datetime(2026, 3, 1, 11, 59, 59, 900_000, tzinfo=UTC))
+        runs = threading.Semaphore(0)
+        scheduler = ThreadPoolScheduler(2, clock=clock)
+        scheduler.add_job(CronSchedule(), runs.release)
+        scheduler.start()
+        self.assertTrue(runs.acquire(timeout=5))
+        scheduler.shutdown()
+        clock.offset += timedelta(minutes=1)
+        scheduler.start()
+        self.assertTrue(runs.acquire(timeout=5))
+        scheduler.shutdown()
+        self.assertEqual(scheduler.stats().dispatched, 2)
+
+
+class TestCollisions(unittest.TestCase):
+    """Test cases for collision analysis."""
+
+    def test_identical_schedules_collide(self) -> None:
+        """Many jobs on the same expression form one group and one hot minute."""
+        schedules = {f"job-{i}": CronSchedule().daily().at(5) for i in range(300)}
+        schedules["other"] = CronSchedule().daily().at(6)
+        report = collisions(
+            schedules, (datetime(2026, 3, 1), datetime(2026, 3, 2)), top=5
+        )
+        self.assertEqual([len(group) for group in report.groups], [300, 1])
+        self.assertEqual(len(report.hottest), 1)
+        hottest = report.hottest[0]
+        self.assertEqual(hottest.time, datetime(2026, 3, 1, 5, 0))
+        self.assertEqual(hottest.load, 300)
+        self.assertEqual(sorted(hottest.keys), sorted(set(schedules) - {"other"}))
+
+    def test_matches_enumeration(self) -> None:
+        """Hot minutes agree with counting every fire in the window."""
+        builds: list[CronSchedule] = []
+        for i in range(25):
+            for hour in (0, 5, 12, 23):
+                builds.append(CronSchedule().daily().at(hour, jitter=f"job-{i}"))
+        builds += [CronSchedule().every_n_minutes(15, jitter=str(i)) for i in range(20)]
+        for _ in range(5):
+            for weekday in ("monday", "friday", "sunday"):
+                builds.append(CronSchedule().weekly().on_weekday(weekday).at(5))
+        builds += [CronSchedule.parse("0 */2 1,15 * 1") for _ in range(5)]
+        schedules = [(f"job-{i}", schedule) for i, schedule in enumerate(builds)]
+        start = datetime(2026, 3, 1, 4, 30, 30)
+        end = datetime(2026, 3, 16, 5, 0)
+        report = collisions(schedules, (start, end), top=25)
+        counts = Counter(fire for fire, _ in iter_fires(schedules, start, end))
+        expected = sorted(
+            ((count, fire) for fire, count in counts.items() if count >= 2),
+            key=lambda item: (-item[0], item[1]),
+        )[:25]
+        self.assertEqual([(c.load, c.time) for c in report.hottest], expected)
+        for collision in report.hottest:
+            self.assertEqual(len(collision.keys), collision.load)
+
+    def test_subsumed(self) -> None:
+        """Schedules whose fires are contained in another's are reported."""
+        report = collisions(
+            [
+                ("minutely", CronSchedule()),
+                ("hourly", CronSchedule(minute="0")),
+                ("daily", CronSchedule().daily().at(5)),
+                ("monday", CronSchedule().weekly().on_monday().at(5)),
+                ("either", CronSchedule(minute="0", hour="5", day="1", weekday="1")),
+                ("never", CronSchedule.parse("0 0 30 2 *")),
+            ],
+            (datetime(2026, 3, 1), datetime(2026, 3, 2)),
+        )
+        names = [group[0] for group in report.groups]
+        pairs = {(names[i], names[j]) for i, j in report.subsumed}
+        self.assertEqual(
+            pairs,
+            {
+                ("hourly", "minutely"),
+                ("daily", "minutely"),
+                ("daily", "hourly"),
+                ("monday", "minutely"),
+                ("monday", "hourly"),
+                ("monday", "daily"),
+                ("monday", "either"),
+                ("either", "minutely"),
+                ("either", "hourly"),
+                ("either", "daily"),
+            },
+        )
+
+    def test_subsumed_compares_seconds(self) -> None:
+        """Containment takes the seconds field into account."""
+        report = collisions(
+            [
+                ("ten", CronSchedule().every_n_seconds(10).at(5)),
+                ("daily", CronSchedule().daily().at(5)),
+                ("thirty", CronSchedule(minute="0", hour="5", second="30")),
+            ],
+            (datetime(2026, 3, 1), datetime(2026, 3, 2)),
+        )
+        names = [group[0] for group in report.groups]
+        pairs = {(names[i], names[j]) for i, j in report.subsumed}
+        # 05:00:00 and 05:00:30 are fires of every_n_seconds(10).at(5), which
+        # fires six times at 05:00 and is contained in neither
+        self.assertEqual(pairs, {("daily", "ten"), ("thirty", "ten")})
+
+
+class TestCanonical(unittest.TestCase):
+    """Test cases for canonical() / dedupe()."""
+
+    def test_equivalent_spellings(self) -> None:
+        """Different spellings of the same fields canonicalize equally."""
+        for a, b in [
+            ("0/15 * * * *", "*/15 * * * *"),
+            ("0-59 0-23 1-31 1-12 0-6", "* * * * *"),
+            ("0 0 * * 7", "0 0 * * 0"),
+            ("0 0 * * 0,7", "0 0 * * sun"),
+            ("0,1,2,3 * * * *", "0-3 * * * *"),
+            ("@daily", "0 0 * * *"),
+        ]:
+            with self.subTest(a=a, b=b):
+                self.assertEqual(
+                    CronSchedule.parse(a).canonical(), CronSchedule.parse(b).canonical()
+                )
+
+    def test_minimal_rendering(self) -> None:
+        """Fields are rendered in their shortest form."""
+        self.assertEqual(
+            str(CronSchedule.parse("0,15,30,45 1,2,3,5 * 1-12 1-5").canonical()),
+            "*/15 1-3,5 * * 1-5",
+        )
+        self.assertEqual(
+            str(CronSchedule.parse("5/10 0,1 * * *").canonical()), "5/10 0,1 * * *"
+        )
+
+    def test_day_and_weekday_semantics(self) -> None:
+        """Canonical forms keep the day-of-month/weekday OR/AND behavior."""
+        cases = {
+            # OR with a field matching every day: every day
+            "0 0 1-31 * 1": "0 0 * * *",
+            # OR must not gain a leading "*"
+            "0 0 1/2 * 1": "0 0 1/2 * 1",
+            # AND keeps its "*/n" spelling
+            "0 0 */10 * 1": "0 0 */10 * 1",
+            "0 0 1,15 * */7": "0 0 1,15 * */7",
+        }
+        start = datetime(2026, 1, 1)
+        for expr, expected in cases.items():
+            with self.subTest(expr=expr):
+                schedule = CronSchedule.parse(expr)
+                canonical = schedule.canonical()
+                self.assertEqual(str(canonical), expected)
+                self.assertEqual(canonical.canonical(), canonical)
+                t: datetime | None = start
+                for _ in range(50):
+                    assert t is not None
+                    fire = schedule.next_after(t)
+                    self.assertEqual(canonical.next_after(t), fire)
+                    t = fire
+
+    def test_dedupe(self) -> None:
+        """dedupe() returns unique canonical schedules and an index map."""
+        schedules = [
+            CronSchedule.parse("*/15 * * * *"),
+            CronSchedule.parse("0 0 * * 7"),
+            CronSchedule.parse("0/15 * * * *"),
+            CronSchedule.parse("0 0 * * 0"),
+            CronSchedule.parse("*/15 * * * *"),
+        ]
+        uniques, index = dedupe(schedules)
+        self.assertEqual([str(u) for u in uniques], ["*/15 * * * *", "0 0 * * 0"])
+        self.assertEqual(index, [0, 1, 0, 1, 0])
+        self.assertEqual(dedupe([]), ([], []))
+
+
+_PACKAGE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _run_python(*args: str) -> subprocess.CompletedProcess[str]:
+    return subprocess.run(
+        [sys.executable, *args],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=_PACKAGE_ROOT,
+    )
+
+
+class TestScheduleAlgebra(unittest.TestCase):
+    """Test cases for union, intersection and difference of schedules."""
+
+    every_5 = CronSchedule().every_n_minutes(5)
+    blackout = CronSchedule.parse("* 2-3 * * 0")
+    business = CronSchedule.parse("*/15 9-17 * * 1-5")
+    or_days = CronSchedule.parse("0 0 1,15 * 1")
+
+    def assert_fires(self, schedule: CompositeSchedule, expected: object) -> None:
+        start = datetime(2026, 2, 27)
+        minutes = [start + timedelta(minutes=i) for i in range(4 * 1440)]
+        truth = [t for t in minutes if expected(t)]  # type: ignore[operator]
+        self.assertEqual(list(schedule.iter_fires(start, minutes[-1])), truth)
+        for t in minutes[:: 4 * 60 + 7]:
+            following = next((x for x in truth if x > t), None)
+            if following is not None:
+                self.assertEqual(schedule.next_after(t), following, t)
+
+    def test_operators(self) -> None:
+        """|, & and - match the set operations on fire times."""
+        a, b, c = self.every_5, self.blackout, self.business
+        ca, cb, cc = a.compile(), b.compile(), c.compile()
+        d = self.or_days.compile()
+        self.assert_fires(a - b, lambda t: ca.matches(t) and not cb.matches(t))
+        self.assert_fires(b | c, lambda t: cb.matches(t) or cc.matches(t))
+        self.assert_fires(a & c, lambda t: ca.matches(t) and cc.matches(t))
+        self.assert_fires(
+            (a | self.or_days) - (c - b),
+            lambda t: (
+                (ca.matches(t) or d.matches(t))
+                and not (cc.matches(t) and not cb.matches(t))
+            ),
+        )
+        self.assert_fires(
+            (self.or_days & c) | (b & self.or_days),
+            lambda t: d.matches(t) and (cc.matches(t) or cb.matches(t)),
+        )
+
+    def test_folds_into_compiled_schedules(self) -> None:
+        """Operands differing in one field combine into one bitmask schedule."""
+        both = CronSchedule().daily().at(9) | CronSchedule().daily().at(17)
+        assert isinstance(both, LeafSchedule)
+        self.assertEqual(both.compiled, CronSchedule.parse("0 9,17 * * *").compile())
+        workdays = CronSchedule.parse("0 9 * * *") - CronSchedule.parse("* * * * 0,6")
+        assert isinstance(workdays, LeafSchedule)
+        self.assertEqual(workdays.compiled, CronSchedule.parse("0 9 * * 1-5").compile())
+        never = CronSchedule().at(9) & CronSchedule().at(17)
+        self.assertIsNone(never.next_after(datetime(2026, 3, 1)))
+        self.assertIsInstance(self.every_5 - self.blackout, DifferenceSchedule)
+
+    def test_difference_skips_excluded_period(self) -> None:
+        """Excluded fires are jumped over, not enumerated."""
+        schedule = self.every_5 - CronSchedule.parse("* * * 3-11 *")
+        self.assertEqual(
+            schedule.next_after(datetime(2026, 3, 1)), datetime(2026, 12, 1)
+        )
+
+
+class TestCalendarCache(unittest.TestCase):
+    """Test cases for CalendarCache."""
+
+    schedules: ClassVar[list[CronSchedule]] = [
+        CronSchedule.parse(expr)
+        for expr in (
+            "*/15 * * * *",
+            "0 9,17 * * 1-5",
+            "30 2 * * 0",
+            "0 0 1,15 * 1",
+            "0 0 29 2 *",
+        )
+    ]
+
+    def test_matches_compiled_evaluation(self) -> None:
+        """Lookups agree with next_after() as the horizon slides."""
+        start = datetime(2026, 3, 1)
+        cache = CalendarCache(start, timedelta(days=2))
+        for step in range(12):
+            now = start + timedelta(hours=11 * step)
+            cache.advance(now)
+            for schedule in self.schedules:
+                for minutes in range(-90, 4 * 1440, 37):
+                    dt = now + timedelta(minutes=minutes, seconds=step % 2)
+                    self.assertEqual(
+                        cache.next_after(schedule, dt), schedule.next_after(dt), dt
+                    )
+        stats = cache.stats()
+        self.assertGreater(stats.hits, 0)
+        self.assertGreater(stats.fallbacks, 0)
+
+    def test_tables_and_sparse_fallback(self) -> None:
+        """Dense schedules get tables, sparse ones fall back."""
+        cache = CalendarCache(datetime(2026, 3, 2), min_fires=2)
+        table = cache.table(CronSchedule.parse("0 9,17 * * 1-5"))
+        assert table is not None
+        self.assertEqual(len(table), 10)
+        self.assertEqual(table[0] * 60, datetime(2026, 3, 2, 9, tzinfo=UTC).timestamp())
+        self.assertIsNone(cache.table(CronSchedule.parse("30 2 * * 0")))
+        fire = cache.next_after(
+            CronSchedule.parse("30 2 * * 0"), datetime(2026, 3, 2, tzinfo=UTC)
+        )
+        self.assertEqual(fire, datetime(2026, 3, 8, 2, 30, tzinfo=UTC))
+
+    def test_iter_fires(self) -> None:
+        """iter_fires() walks the table and continues past the horizon."""
+        cache = CalendarCache(datetime(2026, 3, 2), timedelta(days=1))
+        schedule = CronSchedule.parse("0 9,17 * * 1-5")
+        fires = cache.iter_fires(schedule, datetime(2026, 3, 2, 12))
+        self.assertEqual(
+            [next(fires) for _ in range(4)],
+            [
+                datetime(2026, 3, 2, 17),
+                datetime(2026, 3, 3, 9),
+                datetime(2026, 3, 3, 17),
+                datetime(2026, 3, 4, 9),
+            ],
+        )
+
+    def test_memory_cap(self) -> None:
+        """Least recently used tables are evicted beyond max_bytes."""
+        cache = CalendarCache(datetime(2026, 3, 1), max_bytes=4500)
+        quarter_hourly = CronSchedule().every_n_minutes(15)  # 672 fires
+        half_hourly = CronSchedule().every_n_minutes(30)  # 336 fires
+        self.assertIsNotNone(cache.table(quarter_hourly))
+        self.assertIsNotNone(cache.table(half_hourly))
+        self.assertIsNone(cache.table(CronSchedule()))  # larger than the cap
+        self.assertEqual(cache.stats().evictions, 0)
+        cache.table(CronSchedule().every_n_minutes(20))
+        self.assertEqual(cache.stats().evictions, 1)
+        self.assertLessEqual(cache.stats().bytes, 4500)
+        with self.assertRaises(ValueError):
+            CalendarCache(datetime(1969, 12, 31))
+
+
+class TestBinary(unittest.TestCase):
+    """Test cases for the binary schedule file format."""
+
+    def setUp(self) -> None:
+        self.jobs = {
+            f"job-{i}": (
+                CronSchedule().every_n_minutes(15, jitter=f"job-{i}")
+                if i % 3
+                else CronSchedule().weekly().on_weekday(i % 7).at(i % 24)  # type: ignore[arg-type]
+            )
+            for i in range(300)
+        }
+        self.jobs["täglich"] = CronSchedule.parse("0 5 1,15 * 1")
+
+    def test_round_trip(self) -> None:
+        """Every key maps back to its compiled schedule."""
+        schedules = binary.loads(binary.dumps(self.jobs))
+        self.assertEqual(len(schedules), len(self.jobs))
+        self.assertEqual(list(schedules), sorted(self.jobs, key=str.encode))
+        for key, schedule in self.jobs.items():
+            self.assertIn(key, schedules)
+            self.assertEqual(schedules[key], schedule.compile())
+        self.assertNotIn("job-missing", schedules)
+        with self.assertRaises(KeyError):
+            schedules["job-missing"]
+        self.assertTrue(schedules["täglich"].day_or_weekday)
+
+    def test_due_at_matches_index(self) -> None:
+        """due_at() agrees with ScheduleIndex over a week of minutes."""
+        index = ScheduleIndex(self.jobs)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "schedules.bin")
+            with open(path, "wb") as fp:
+                binary.dump(self.jobs, fp)
+            with binary.ScheduleFile.open(path) as schedules:
+                dt = datetime(2026, 3, 1)
+                while dt < datetime(2026, 3, 8):
+                    self.assertEqual(
+                        sorted(schedules.due_at(dt)), sorted(index.due_at(dt)), dt
+                    )
+                    dt += timedelta(minutes=7)
+
+    def test_invalid(self) -> None:
+        """Duplicate keys and malformed files are rejected."""
+        with self.assertRaises(ValueError):
+            binary.dumps([("a", CronSchedule()), ("a", CronSchedule().daily())])
+        data = binary.dumps(self.jobs)
+        for bad in (b"", b"JSON" + data[4:], data[:-1]):
+            with self.assertRaises(ValueError):
+                binary.loads(bad)
+        empty = binary.loads(binary.dumps({}))
+        self.assertEqual(len(empty), 0)
+        self.assertEqual(empty.due_at(datetime(2026, 3, 1)), [])
+
+
+class TestSeconds(unittest.TestCase):
+    """Test cases for the seconds field and sub-minute schedules."""
+
+    expressions: ClassVar[list[str]] = [
+        "*/10 * * * * *",
+        "15,45 */7 9-10 * * *",
+        "30 0 0 * * *",
+        "5-7 59 * * * 1-5",
+    ]
+
+    def brute_force(self, expr: str, start: datetime, end: datetime) -> list[datetime]:
+        compiled = CronSchedule.parse(expr).compile()
+        fires: list[datetime] = []
+        dt = start
+        while dt < end:
+            if compiled.matches(dt):
+                fires.append(dt)
+            dt += timedelta(seconds=1)
+        return fires
+
+    def test_every_n_seconds(self) -> None:
+        """every_n_seconds() renders a leading seconds field."""
+        self.assertEqual(str(CronSchedule().every_n_seconds(10)), "*/10 * * * * *")
+        self.assertEqual(str(CronSchedule().every_n_seconds(1)), "* * * * * *")
+        offset = _jitter_offset("poller", 10)
+        self.assertEqual(
+            CronSchedule().every_n_seconds(10, jitter="poller").second, f"{offset}/10"
+        )
+        self.assertEqual(
+            str(CronSchedule().every_n_seconds(15).between_hours(9, 17)),
+            "*/15 * 9-17 * * *",
+        )
+        for n in (0, 60):
+            with self.assertRaises(ValueError):
+                CronSchedule().every_n_seconds(n)  # type: ignore[arg-type]
+
+    def test_parse_and_render(self) -> None:
+        """Six-field expressions round-trip; five fields only when lossless."""
+        schedule = CronSchedule.parse("*/10 * * * * *")
+        self.assertEqual(schedule, CronSchedule().every_n_seconds(10))
+        self.assertEqual(CronSchedule.parse(str(schedule)), schedule)
+        self.assertEqual(schedule.to_str(6), "*/10 * * * * *")
+        with self.assertRaises(ValueError):
+            schedule.to_str(5)
+        with self.assertRaises(ValueError):
+            CronSchedule.parse("30 * * * * *").to_str(5)
+        classic = CronSchedule.parse("0 30 9 * * mon")
+        self.assertEqual(classic, CronSchedule.parse("30 9 * * 1"))
+        self.assertEqual(classic.to_str(5), "30 9 * * 1")
+        self.assertEqual(classic.to_str(6), "0 30 9 * * 1")
+        self.assertEqual(str(classic), "30 9 * * 1")
+        self.assertEqual(
+            CronSchedule.parse("0/10 * * * * *").canonical().second, "*/10"
+        )
+
+    def test_next_and_prev(self) -> None:
+        """next_after() and prev_before() agree with a second-by-second scan."""
+        start, end = datetime(2026, 3, 2, 8, 58), datetime(2026, 3, 2, 11)
+        for expr in self.expressions:
+            compiled = CronSchedule.parse(expr).compile()
+            fires = self.brute_force(expr, start, end)
+            found = list(iter_fires({expr: compiled}, start, end))
+            self.assertEqual([fire for fire, _ in found], fires, expr)
+            probes = [start + timedelta(seconds=i * 37.5) for i in range(190)]
+            for dt in probes:
+                following = next((f for f in fires if f > dt), None)
+                if following is not None:
+                    self.assertEqual(compiled.next_after(dt), following, (expr, dt))
+                previous = next((f for f in reversed(fires) if f < dt), None)
+                if previous is not None:
+                    self.assertEqual(compiled.prev_before(dt), previous, (expr, dt))
+            self.assertEqual(compiled.count_between(start, end), len(fires), expr)
+            self.assertEqual(
+                compiled.count_between(start + timedelta(seconds=16.5), end),
+                len([f for f in fires if f >= start + timedelta(seconds=16.5)]),
+            )
+
+    def test_classic_schedules_match_any_second(self) -> None:
+        """A seconds field of 0 keeps minute resolution for matches()."""
+        compiled = CronSchedule.parse("30 9 * * *").compile()
+        self.assertFalse(compiled.sub_minute)
+        self.assertTrue(compiled.matches(datetime(2026, 3, 2, 9, 30, 42)))
+        compiled = CronSchedule.parse("0,30 30 9 * * *").compile()
+        self.assertTrue(compiled.sub_minute)
+        self.assertFalse(compiled.matches(datetime(2026, 3, 2, 9, 30, 42)))
+        self.assertEqual(compiled.fires_per_day(), 2)
+
+    def test_minute_resolution_consumers(self) -> None:
+        """Minute-resolution features reject or fall back for sub-minute schedules."""
+        schedule = CronSchedule().every_n_seconds(20)
+        with self.assertRaises(ValueError):
+            binary.dumps({"poller": schedule})
+        with self.assertRaises(ValueError):
+            schedule - CronSchedule.parse("* 2 * * *")
+        cache = CalendarCache(datetime(2026, 3, 1))
+        start = datetime(2026, 3, 1, 12)
+        fires = cache.iter_fires(schedule, start)
+        self.assertEqual(
+            [next(fires) for _ in range(4)],
+            [start + timedelta(seconds=20 * i) for i in range(4)],
+        )
+        self.assertEqual(
+            cache.next_after(schedule, start), start + timedelta(seconds=20)
+        )
+        self.assertEqual(cache.stats().tables, 0)
+
+
+class TestInstrument(unittest.TestCase):
+    """Test cases for the opt-in instrumentation registry."""
+
+    def setUp(self) -> None:
+        instrument.reset()
+        self.addCleanup(instrument.disable)
+
+    def timings(self) -> dict[str, dict[str, float]]:
+        return instrument.snapshot()["timings"]  # type: ignore[return-value]
+
+    def test_disabled_by_default(self) -> None:
+        """Nothing is wrapped or recorded until enable() is called."""
+        at = vars(CronSchedule)["at"]
+        next_after = vars(CompiledSchedule)["next_after"]
+        self.assertFalse(instrument.is_enabled())
+        CronSchedule().daily().at(9).compile().next_after(datetime(2026, 3, 1))
+        self.assertTrue(all(t["calls"] == 0 for t in self.timings().values()))
+        instrument.enable()
+        self.assertIsNot(vars(CronSchedule)["at"], at)
+        instrument.disable()
+        self.assertIs(vars(CronSchedule)["at"], at)
+        self.assertIs(vars(CompiledSchedule)["next_after"], next_after)
+
+    def test_timings_and_callbacks(self) -> None:
+        """Timed calls are counted per metric and reported to callbacks."""
+        seen: list[tuple[str, float]] = []
+
+        def callback(metric: str, seconds: float) -> None:
+            seen.append((metric, seconds))
+
+        instrument.add_callback(callback)
+        self.addCleanup(instrument.remove_callback, callback)
+        instrument.enable()
+        # at_hours() calls at() internally; it is timed as one build
+        schedule = CronSchedule().at_hours([9, 17], jitter="instrument-test")
+        schedule.to_str()
+        CronSchedule.parse("*/5 * * * *").compile().next_after(datetime(2026, 3, 1))
+        instrument.disable()
+        str(schedule)
+        timings = self.timings()
+        self.assertEqual(timings["build"]["calls"], 1)
+        self.assertEqual(timings["render"]["calls"], 1)
+        self.assertEqual(timings["parse"]["calls"], 1)
+        self.assertEqual(timings["jitter_hash"]["calls"], 1)
+        self.assertEqual(timings["next_fire"]["calls"], 1)
+        self.assertGreater(timings["build"]["total"], 0)
+        self.assertEqual(
+            Counter(metric for metric, _ in seen),
+            {"build": 1, "render": 1, "parse": 1, "jitter_hash": 1, "next_fire": 1},
+        )
+        with self.assertRaises(ValueError):
+            instrument.remove_callback(print)
+
+    def test_snapshot(self) -> None:
+        """Snapshots are plain dicts with cache hit rates since reset()."""
+        CronSchedule.parse("7 7 * * *")
+        instrument.reset()
+        for _ in range(3):
+            CronSchedule.parse("7 7 * * *")
+        snapshot = json.loads(json.dumps(instrument.snapshot()))
+        self.assertFalse(snapshot["enabled"])
+        self.assertEqual(
+            snapshot["caches"]["parse"], {"hits": 3, "misses": 0, "hit_rate": 1.0}
+        )
+        self.assertEqual(
+            set(snapshot["caches"]),
+            {"parse", "compile", "canonical", "render", "jitter_hash", "intern"},
+        )
+        self.assertEqual(set(snapshot["timings"]), set(instrument.METRICS))
+
+
+class TestSharding(unittest.TestCase):
+    """Test cases for shard assignment across simulated nodes."""
+
+    def setUp(self) -> None:
+        self.jobs: dict[str, CronSchedule] = {}
+        for i in range(2000):
+            key = f"job-{i}"
+            if i % 200 == 0:
+                schedule = CronSchedule().every_n_seconds(30)
+            elif i % 7 == 0:
+                schedule = CronSchedule().every_n_minutes(5, jitter=key)
+            else:
+                schedule = CronSchedule().daily().at(i % 24, jitter=key)  # type: ignore[arg-type]
+            self.jobs[key] = schedule
+        self.nodes = [f"node-{i}" for i in range(5)]
+        self.total = sum(map(sharding.expected_fires_per_day, self.jobs.values()))
+
+    def test_expected_fires_per_day(self) -> None:
+        """Loads are long-run fires per day, from the bitmasks."""
+        fires = sharding.expected_fires_per_day
+        self.assertEqual(fires(CronSchedule().daily().at(9)), 1.0)
+        self.assertEqual(fires(CronSchedule().every_n_minutes(15)), 96.0)
+        self.assertEqual(fires(CronSchedule().every_n_seconds(10)), 8640.0)
+        self.assertAlmostEqual(fires(CronSchedule.parse("0 9 * * 1-5")), 5 / 7)
+        self.assertAlmostEqual(
+            fires(CronSchedule.parse("0 0 29 2 *")), 7 / (365.25 * 28), places=6
+        )
+
+    def test_simulated_nodes_agree(self) -> None:
+        """Each node computes the same assignment; every job has one owner."""
+        owned: list[str] = []
+        for i, node in enumerate(self.nodes):
+            # Every node sees the nodes and jobs in its own order
+            nodes = self.nodes[i:] + self.nodes[:i]
+            jobs = list(self.jobs.items())[::-1] if i % 2 else self.jobs
+            owned.extend(sharding.ShardRing(nodes).assign(jobs).jobs_of(node))
+        self.assertEqual(sorted(owned), sorted(self.jobs))
+
+    def test_balanced_by_load(self) -> None:
+        """Loads stay within the slack of a fair share, even with heavy jobs."""
+        for weights in (dict.fromkeys(self.nodes, 1.0), {"big": 2.0, "small": 1.0}):
+            ring = sharding.ShardRing(weights, slack=0.1)
+            assignment = ring.assign(self.jobs)
+            self.assertAlmostEqual(sum(assignment.loads.values()), self.total)
+            for node, weight in weights.items():
+                share = self.total * weight / sum(weights.values())
+                self.assertLessEqual(assignment.loads[node], share * 1.1, node)
+
+    def test_minimal_movement(self) -> None:
+        """Joining or leaving nodes moves little more than their own share."""
+        ring = sharding.ShardRing(self.nodes)
+        before = ring.assign(self.jobs)
+        ring.add("node-5")
+        joined = ring.assign(self.jobs)
+        moved = before.moved(joined)
+        self.assertLess(len(moved), len(self.jobs) * 0.25)
+        self.assertGreater(
+            sum(joined.owners[key] == "node-5" for key in moved), len(moved) * 0.9
+        )
+        ring.remove("node-5")
+        self.assertEqual(ring.assign(self.jobs), before)
+        ring.remove("node-4")
+        left = ring.assign(self.jobs)
+        moved = before.moved(left)
+        stayed = [key for key in moved if before.owners[key] != "node-4"]
+        self.assertLess(len(stayed), len(self.jobs) * 0.05)
+        self.assertEqual(set(left.owners.values()), set(self.nodes[:4]))
+
+    def test_rank_and_errors(self) -> None:
+        """rank() orders every node; an empty ring cannot assign."""
+        ring = sharding.ShardRing(self.nodes)
+        self.assertEqual(sorted(ring.rank("job-1")), self.nodes)
+        self.assertEqual(ring.owner("job-1"), ring.rank("job-1")[0])
+        with self.assertRaises(ValueError):
+            sharding.ShardRing().assign(self.jobs)
+        with self.assertRaises(ValueError):
+            ring.add("node-x", 0)
+        with self.assertRaises(KeyError):
+            ring.remove("node-x")
+
+
+class TestImportCost(unittest.TestCase):
+    """Test cases guarding the cost of ``import fluentcron``."""
+
+    # Modules that must not be loaded by a bare ``import fluentcron``
+    deferred: ClassVar[set[str]] = {
+        "asyncio",
+        "calendar",
+        "concurrent.futures",
+        "hashlib",
+        "zoneinfo",
+        "fluentcron.algebra",
+        "fluentcron.analysis",
+        "fluentcron.batch",
+        "fluentcron.bench",
+        "fluentcron.binary",
+        "fluentcron.bulk",
+        "fluentcron.horizon",
+        "fluentcron.index",
+        "fluentcron.instrument",
+        "fluentcron.parser",
+        "fluentcron.planner",
+        "fluentcron.runtime",
+        "fluentcron.sharding",
+        "fluentcron.stream",
+        "fluentcron.tz",
+    }
+
+    def test_importtime(self) -> None:
+        """-X importtime shows no heavy module below ``import fluentcron``."""
+        stderr = _run_python("-X", "importtime", "-c", "import fluentcron").stderr
+        block: list[str] = []
+        imported: list[str] | None = None
+        for line in stderr.splitlines():
+            if not line.startswith("import time:"):
+                continue
+            field = line.split("|")[-1]
+            name = field.strip()
+            if field.startswith("  "):
+                block.append(name)
+            elif name == "fluentcron":
+                imported = [*block, name]
+            else:
+                block = []
+        assert imported is not None, stderr
+        self.assertIn("fluentcron.schedule", imported)
+        self.assertEqual(self.deferred.intersection(imported), set())
+
+    def test_lazy_attributes(self) -> None:
+        """Deferred names are importable from the package on first access."""
+        from fluentcron import runtime, tz
+        import fluentcron
+
+        self.assertIs(fluentcron.ZonedSchedule, tz.ZonedSchedule)
+        self.assertIs(fluentcron.runtime, runtime)
+        self.assertIn("ScheduleIndex", dir(fluentcron))
+        with self.assertRaises(AttributeError):
+            fluentcron.missing  # noqa: B018
+        for name in fluentcron.__all__:
+            self.assertTrue(hasattr(fluentcron, name), name)
+
+    def test_hashlib_deferred_until_jitter(self) -> None:
+        """hashlib is imported by the first jittered schedule, not before."""
+        result = _run_python(
+            "-c",
+            "import sys, fluentcron\n"
+            "fluentcron.CronSchedule().daily().at(5)\n"
+            "print('hashlib' in sys.modules)\n"
+            "fluentcron.CronSchedule().daily().at(5, jitter='job')\n"
+            "print('hashlib' in sys.modules)",
+        )
+        self.assertEqual(result.stdout.split(), ["False", "True"])
@@ -65,6 +65,8 @@ type MinuteInterval = Literal[
     59,
 ]
 
+type SecondInterval = MinuteInterval
+
 type Hour = Literal[0, HourInterval]
 type Minute = Literal[0, MinuteInterval]
 
@@ -102,6 +104,8 @@ type DayOfMonth = Literal[
     31,
 ]
 
+type Month = Literal[1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12]
+
 type WeekdayInt = Literal[0, 1, 2, 3, 4, 5, 6]
 type WeekdayStr = Literal[
     "sunday",
@@ -0,0 +1,215 @@
+"""
+Time zone and DST aware fire-time evaluation
+"""
+
+from __future__ import annotations
+
+from bisect import bisect_right
+from datetime import UTC, datetime, timedelta
+from typing import TYPE_CHECKING, Literal
+from zoneinfo import ZoneInfo
+import threading
+
+if TYPE_CHECKING:
+    from .schedule import CronSchedule
+
+type NonexistentPolicy = Literal["skip", "shift_forward"]
+type AmbiguousPolicy = Literal["first", "last", "both"]
+
+_SCAN_STEP = timedelta(hours=6)
+_DAY = timedelta(days=1)
+
+
+class TransitionTable:
+    """
+    The UTC offset changes of a zone between two years, precomputed so that
+    offset lookups are a bisect instead of a ``utcoffset()`` call.
+
+    Instants are naive UTC datetimes. ``offsets[i]`` is the offset in effect
+    from ``instants[i - 1]`` up to (not including) ``instants[i]``.
+    """
+
+    def __init__(self, zone: ZoneInfo, first_year: int, last_year: int) -> None:
+        self.zone = zone
+        self.first_year = first_year
+        self.last_year = last_year
+        self.instants: list[datetime] = []
+        start = datetime(first_year, 1, 1) - _DAY
+        end = datetime(last_year + 1, 1, 1) + _DAY
+        offset = self._offset(start)
+        self.offsets: list[timedelta] = [offset]
+        t = start
+        while t < end:
+            following = t + _SCAN_STEP
+            following_offset = self._offset(following)
+            if following_offset != offset:
+                # Binary search for the exact second of the transition
+                lo, hi = t, following
+                while hi - lo > timedelta(seconds=1):
+                    mid = lo + (hi - lo) / 2
+                    mid = mid.replace(microsecond=0)
+                    if self._offset(mid) == offset:
+                        lo = mid
+                    else:
+                        hi = mid
+                self.instants.append(hi)
+                self.offsets.append(following_offset)
+                offset = following_offset
+            t = following
+
+    def _offset(self, utc: datetime) -> timedelta:
+        local = utc.replace(tzinfo=UTC).astimezone(self.zone)
+        offset = local.utcoffset()
+        assert offset is not None
+        return offset
+
+    def covers(self, utc: datetime) -> bool:
+        return self.first_year <= utc.year <= self.last_year
+
+    def offset_at(self, utc: datetime) -> timedelta:
+        """The zone's UTC offset at the given (naive UTC) instant."""
+        return self.offsets[bisect_right(self.instants, utc)]
+
+    def resolve(self, wall: datetime) -> list[datetime]:
+        """
+        The UTC instants (naive) at which the zone's wall clock reads
+        ``wall``: none inside a gap, two inside a fold, otherwise one.
+        """
+        result: list[datetime] = []
+        for offset in {self.offset_at(wall - _DAY), self.offset_at(wall + _DAY)}:
+            utc = wall - offset
+            if self.offset_at(utc) == offset:
+                result.append(utc)
+        result.sort()
+        return result
+
+    def gap_end(self, wall: datetime) -> datetime:
+        """The transition instant ending the gap that contains ``wall``."""
+        before = wall - self.offset_at(wall + _DAY)
+        return self.instants[bisect_right(self.instants, before)]
+
+
+_TABLES: dict[ZoneInfo, TransitionTable] = {}
+_TABLES_LOCK = threading.Lock()
+
+# Years covered around the first lookup in a zone
+_HORIZON_BEFORE = 1
+_HORIZON_AFTER = 10
+
+
+def transitions(zone: ZoneInfo, utc: datetime) -> TransitionTable:
+    """
+    Return the cached transition table for ``zone`` covering ``utc`` (naive),
+    building or widening it if needed.
+    """
+    table = _TABLES.get(zone)
+    if table is not None and table.covers(utc):
+        return table
+    with _TABLES_LOCK:
+        table = _TABLES.get(zone)
+        if table is None or not table.covers(utc):
+            first = utc.year - _HORIZON_BEFORE
+            last = utc.year + _HORIZON_AFTER
+            if table is not None:
+                first = min(first, table.first_year)
+                last = max(last, table.last_year)
+            table = _TABLES[zone] = TransitionTable(
+                zone, max(first, 1), min(last, 9998)
+            )
+        return table
+
+
+class ZonedSchedule:
+    """
+    A :class:`CronSchedule` evaluated against the wall clock of a time zone.
+
+    Wall-clock times skipped by a DST gap are handled by ``nonexistent``:
+    ``"shift_forward"`` (default) fires once at the end of the gap, ``"skip"``
+    does not fire. Wall-clock times repeated by a DST fold are handled by
+    ``ambiguous``: ``"first"`` (default) fires on the first occurrence only,
+    ``"last"`` on the second only, ``"both"`` on both.
+    """
+
+    def __init__(
+        self,
+        schedule: CronSchedule,
+        zone: ZoneInfo | str,
+        *,
+        nonexistent: NonexistentPolicy = "shift_forward",
+        ambiguous: AmbiguousPolicy = "first",
+    ) -> None:
+        if nonexistent not in ("skip", "shift_forward"):
+            raise ValueError(f"Invalid nonexistent policy: {nonexistent!r}")
+        if ambiguous not in ("first", "last", "both"):
+            raise ValueError(f"Invalid ambiguous policy: {ambiguous!r}")
+        self.schedule = schedule
+        self.zone = ZoneInfo(zone) if isinstance(zone, str) else zone
+        self.nonexistent = nonexistent
+        self.ambiguous = ambiguous
+        self._compiled = schedule.compile()
+
+    def __repr__(self) -> str:
+        return (
+            f"ZonedSchedule({str(self.schedule)!r}, {str(self.zone)!r}, "
+            f"nonexistent={self.nonexistent!r}, ambiguous={self.ambiguous!r})"
+        )
+
+    def _candidates(self, table: TransitionTable, wall: datetime) -> list[datetime]:
+        instants = table.resolve(wall)
+        if not instants:
+            if self.nonexistent == "skip":
+                return []
+            return [table.gap_end(wall)]
+        if len(instants) == 1 or self.ambiguous == "both":
+            return instants
+        if self.ambiguous == "first":
+            return instants[:1]
+        return instants[1:]
+
+    def next_after(self, dt: datetime) -> datetime | None:
+        """
+        Return the first fire time strictly after the aware datetime ``dt``,
+        as an aware datetime in this schedule's zone.
+        """
+        if dt.tzinfo is None:
+            raise ValueError("next_after() requires an aware datetime")
+        after = dt.astimezone(UTC).replace(tzinfo=None)
+        table = transitions(self.zone, after)
+        wall = after + table.offset_at(after)
+        occurrences = table.resolve(wall)
+        rewound = len(occurrences) == 2 and after < occurrences[1]
+        if rewound:
+            # In the first pass of a fold: fires in the second pass can have
+            # wall times up to one fold-length earlier than ``wall``.
+            wall -= table.offset_at(occurrences[0]) - table.offset_at(occurrences[1])
+        best: datetime | None = None
+        best_table = table
+        while True:
+            candidate = self._compiled.next_after(wall)
+            if candidate is None:
+                break
+            table = transitions(self.zone, candidate)
+            if best is not None:
+                # Wall times inside a fold do not map to UTC monotonically, so
+                # keep looking until no later wall time can map before ``best``.
+                largest = max(
+                    table.offset_at(candidate - _DAY), table.offset_at(candidate + _DAY)
+                )
+                if candidate - largest >= best:
+                    break
+            instants = self._candidates(table, candidate)
+            for utc in instants:
+                if utc > after and (best is None or utc < best):
+                    best, best_table = utc, table
+            if best is not None and not rewound and len(instants) < 2:
+                break
+            wall = candidate
+        if best is None:
+            return None
+        return self._to_zone(best_table, best)
+
+    def _to_zone(self, table: TransitionTable, utc: datetime) -> datetime:
+        wall = utc + table.offset_at(utc)
+        occurrences = table.resolve(wall)
+        fold = int(len(occurrences) == 2 and utc == occurrences[1])
+        return wall.replace(tzinfo=self.zone, fold=fold)